@@ -1,6 +1,5 @@
 import sys
 import os
-import venusian
 from logging.config import fileConfig
 
 from alembic import context
@@ -32,7 +31,7 @@ target_metadata = Base.metadata
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-venusian.Scanner().scan(models)
+models.import_models()
 
 if config.get_main_option("sqlalchemy.url") is None:
     config.set_main_option("sqlalchemy.url", AppConfig.db_uri)
@@ -0,0 +1,34 @@
+"""002_keyset_pagination_indexes
+
+Revision ID: 5f0c1a7d3b21
+Revises: 722a59d84398
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0c1a7d3b21'
+down_revision = '722a59d84398'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_note_user_id_updated_id', 'note', ['user_id', 'updated', 'id'], unique=False,
+                    postgresql_where=sa.text('deleted IS NULL'))
+    op.create_index('ix_note_user_id_title_id', 'note', ['user_id', 'title', 'id'], unique=False,
+                    postgresql_where=sa.text('deleted IS NULL'))
+    op.create_index('ix_folder_user_id_updated_id', 'folder', ['user_id', 'updated', 'id'], unique=False,
+                    postgresql_where=sa.text('deleted IS NULL'))
+    op.create_index('ix_folder_user_id_title_id', 'folder', ['user_id', 'title', 'id'], unique=False,
+                    postgresql_where=sa.text('deleted IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_folder_user_id_title_id', table_name='folder')
+    op.drop_index('ix_folder_user_id_updated_id', table_name='folder')
+    op.drop_index('ix_note_user_id_title_id', table_name='note')
+    op.drop_index('ix_note_user_id_updated_id', table_name='note')
@@ -0,0 +1,36 @@
+"""003_note_search_vector
+
+Revision ID: 9b4e2c6a1f08
+Revises: 5f0c1a7d3b21
+Create Date: 2026-10-18 12:40:05.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4e2c6a1f08'
+down_revision = '5f0c1a7d3b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('note', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple'::regconfig, coalesce(text, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_note_search_vector', 'note', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_note_search_vector', table_name='note')
+    op.drop_column('note', 'search_vector')
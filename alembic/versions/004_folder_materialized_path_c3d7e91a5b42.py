@@ -0,0 +1,48 @@
+"""004_folder_materialized_path
+
+Revision ID: c3d7e91a5b42
+Revises: 9b4e2c6a1f08
+Create Date: 2026-10-18 15:02:47.630192
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d7e91a5b42'
+down_revision = '9b4e2c6a1f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('folder', sa.Column('path', sa.String(), nullable=True))
+
+    op.execute("""
+        WITH RECURSIVE tree(id, path) AS (
+            SELECT id, '/' || replace(id::text, '-', '') || '/'
+            FROM folder
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT folder.id, tree.path || replace(folder.id::text, '-', '') || '/'
+            FROM folder
+            JOIN tree ON folder.parent_id = tree.id
+        )
+        UPDATE folder SET path = tree.path FROM tree WHERE folder.id = tree.id
+    """)
+
+    # folders unreachable from roots hang on parent cycles, which were not prevented before, they become roots
+    op.execute("""
+        UPDATE folder SET path = '/' || replace(id::text, '-', '') || '/', parent_id = NULL
+        WHERE path IS NULL
+    """)
+
+    op.alter_column('folder', 'path', nullable=False)
+    op.create_index('ix_folder_user_id_path', 'folder', ['user_id', 'path'], unique=False,
+                    postgresql_ops={'path': 'text_pattern_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_folder_user_id_path', table_name='folder')
+    op.drop_column('folder', 'path')
@@ -0,0 +1,51 @@
+"""005_outbox
+
+Revision ID: e4a8b2f61d93
+Revises: c3d7e91a5b42
+Create Date: 2026-10-18 18:21:09.114380
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from src.models.primitives.base import SAUUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a8b2f61d93'
+down_revision = 'c3d7e91a5b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'outbox',
+        sa.Column('id', SAUUID(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('handler_kwargs', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created', sa.DateTime(), nullable=False),
+        sa.Column('processed', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_outbox_pending_created',
+        'outbox',
+        ['created'],
+        unique=False,
+        postgresql_where=sa.text('processed IS NULL'),
+    )
+    op.create_index(
+        'ix_outbox_processed',
+        'outbox',
+        ['processed'],
+        unique=False,
+        postgresql_where=sa.text('processed IS NOT NULL'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_outbox_processed', table_name='outbox')
+    op.drop_index('ix_outbox_pending_created', table_name='outbox')
+    op.drop_table('outbox')
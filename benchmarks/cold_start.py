@@ -0,0 +1,52 @@
+# Boot time of a web worker: imports and the app factory in a fresh interpreter, as after
+# every max_requests restart of gunicorn without preload_app:
+#   make benchmark name=cold_start
+#   python -m benchmarks.cold_start --runs 5
+import sys
+import json
+import argparse
+import subprocess
+
+FACTORIES = [
+    ("wsgi make_app", "src.entrypoints.web.wsgi", "make_app"),
+    ("wsgi make_preloaded_app", "src.entrypoints.web.wsgi", "make_preloaded_app"),
+    ("asgi make_app", "src.entrypoints.web.asgi", "make_app"),
+]
+
+BOOT_SCRIPT = """
+import json, time, importlib
+started = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+getattr(module, {factory!r})()
+print(json.dumps([imported - started, time.perf_counter() - imported]))
+"""
+
+
+def boot(module: str, factory: str) -> list:
+    output = subprocess.run(
+        [sys.executable, "-c", BOOT_SCRIPT.format(module=module, factory=factory)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per factory")
+    args = parser.parse_args()
+
+    print(f"median of {args.runs} runs, seconds")
+    print(f"{'factory':<28}{'import':>10}{'factory':>10}{'total':>10}")
+
+    for name, module, factory in FACTORIES:
+        runs = sorted((boot(module, factory) for _ in range(args.runs)), key=sum)
+        imported, made = runs[len(runs) // 2]
+        print(f"{name:<28}{imported:>10.3f}{made:>10.3f}{imported + made:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
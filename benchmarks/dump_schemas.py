@@ -0,0 +1,84 @@
+# Dump of a notes list the way GET /notes sends it: NoteDumpSchema against its compiled dump function
+# (src.schemas.compiler), both on the same in-memory notes with a folder and related notes:
+#   make benchmark name=dump_schemas
+#   python -m benchmarks.dump_schemas --notes 1000 --relations 3
+import time
+import argparse
+import venusian
+import datetime as dt
+from uuid import uuid4
+
+from src import models, schemas
+from src.models.folder import Folder
+from src.models.note import Note, NoteToNoteRelation
+from src.models.primitives.folder import FolderTitle, FolderColor
+from src.models.primitives.note import NoteTitle, NoteColor
+from src.schemas.compiler import compiled_dump
+from src.schemas.note import NoteDumpSchema
+
+
+def make_notes(count: int, relations_count: int) -> list:
+    now = dt.datetime.now()
+    folder = Folder(id=uuid4(), title=FolderTitle("Folder"), color=FolderColor("#fff"), children_folders=[],
+                    created=now)
+
+    notes = [
+        Note(id=uuid4(), title=NoteTitle(f"Note {i}"), color=NoteColor("#f3f3f3"), text="text " * 50,
+             folder=folder, folder_id=folder.id, notes_relations=[],
+             created=now, updated=now)
+        for i in range(count)
+    ]
+
+    for i, note in enumerate(notes):
+        for j in range(1, relations_count + 1):
+            child_note = notes[(i + j) % count]
+            note.notes_relations.append(NoteToNoteRelation(child_note_id=child_note.id, child_note=child_note))
+
+    return notes
+
+
+def run_schema(notes: list) -> float:
+    started = time.perf_counter()
+
+    note_dump_schema = NoteDumpSchema()
+    [{"note": note_dump_schema.dump(note)} for note in notes]
+
+    return time.perf_counter() - started
+
+
+def run_compiled(notes: list) -> float:
+    started = time.perf_counter()
+
+    dump_note = compiled_dump(NoteDumpSchema)
+    [{"note": dump_note(note)} for note in notes]
+
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--relations", type=int, default=3, help="related notes of every note")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # every model is mapped before the relations are configured and every schema is registered
+    # before the nested ones are looked up by name
+    venusian.Scanner().scan(models)
+    venusian.Scanner().scan(schemas)
+
+    notes = make_notes(args.notes, args.relations)
+
+    # compiled once per process, as in a web worker
+    compiled_dump(NoteDumpSchema)
+
+    print(f"{args.notes} notes, {args.relations} relations each, best of {args.repeat}")
+    print(f"{'dump':<32}{'seconds':>10}{'notes/s':>12}")
+
+    for name, run in [("marshmallow schema", run_schema), ("compiled", run_compiled)]:
+        elapsed = min(run(notes) for _ in range(args.repeat))
+        print(f"{name:<32}{elapsed:>10.4f}{args.notes / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
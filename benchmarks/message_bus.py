@@ -0,0 +1,84 @@
+# Compares MessageBus and AsyncMessageBus on I/O bound event handlers:
+#   make benchmark name=message_bus
+#   python -m benchmarks.message_bus --events 200 --handlers 3 --latency 0.005
+import time
+import asyncio
+import argparse
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+from src.message_bus import MessageBus, AsyncMessageBus, events
+
+
+@dataclass
+class BenchmarkEvent(events.Event):
+    id: UUID
+
+
+def make_sync_handler(latency: float):
+    def handler(event, context, *args, **kwargs):
+        time.sleep(latency)
+
+    return handler
+
+
+def make_async_handler(latency: float):
+    async def handler(event, context, *args, **kwargs):
+        await asyncio.sleep(latency)
+
+    return handler
+
+
+def run_sync(messages: list, handlers_count: int, latency: float) -> float:
+    message_bus = MessageBus(event_handlers={
+        BenchmarkEvent: [make_sync_handler(latency) for _ in range(handlers_count)],
+    })
+
+    started = time.perf_counter()
+    message_bus.batch_handle(messages)
+
+    return time.perf_counter() - started
+
+
+def run_async(messages: list, handlers_count: int, latency: float, max_concurrency: int) -> float:
+    async def run() -> float:
+        message_bus = AsyncMessageBus(
+            event_handlers={
+                BenchmarkEvent: [make_async_handler(latency) for _ in range(handlers_count)],
+            },
+            max_concurrency=max_concurrency,
+        )
+
+        started = time.perf_counter()
+        await message_bus.batch_handle(messages)
+
+        return time.perf_counter() - started
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--handlers", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.005, help="I/O time of one handler, seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    messages = [BenchmarkEvent(id=uuid4()) for _ in range(args.events)]
+    calls = args.events * args.handlers
+
+    print(f"{args.events} events x {args.handlers} handlers, {args.latency * 1000:.1f} ms per handler")
+    print(f"{'bus':<32}{'seconds':>10}{'calls/s':>12}")
+
+    elapsed = run_sync(messages, args.handlers, args.latency)
+    print(f"{'MessageBus':<32}{elapsed:>10.3f}{calls / elapsed:>12.0f}")
+
+    for max_concurrency in args.concurrency:
+        elapsed = run_async(messages, args.handlers, args.latency, max_concurrency)
+        name = f"AsyncMessageBus({max_concurrency})"
+        print(f"{name:<32}{elapsed:>10.3f}{calls / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
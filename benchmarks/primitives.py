@@ -0,0 +1,62 @@
+# Hydration of note rows into NoteTitle and NoteColor: the validating constructors against the
+# trusted path of the column types (SANoteTitle, SANoteColor):
+#   make benchmark name=primitives
+#   python -m benchmarks.primitives --rows 10000 --colors 8
+import time
+import random
+import string
+import argparse
+
+from src.models.primitives.note import NoteTitle, NoteColor, SANoteTitle, SANoteColor
+
+
+def make_rows(count: int, colors_count: int) -> list:
+    colors = [f"#{random.randrange(16 ** 6):06x}" for _ in range(colors_count)]
+
+    return [
+        ("".join(random.choices(string.ascii_letters + " ", k=random.randint(3, 60))), random.choice(colors))
+        for _ in range(count)
+    ]
+
+
+def run_validating(rows: list) -> float:
+    started = time.perf_counter()
+
+    for title, color in rows:
+        NoteTitle(title)
+        NoteColor(color)
+
+    return time.perf_counter() - started
+
+
+def run_column_types(rows: list) -> float:
+    title_type, color_type = SANoteTitle(), SANoteColor()
+
+    started = time.perf_counter()
+
+    for title, color in rows:
+        title_type.process_result_value(title, None)
+        color_type.process_result_value(color, None)
+
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--colors", type=int, default=8, help="distinct colors of the notes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.colors)
+
+    print(f"{args.rows} rows, {args.colors} colors, best of {args.repeat}")
+    print(f"{'hydration':<32}{'seconds':>10}{'rows/s':>12}")
+
+    for name, run in [("validating constructors", run_validating), ("column types", run_column_types)]:
+        elapsed = min(run(rows) for _ in range(args.repeat))
+        print(f"{name:<32}{elapsed:>10.4f}{args.rows / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,5 +17,6 @@ app.conf.task_queues = (
 )
 
 app.conf.task_routes = {
-    'src.entrypoints.celery.tasks.process_message_bus_event': {'queue': 'events'}
+    'src.entrypoints.celery.tasks.process_message_bus_event': {'queue': 'events'},
+    'src.entrypoints.celery.tasks.process_message_bus_events': {'queue': 'events'},
 }
@@ -0,0 +1,35 @@
+from typing import List
+from uuid import UUID
+from celery import Celery
+from src.message_bus import EventsPublisherABC, events
+from .app import app as celery_app
+from .tasks import process_message_bus_events
+
+
+class CeleryEventsPublisher(EventsPublisherABC):
+    def __init__(self, app: Celery = celery_app, queue: str = "events"):
+        self._app = app
+        self._queue = queue
+
+    def publish(self, events_: List[events.Event], **kwargs):
+        kwargs = {
+            key: str(value) if isinstance(value, UUID) else value
+            for key, value in kwargs.items()
+        }
+
+        if not events_:
+            return
+
+        # the whole batch is one task message, the worker handles the events in order
+        self._app.send_task(
+            process_message_bus_events.name,
+            kwargs=dict(
+                batch=[
+                    {"event_name": type(event).__name__, "serialized_data": event.serialize()}
+                    for event in events_
+                ],
+                skip_sync_handlers=True,
+                **kwargs,
+            ),
+            queue=self._queue,
+        )
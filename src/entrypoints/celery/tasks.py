@@ -1,11 +1,11 @@
-from typing import List, Any
+from typing import List, Any, Optional
 from sqlalchemy.orm import Session
 from .decorators import db_session_dec
 from .app import app
 from config import Config
 from logging import getLogger
 import dataclasses_serialization
-from src.message_bus.event_handlers.base import EventHandlerABC
+from src.message_bus.event_handlers.base import EventHandlerABC, is_sync_handler
 from src.message_bus import MessageBusABC, MessageBus, events, commands
 from src.message_bus.factory import default_events_handlers
 
@@ -14,17 +14,16 @@ logger = getLogger(__name__)
 
 @app.task
 @db_session_dec()
-def process_message_bus_event(db_session: Session, event_name: str, serialized_data: dict, *args, **kwargs):
-    try:
-        event_type: events.Event = getattr(events, event_name)
-    except AttributeError:
-        logger.error(f"Wrong event type: {event_name}")
-        return
+def process_message_bus_event(
+        db_session: Session,
+        event_name: str,
+        serialized_data: dict,
+        skip_sync_handlers: bool = False,
+        *args, **kwargs
+):
+    event = _deserialize_event(event_name, serialized_data)
 
-    try:
-        event = event_type.deserialize(serialized_data)
-    except dataclasses_serialization.serializer_base.errors.DeserializationError as e:
-        logger.exception(e)
+    if event is None:
         return
 
     message_bus = MessageBus(
@@ -32,17 +31,57 @@ def process_message_bus_event(db_session: Session, event_name: str, serialized_d
     )
     message_bus.context["db_session"] = db_session
 
-    _handle_event(event, message_bus, *args, **kwargs)
+    _handle_event(event, message_bus, skip_sync_handlers, *args, **kwargs)
+
+
+@app.task
+@db_session_dec()
+def process_message_bus_events(
+        db_session: Session,
+        batch: List[dict],
+        skip_sync_handlers: bool = False,
+        *args, **kwargs
+):
+    # events of one request in one broker message: [{"event_name": ..., "serialized_data": ...}, ...]
+    message_bus = MessageBus(
+        event_handlers=default_events_handlers(Config)
+    )
+    message_bus.context["db_session"] = db_session
+
+    for item in batch:
+        event = _deserialize_event(item["event_name"], item["serialized_data"])
+
+        if event is not None:
+            _handle_event(event, message_bus, skip_sync_handlers, *args, **kwargs)
+
+
+def _deserialize_event(event_name: str, serialized_data: dict) -> Optional[events.Event]:
+    try:
+        event_type: events.Event = getattr(events, event_name)
+    except AttributeError:
+        logger.error(f"Wrong event type: {event_name}")
+        return None
+
+    try:
+        return event_type.deserialize(serialized_data)
+    except dataclasses_serialization.serializer_base.errors.DeserializationError as e:
+        logger.exception(e)
+        return None
 
 
 def _handle_event(
         event: events.Event,
         message_bus: MessageBusABC,
+        skip_sync_handlers: bool = False,
         *args, **kwargs
 ) -> List[Any]:
     results = []
 
     for handler in message_bus.get_event_handlers(type(event)):
+        # synchronous handlers have already run in the process that published the event
+        if skip_sync_handlers and is_sync_handler(handler):
+            continue
+
         logger.debug(f"Handling  event {event} with handler {handler}")
 
         try:
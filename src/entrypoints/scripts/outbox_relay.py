@@ -0,0 +1,25 @@
+import logging
+import datetime as dt
+from config import Config
+from src.models.meta import session_factory
+from src.message_bus.factory import default_events_handlers
+from src.message_bus.outbox_relay import OutboxRelay
+from src.entrypoints.celery.publisher import CeleryEventsPublisher
+
+
+def main():
+    logging.basicConfig(level=Config.log_level)
+
+    relay = OutboxRelay(
+        db_sessionmaker=session_factory(Config),
+        publisher=CeleryEventsPublisher(),
+        event_handlers=default_events_handlers(Config),
+        batch_size=Config.outbox_relay_batch_size,
+        retention=dt.timedelta(hours=Config.outbox_retention_hours),
+    )
+
+    relay.run(poll_interval=Config.outbox_relay_poll_interval)
+
+
+if __name__ == "__main__":
+    main()
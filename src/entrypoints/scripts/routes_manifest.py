@@ -0,0 +1,11 @@
+from src.entrypoints.web import api, async_api
+from src.entrypoints.web.lib.routes import write_manifest
+
+
+def main():
+    for package in [api, async_api]:
+        print(write_manifest(package))
+
+
+if __name__ == "__main__":
+    main()
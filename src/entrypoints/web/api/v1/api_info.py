@@ -23,8 +23,18 @@ class APIInfo:
             logger.exception(e)
             pass
 
-        resp.text = json.dumps({
+        info = {
             "name": config.app_name,
             "version": app_globals.api_version,
             "db_connection_active": db_connection_active
-        })
+        }
+
+        api_cache = req.context.get("api_cache")
+
+        if api_cache is not None:
+            try:
+                info["api_cache"] = api_cache.get_stats()
+            except Exception as e:
+                logger.exception(e)
+
+        resp.text = json.dumps(info)
@@ -1,7 +1,9 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 from src.message_bus import MessageBusABC
+from src.repositories.outbox import OutboxRepoABC
 from src.entrypoints.web.api.v1 import api_resource
+from src.entrypoints.web.lib.rate_limit import rate_limited
 from src.services.auth import (
     UserAuthenticator,
     TokenSessionMaker,
@@ -34,17 +36,18 @@ from src.schemas.registration import (
 from src.schemas.user import (
     UserDumpSchema
 )
+from src.schemas.compiler import compiled_dump, compiled_load
 from src.repositories.users import SAUsersRepo
 from src.entrypoints.web.errors.user import HTTPWrongUserData
 from src.message_bus import events
-import user_agents
 
 
 @api_resource("/auth/sign-in")
 class SignInController:
     @classmethod
+    @rate_limited(limit=10, interval=60)
     def on_post(cls, req, resp):
-        req_body = UserAuthSchema().load(req.text)
+        req_body = compiled_load(UserAuthSchema)(req.text)
 
         db_session: Session = req.context["db_session"]
 
@@ -95,6 +98,9 @@ class SignInController:
 
     @staticmethod
     def get_device_data(req, req_body) -> dict:
+        # the regexes of user_agents take a while to import, it's done on the first sign in
+        import user_agents
+
         user_agent = user_agents.parse(req.user_agent)
         user_agent_os = f"{user_agent.os.family} {user_agent.os.version_string}"
         device_type = f"{user_agent.device.family} " \
@@ -123,7 +129,7 @@ class SignInController:
 class RefreshSessionController:
     @classmethod
     def on_post(cls, req, resp):
-        req_body = AuthSessionRefreshSchema().load(req.text)
+        req_body = compiled_load(AuthSessionRefreshSchema)(req.text)
         refresh_token, device_id = cls._get_refresh_credentials(req_body, req)
 
         if not refresh_token or not device_id:
@@ -166,7 +172,7 @@ class RefreshSessionController:
 class SignOutSessionController:
     @classmethod
     def on_post(cls, req, resp):
-        req_body = SignOutSessionSchema().load(req.text)
+        req_body = compiled_load(SignOutSessionSchema)(req.text)
 
         db_session: Session = req.context["db_session"]
         message_bus: MessageBusABC = req.context["message_bus"]
@@ -193,15 +199,17 @@ class SignOutSessionController:
 class RegistrationController:
     @classmethod
     def on_post(cls, req, resp):
-        req_body = RegistrationSchema().load(req.text)
+        req_body = compiled_load(RegistrationSchema)(req.text)
 
         db_session: Session = req.context["db_session"]
         message_bus: MessageBusABC = req.context["message_bus"]
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         users_repo = SAUsersRepo(db_session)
 
         registration_service = RegistrationService(
             users_repo=users_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
@@ -218,5 +226,5 @@ class RegistrationController:
         )
 
         resp.text = {
-            "user": UserDumpSchema().dump(user)
+            "user": compiled_dump(UserDumpSchema)(user)
         }
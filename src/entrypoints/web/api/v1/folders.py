@@ -1,10 +1,20 @@
 from sqlalchemy.orm import Session
 from src.entrypoints.web.api.v1 import api_resource
 from src.entrypoints.web.lib.decorators import auth_required
+from src.entrypoints.web.lib.apicache import APICache
+from src.entrypoints.web.lib.conditional import conditional, make_version_etag
 from src.entrypoints.web.errors.folder import (
     HTTPFolderNotFound,
     HTTPFolderCreationError,
     HTTPFolderUpdateError,
+    HTTPFolderRestoreError,
+)
+from src.entrypoints.web.errors.base import HTTPInvalidCursor
+
+from src.lib.pagination import (
+    InvalidCursorError,
+    RedisCountCache,
+    DEFAULT_PAGE_SIZE,
 )
 
 from src.repositories.folders import SAFoldersRepo
@@ -24,17 +34,27 @@ from src.services.folders.remover import (
     FolderRemoveError
 )
 
+from src.services.folders.restorer import (
+    FolderRestorer,
+    FolderRestoreError,
+)
+
 from src.schemas.folder import (
     FolderDumpSchema,
+    FolderDetailDumpSchema,
     FolderCreationSchema,
     FolderByIdParamsSchema,
     FolderUpdateSchema,
     FoldersCollectionParamsSchema,
+    folders_tree_dump,
 )
+from src.schemas.base import keyset_pagination_dump
+from src.schemas.compiler import compiled_dump, compiled_load
 
 from src.message_bus import MessageBusABC
+from src.repositories.outbox import OutboxRepoABC
 
-from src.models.user import User
+from src.lib.principals_cache import Principal
 
 from logging import getLogger
 
@@ -45,65 +65,138 @@ logger = getLogger(__name__)
 class FoldersCollectionHTTPController:
     @classmethod
     @auth_required()
+    @conditional()
+    @APICache.cached(
+        timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:folders"], last_modified=True,
+    )
     def on_get(cls, req, resp):
-        req_params = FoldersCollectionParamsSchema().load(req.params)
+        req_params = compiled_load(FoldersCollectionParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
 
         folders_repo = SAFoldersRepo(db_session)
 
+        if FoldersCollectionParamsSchema.is_paginated(req_params):
+            cls._on_get_page(req, resp, req_params, folders_repo, current_user)
+            return
+
         folders = folders_repo.list(
             title=req_params["title"],
             user_id=current_user.id,
             parent_id=req_params["parent_id"],
+            profile="list_view",
         )
 
-        folder_dump_schema = FolderDumpSchema()
+        dump_folder = compiled_dump(FolderDumpSchema)
 
         result = []
 
         for folder in folders:
             result.append({
-                "folder": folder_dump_schema.dump(folder)
+                "folder": dump_folder(folder)
             })
 
         resp.text = result
 
+    @classmethod
+    def _on_get_page(cls, req, resp, req_params: dict, folders_repo: SAFoldersRepo, current_user: Principal):
+        try:
+            pagination = folders_repo.paginate(
+                page_size=req_params["page_size"] or DEFAULT_PAGE_SIZE,
+                cursor=req_params["cursor"],
+                order_by=req_params["order_by"],
+                with_total=req_params["with_total"],
+                count_cache=RedisCountCache(req.context["redis"]),
+                title=req_params["title"],
+                parent_id=req_params["parent_id"],
+                user_id=current_user.id,
+                profile="list_view",
+            )
+        except InvalidCursorError:
+            raise HTTPInvalidCursor
+
+        dump_folder = compiled_dump(FolderDumpSchema)
+
+        result = []
+
+        for folder in pagination.items:
+            result.append({
+                "folder": dump_folder(folder)
+            })
+
+        resp.text = keyset_pagination_dump(result, pagination)
+
+
+@api_resource("/folders/tree")
+class FoldersTreeHTTPController:
+    @classmethod
+    @auth_required()
+    @conditional()
+    @APICache.cached(
+        timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:folders"], last_modified=True,
+    )
+    def on_get(cls, req, resp):
+        current_user: Principal = req.context.get("current_user")
+        db_session: Session = req.context.get("db_session")
+
+        folders_repo = SAFoldersRepo(db_session)
+
+        folders = folders_repo.get_tree(user_id=current_user.id)
+
+        resp.text = {
+            "folders": folders_tree_dump(folders),
+        }
+
+
+def _folder_version(req):
+    # If-None-Match of the folder is answered by its row, without the relationships and the dump
+    req_params = compiled_load(FolderByIdParamsSchema)(req.params)
+    current_user = req.context.get("current_user")
+    folders_repo = SAFoldersRepo(req.context.get("db_session"))
+
+    updated = folders_repo.get_updated(id_=req_params["folder_id"], user_id=current_user.id)
+
+    return make_version_etag(req, req_params["folder_id"], updated, ["user:{current_user_id}:folders"])
+
 
 @api_resource("/folder")
 class FolderHTTPController:
     @classmethod
     @auth_required()
+    @conditional(version=_folder_version)
+    @APICache.cached(timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:folders"])
     def on_get(cls, req, resp):
-        req_params = FolderByIdParamsSchema().load(req.params)
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
 
         folders_repo = SAFoldersRepo(db_session)
 
-        folder = folders_repo.get(id_=req_params["folder_id"], user_id=current_user.id)
+        folder = folders_repo.get(id_=req_params["folder_id"], user_id=current_user.id, profile="detail_view")
 
         if folder is None:
             raise HTTPFolderNotFound
 
         resp.text = {
-            "folder": FolderDumpSchema().dump(folder)
+            "folder": compiled_dump(FolderDetailDumpSchema)(folder)
         }
 
     @classmethod
     @auth_required()
     def on_post(cls, req, resp):
-        req_body = FolderCreationSchema().load(req.text)
+        req_body = compiled_load(FolderCreationSchema)(req.text)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         folders_repo = SAFoldersRepo(db_session)
         creator = FolderCreator(
             folders_repo=folders_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
@@ -123,18 +216,19 @@ class FolderHTTPController:
         )
 
         resp.text = {
-            "folder": FolderDumpSchema().dump(folder)
+            "folder": compiled_dump(FolderDumpSchema)(folder)
         }
 
     @classmethod
     @auth_required()
     def on_patch(cls, req, resp):
-        req_params = FolderByIdParamsSchema().load(req.params)
-        req_body = FolderUpdateSchema().load(req.text)
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
+        req_body = compiled_load(FolderUpdateSchema)(req.text)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         folders_repo = SAFoldersRepo(db_session)
 
@@ -145,6 +239,7 @@ class FolderHTTPController:
 
         updater = FolderUpdater(
             folders_repo=folders_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
@@ -153,8 +248,8 @@ class FolderHTTPController:
                 folder=folder,
                 user_id=current_user.id,
             )
-        except FolderUpdateError:
-            raise HTTPFolderUpdateError
+        except FolderUpdateError as e:
+            raise HTTPFolderUpdateError(message=e.message)
 
         db_session.commit()
 
@@ -163,17 +258,18 @@ class FolderHTTPController:
         )
 
         resp.text = {
-            "folder": FolderDumpSchema().dump(folder)
+            "folder": compiled_dump(FolderDumpSchema)(folder)
         }
 
     @classmethod
     @auth_required()
     def on_delete(cls, req, resp):
-        req_params = FolderByIdParamsSchema().load(req.params)
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         folders_repo = SAFoldersRepo(db_session)
 
@@ -184,6 +280,7 @@ class FolderHTTPController:
 
         remover = FolderRemover(
             folders_repo=folders_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
@@ -199,3 +296,46 @@ class FolderHTTPController:
         message_bus.batch_handle(
             remover.get_events(),
         )
+
+
+@api_resource("/folder/restore")
+class FolderRestoreHTTPController:
+    @classmethod
+    @auth_required()
+    def on_post(cls, req, resp):
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: Session = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
+
+        folders_repo = SAFoldersRepo(db_session)
+
+        folder = folders_repo.get(id_=req_params["folder_id"], user_id=current_user.id, with_deleted=True)
+
+        if folder is None:
+            raise HTTPFolderNotFound
+
+        restorer = FolderRestorer(
+            folders_repo=folders_repo,
+            outbox_repo=outbox_repo,
+        )
+
+        try:
+            restorer.restore(
+                folder=folder,
+                user_id=current_user.id,
+            )
+        except FolderRestoreError as e:
+            raise HTTPFolderRestoreError(message=e.message)
+
+        db_session.commit()
+
+        message_bus.batch_handle(
+            restorer.get_events(),
+        )
+
+        resp.text = {
+            "folder": compiled_dump(FolderDumpSchema)(folder)
+        }
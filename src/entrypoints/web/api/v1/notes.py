@@ -1,18 +1,30 @@
 from sqlalchemy.orm import Session
 from src.entrypoints.web.api.v1 import api_resource
 from src.entrypoints.web.lib.decorators import auth_required
+from src.entrypoints.web.lib.apicache import APICache
+from src.entrypoints.web.lib.conditional import conditional, make_version_etag
 from src.entrypoints.web.errors.note import (
     HTTPNoteNotFound,
     HTTPNoteCreationError,
     HTTPNoteUpdateError,
     HTTPNoteRelationCreationError,
+    HTTPNoteBatchError,
 )
 from src.entrypoints.web.errors.folder import (
     HTTPFolderNotFound,
 )
+from src.entrypoints.web.errors.base import HTTPInvalidCursor
+
+from src.lib.pagination import (
+    InvalidCursorError,
+    RedisCountCache,
+    DEFAULT_PAGE_SIZE,
+)
 
 from src.repositories.folders import SAFoldersRepo
 from src.repositories.notes import SANotesRepo
+from src.repositories.notes_search import SANotesSearchRepo
+from src.repositories.notes_graph import SANoteGraphRepo
 
 from src.services.notes.creator import (
     NoteCreator,
@@ -43,18 +55,27 @@ from src.services.notes.relation_remover import (
 
 from src.schemas.note import (
     NoteDumpSchema,
+    NoteBriefDumpSchema,
+    NoteDetailDumpSchema,
+    NotesBatchSchema,
     NoteCreationInputSchema,
     NoteUpdateSchema,
     NoteByIdParamsSchema,
     NotesCollectionParamsSchema,
+    NotesSearchParamsSchema,
+    NoteGraphParamsSchema,
+    NoteGraphNodeDumpSchema,
     NoteRelationCreationBodySchema,
     NoteRelationCreationParamsSchema,
     NoteRelationRemoveParamsSchema,
 )
+from src.schemas.base import keyset_pagination_dump
+from src.schemas.compiler import compiled_dump, compiled_load
 
 from src.message_bus import MessageBusABC
+from src.repositories.outbox import OutboxRepoABC
 
-from src.models.user import User
+from src.lib.principals_cache import Principal
 
 from logging import getLogger
 
@@ -65,62 +86,308 @@ logger = getLogger(__name__)
 class NotesCollectionHTTPController:
     @classmethod
     @auth_required()
+    @conditional()
+    @APICache.cached(
+        timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:notes"], last_modified=True,
+    )
     def on_get(cls, req, resp):
-        req_params = NotesCollectionParamsSchema().load(req.params)
+        req_params = compiled_load(NotesCollectionParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
 
         notes_repo = SANotesRepo(db_session)
 
+        if NotesCollectionParamsSchema.is_paginated(req_params):
+            cls._on_get_page(req, resp, req_params, notes_repo, current_user)
+            return
+
         notes = notes_repo.list(
             title=req_params["title"],
             by_folder=req_params["by_folder"],
             folder_id=req_params["folder_id"],
             user_id=current_user.id,
+            profile="list_view",
         )
 
-        note_dump_schema = NoteDumpSchema()
+        dump_note = compiled_dump(NoteDumpSchema)
 
         result = []
 
         for note in notes:
             result.append({
-                "note": note_dump_schema.dump(note)
+                "note": dump_note(note)
             })
 
         resp.text = result
 
+    @classmethod
+    def _on_get_page(cls, req, resp, req_params: dict, notes_repo: SANotesRepo, current_user: Principal):
+        try:
+            pagination = notes_repo.paginate(
+                page_size=req_params["page_size"] or DEFAULT_PAGE_SIZE,
+                cursor=req_params["cursor"],
+                order_by=req_params["order_by"],
+                with_total=req_params["with_total"],
+                count_cache=RedisCountCache(req.context["redis"]),
+                title=req_params["title"],
+                by_folder=req_params["by_folder"],
+                folder_id=req_params["folder_id"],
+                user_id=current_user.id,
+                profile="list_view",
+            )
+        except InvalidCursorError:
+            raise HTTPInvalidCursor
+
+        dump_note = compiled_dump(NoteDumpSchema)
+
+        result = []
+
+        for note in pagination.items:
+            result.append({
+                "note": dump_note(note)
+            })
+
+        resp.text = keyset_pagination_dump(result, pagination)
+
+
+@api_resource("/notes/search")
+class NotesSearchHTTPController:
+    @classmethod
+    @auth_required()
+    @conditional()
+    @APICache.cached(
+        timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:notes"], last_modified=True,
+    )
+    def on_get(cls, req, resp):
+        req_params = compiled_load(NotesSearchParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: Session = req.context.get("db_session")
+
+        search_repo = SANotesSearchRepo(db_session)
+
+        try:
+            pagination = search_repo.search(
+                query=req_params["query"],
+                page_size=req_params["page_size"] or DEFAULT_PAGE_SIZE,
+                cursor=req_params["cursor"],
+                with_total=req_params["with_total"],
+                count_cache=RedisCountCache(req.context["redis"]),
+                user_id=current_user.id,
+                profile="list_view",
+            )
+
+            notes = pagination.items
+        except InvalidCursorError:
+            raise HTTPInvalidCursor
+
+        snippets = search_repo.get_snippets(
+            query=req_params["query"],
+            notes_ids=[note.id for note in notes],
+        )
+
+        dump_note = compiled_dump(NoteDumpSchema)
+
+        result = []
+
+        for note in notes:
+            result.append({
+                "note": dump_note(note),
+                "snippet": snippets.get(note.id),
+            })
+
+        resp.text = keyset_pagination_dump(result, pagination)
+
+
+@api_resource("/notes/graph")
+class NoteGraphHTTPController:
+    @classmethod
+    @auth_required()
+    @conditional()
+    @APICache.cached(
+        timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:notes"], last_modified=True,
+    )
+    def on_get(cls, req, resp):
+        req_params = compiled_load(NoteGraphParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: Session = req.context.get("db_session")
+
+        graph_repo = SANoteGraphRepo(db_session)
+
+        nodes = graph_repo.get_graph(
+            root_note_id=req_params["note_id"],
+            depth=req_params["depth"],
+            user_id=current_user.id,
+        )
+
+        if not nodes:
+            raise HTTPNoteNotFound
+
+        dump_node = compiled_dump(NoteGraphNodeDumpSchema)
+
+        resp.text = {
+            "root_note_id": str(req_params["note_id"]),
+            "depth": req_params["depth"],
+            "nodes": [dump_node(node) for node in nodes],
+        }
+
+
+@api_resource("/notes/batch")
+class NotesBatchHTTPController:
+    @classmethod
+    @auth_required()
+    def on_post(cls, req, resp):
+        operations = compiled_load(NotesBatchSchema)(req.text)["operations"]
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: Session = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
+
+        folders_repo = SAFoldersRepo(db_session)
+        notes_repo = SANotesRepo(db_session)
+
+        # notes and folders of all operations are loaded by two queries
+        notes = {
+            note.id: note for note in notes_repo.get_many(
+                ids_=list({operation["note_id"] for operation in operations if "note_id" in operation}),
+                user_id=current_user.id,
+            )
+        }
+        folders = {
+            folder.id: folder for folder in folders_repo.get_many(
+                ids_=list({operation["folder_id"] for operation in operations if operation.get("folder_id")}),
+                user_id=current_user.id,
+            )
+        }
+
+        creator = NoteCreator(notes_repo=notes_repo, outbox_repo=outbox_repo)
+        updater = NoteUpdater(folders_repo=folders_repo, outbox_repo=outbox_repo)
+        remover = NoteRemover(notes_repo=notes_repo, outbox_repo=outbox_repo)
+
+        services = {"create": creator, "update": updater, "move": updater, "delete": remover}
+
+        processed = []
+        # events are published in the order of operations
+        events_ = []
+        # index of the operation that removed the note
+        removed = {}
+
+        for index, operation in enumerate(operations):
+            op = operation.pop("op")
+            note_id = operation.pop("note_id", None)
+            folder_id = operation.pop("folder_id", None)
+
+            folder = folders.get(folder_id)
+            note = notes.get(note_id)
+
+            if folder_id and folder is None:
+                raise HTTPNoteBatchError(index=index, message=f"Folder (uuid={str(folder_id)}) not found")
+
+            if op != "create" and note is None:
+                raise HTTPNoteBatchError(index=index, message=f"Note (uuid={str(note_id)}) not found")
+
+            if note_id in removed:
+                raise HTTPNoteBatchError(
+                    index=index, message=f"Note (uuid={str(note_id)}) is removed by operation {removed[note_id]}",
+                )
+
+            service = services[op]
+            published = len(service.get_events())
+
+            try:
+                if op == "create":
+                    note = creator.create(
+                        data=NoteCreationInput(**operation),
+                        folder=folder,
+                        user_id=current_user.id,
+                    )
+                elif op in ("update", "move"):
+                    note = updater.update(
+                        # move passes folder_id, so null moves the note to the root
+                        data={**operation, "folder_id": folder_id} if op == "move" else operation,
+                        note=note,
+                        user_id=current_user.id,
+                        folder=folder,
+                    )
+                else:
+                    remover.remove(
+                        note=note,
+                        user_id=current_user.id,
+                    )
+                    removed[note_id] = index
+            except (NoteCreationError, NoteUpdateError, NoteRemoveError) as e:
+                raise HTTPNoteBatchError(index=index, message=e.message)
+
+            events_.extend(service.get_events()[published:])
+            processed.append((op, note.id, note))
+
+        # pending notes are written by batched INSERT/UPDATE statements
+        db_session.commit()
+
+        message_bus.batch_handle(events_)
+
+        # committed notes are expired, reload them by one query instead of a query per note
+        notes_repo.get_many(ids_=list({note_id for _, note_id, _ in processed}), with_deleted=True)
+
+        dump_note = compiled_dump(NoteBriefDumpSchema)
+
+        result = []
+
+        for op, note_id, note in processed:
+            if op == "delete":
+                result.append({"op": op, "note_id": str(note_id)})
+            else:
+                result.append({"op": op, "note": dump_note(note)})
+
+        resp.text = result
+
+
+def _note_version(req):
+    # If-None-Match of the note is answered by its row, without the relationships and the dump
+    req_params = compiled_load(NoteByIdParamsSchema)(req.params)
+    current_user = req.context.get("current_user")
+    notes_repo = SANotesRepo(req.context.get("db_session"))
+
+    updated = notes_repo.get_updated(id_=req_params["note_id"], user_id=current_user.id)
+
+    return make_version_etag(req, req_params["note_id"], updated, ["user:{current_user_id}:notes"])
+
 
 @api_resource("/note")
 class NoteHTTPController:
     @classmethod
     @auth_required()
+    @conditional(version=_note_version)
+    @APICache.cached(timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:notes"])
     def on_get(cls, req, resp):
-        req_params = NoteByIdParamsSchema().load(req.params)
+        req_params = compiled_load(NoteByIdParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
 
         notes_repo = SANotesRepo(db_session)
 
-        note = notes_repo.get(id_=req_params["note_id"], user_id=current_user.id)
+        note = notes_repo.get(id_=req_params["note_id"], user_id=current_user.id, profile="detail_view")
 
         if note is None:
             raise HTTPNoteNotFound
 
         resp.text = {
-            "note": NoteDumpSchema().dump(note)
+            "note": compiled_dump(NoteDetailDumpSchema)(note)
         }
 
     @classmethod
     @auth_required()
     def on_post(cls, req, resp):
-        req_body = NoteCreationInputSchema().load(req.text)
+        req_body = compiled_load(NoteCreationInputSchema)(req.text)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         folders_repo = SAFoldersRepo(db_session)
         notes_repo = SANotesRepo(db_session)
@@ -134,7 +401,7 @@ class NoteHTTPController:
             if folder is None:
                 raise HTTPFolderNotFound
 
-        creator = NoteCreator(notes_repo=notes_repo)
+        creator = NoteCreator(notes_repo=notes_repo, outbox_repo=outbox_repo)
 
         try:
             note = creator.create(
@@ -154,18 +421,19 @@ class NoteHTTPController:
         )
 
         resp.text = {
-            "note": NoteDumpSchema().dump(note)
+            "note": compiled_dump(NoteDumpSchema)(note)
         }
 
     @classmethod
     @auth_required()
     def on_patch(cls, req, resp):
-        req_params = NoteByIdParamsSchema().load(req.params)
-        req_body = NoteUpdateSchema().load(req.text)
+        req_params = compiled_load(NoteByIdParamsSchema)(req.params)
+        req_body = compiled_load(NoteUpdateSchema)(req.text)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         folders_repo = SAFoldersRepo(db_session)
         notes_repo = SANotesRepo(db_session)
@@ -177,6 +445,7 @@ class NoteHTTPController:
 
         updater = NoteUpdater(
             folders_repo=folders_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
@@ -195,17 +464,18 @@ class NoteHTTPController:
         )
 
         resp.text = {
-            "note": NoteDumpSchema().dump(note)
+            "note": compiled_dump(NoteDumpSchema)(note)
         }
 
     @classmethod
     @auth_required()
     def on_delete(cls, req, resp):
-        req_params = NoteByIdParamsSchema().load(req.params)
+        req_params = compiled_load(NoteByIdParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         notes_repo = SANotesRepo(db_session)
 
@@ -215,7 +485,8 @@ class NoteHTTPController:
             return
 
         remover = NoteRemover(
-            notes_repo=notes_repo
+            notes_repo=notes_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
@@ -238,12 +509,13 @@ class NoteRelationHTTPController:
     @classmethod
     @auth_required()
     def on_patch(cls, req, resp):
-        req_params = NoteRelationCreationParamsSchema().load(req.params)
-        req_body = NoteRelationCreationBodySchema().load(req.text)
+        req_params = compiled_load(NoteRelationCreationParamsSchema)(req.params)
+        req_body = compiled_load(NoteRelationCreationBodySchema)(req.text)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         notes_repo = SANotesRepo(db_session)
 
@@ -257,7 +529,7 @@ class NoteRelationHTTPController:
         if child_note is None:
             raise HTTPNoteNotFound(id_=req_params["child_note_id"])
 
-        relation_creator = NoteRelationCreator()
+        relation_creator = NoteRelationCreator(outbox_repo=outbox_repo)
 
         try:
             parent_note = relation_creator.create(
@@ -278,17 +550,18 @@ class NoteRelationHTTPController:
         )
 
         resp.text = {
-            "note": NoteDumpSchema().dump(parent_note)
+            "note": compiled_dump(NoteDumpSchema)(parent_note)
         }
 
     @classmethod
     @auth_required()
     def on_delete(cls, req, resp):
-        req_params = NoteRelationRemoveParamsSchema().load(req.params)
+        req_params = compiled_load(NoteRelationRemoveParamsSchema)(req.params)
 
-        current_user: User = req.context.get("current_user")
+        current_user: Principal = req.context.get("current_user")
         db_session: Session = req.context.get("db_session")
         message_bus: MessageBusABC = req.context.get("message_bus")
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         notes_repo = SANotesRepo(db_session)
 
@@ -302,7 +575,7 @@ class NoteRelationHTTPController:
         if child_note is None:
             raise HTTPNoteNotFound(id_=req_params["child_note_id"])
 
-        relation_remover = NoteRelationRemover()
+        relation_remover = NoteRelationRemover(outbox_repo=outbox_repo)
 
         try:
             parent_note = relation_remover.remove(
@@ -320,5 +593,5 @@ class NoteRelationHTTPController:
         )
 
         resp.text = {
-            "note": NoteDumpSchema().dump(parent_note)
+            "note": compiled_dump(NoteDumpSchema)(parent_note)
         }
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from src.entrypoints.web.api.v1 import api_resource
 from src.entrypoints.web.lib.decorators import auth_required
+from src.entrypoints.web.lib.apicache import APICache
+from src.entrypoints.web.lib.rate_limit import rate_limited
 from src.entrypoints.web.errors.user import (
     HTTPPasswordChangingError,
 )
@@ -12,6 +14,7 @@ from src.schemas.user import (
     PasswordChangeRequestByEmailSchema,
     CurrentUserChangePasswordSchema,
 )
+from src.schemas.compiler import compiled_dump, compiled_load
 from src.lib.hashing import TokenEncoder
 
 from src.services.password_change import (
@@ -25,6 +28,7 @@ from src.repositories.users import SAUsersRepo
 from src.repositories.auth_sessions import SAAuthSessionsRepo
 
 from src.message_bus import MessageBusABC
+from src.repositories.outbox import OutboxRepoABC
 
 from logging import getLogger
 
@@ -35,11 +39,12 @@ logger = getLogger(__name__)
 class CurrentUserController:
     @classmethod
     @auth_required()
+    @APICache.cached(timeout=APICache.DEFAULT_TIMEOUT, tags_templates=["user:{current_user_id}:user"])
     def on_get(cls, req, resp):
         current_user = req.context.get("current_user")
 
         resp.text = {
-            "user": CurrentUserDumpSchema().dump(current_user)
+            "user": compiled_dump(CurrentUserDumpSchema)(current_user)
         }
 
 
@@ -51,20 +56,29 @@ class CurrentUserChangePasswordController:
         current_user = req.context.get("current_user")
         db_session: Session = req.context["db_session"]
         message_bus: MessageBusABC = req.context["message_bus"]
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
-        req_body = CurrentUserChangePasswordSchema().load(req.text)
+        req_body = compiled_load(CurrentUserChangePasswordSchema)(req.text)
 
         token_encoder = TokenEncoder()
+        users_repo = SAUsersRepo(db_session)
+
+        # the auth middleware gives a cached principal, the password is changed on the user itself
+        user = users_repo.get(current_user.id)
+
+        # the relay passes the same kwargs to the handlers as the message bus in the request
+        handler_kwargs = dict(user_id=current_user.id, object_id=current_user.id)
 
         password_changer = PasswordChanger(
             tokens_repo=SAPasswordChangeTokensRepo(db_session, encoder=token_encoder),
-            users_repo=SAUsersRepo(db_session),
+            users_repo=users_repo,
             auth_sessions_repo=SAAuthSessionsRepo(db_session, encoder=token_encoder),
+            outbox_repo=outbox_repo.with_handler_kwargs(**handler_kwargs) if outbox_repo else None,
         )
 
         try:
             password_changer.change_by_password(
-                user=current_user,
+                user=user,
                 current_password=req_body["current_password"],
                 new_password=req_body["new_password"],
             )
@@ -78,19 +92,20 @@ class CurrentUserChangePasswordController:
 
         message_bus.batch_handle(
             password_changer.get_events(),
-            user_id=current_user.id,
-            object_id=current_user.id,
+            **handler_kwargs,
         )
 
 
 @api_resource("/user/change-password-request")
 class ChangePasswordRequest:
     @classmethod
+    @rate_limited(limit=5, interval=600)
     def on_post(cls, req, resp):
-        req_body = PasswordChangeRequestByEmailSchema().load(req.text)
+        req_body = compiled_load(PasswordChangeRequestByEmailSchema)(req.text)
 
         db_session: Session = req.context["db_session"]
         message_bus: MessageBusABC = req.context["message_bus"]
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         users_repo = SAUsersRepo(db_session)
 
@@ -104,7 +119,8 @@ class ChangePasswordRequest:
 
         token_creator = PasswordChangeTokenCreator(
             encoder=encoder,
-            password_change_tokens_repo=tokens_repo
+            password_change_tokens_repo=tokens_repo,
+            outbox_repo=outbox_repo,
         )
 
         token_creator.make(user=user)
@@ -120,11 +136,12 @@ class ChangePasswordRequest:
 class UserChangePasswordController:
     @classmethod
     def on_post(cls, req, resp):
-        req_params = PasswordChangeParamsSchema().load(req.params)
-        req_body = PasswordChangeBodySchema().load(req.text)
+        req_params = compiled_load(PasswordChangeParamsSchema)(req.params)
+        req_body = compiled_load(PasswordChangeBodySchema)(req.text)
 
         db_session: Session = req.context["db_session"]
         message_bus: MessageBusABC = req.context["message_bus"]
+        outbox_repo: OutboxRepoABC = req.context.get("outbox_repo")
 
         token_encoder = TokenEncoder()
         tokens_repo = SAPasswordChangeTokensRepo(db_session, token_encoder)
@@ -134,7 +151,8 @@ class UserChangePasswordController:
         password_changer = PasswordChanger(
             tokens_repo=tokens_repo,
             users_repo=users_repo,
-            auth_sessions_repo=auth_sessions_repo
+            auth_sessions_repo=auth_sessions_repo,
+            outbox_repo=outbox_repo,
         )
 
         try:
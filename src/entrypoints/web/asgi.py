@@ -1,13 +1,15 @@
 import os
+import atexit
+import redis
 import falcon
 import falcon.asgi
-import venusian
 import logging
 
-from typing import Type
+from typing import Type, Optional
+from redis.asyncio import Redis
 
 from config import Config
-from src.message_bus import make_message_bus, MessageBusABC
+from src.message_bus import make_async_message_bus, MessageBusABC
 
 from src.entrypoints.web.async_middleware.database import DatabaseMiddleware
 from src.entrypoints.web.async_middleware.config_middleware import ConfigMiddleware
@@ -17,6 +19,9 @@ from src.entrypoints.web.async_middleware.message_bus import MessageBudsMiddlewa
 from .middleware.cors_middleware import CORSMiddleware
 
 from src.models.meta import async_session_factory, Base
+from src.lib.json_codec import make_json_codec
+from src.lib.principals_cache import AsyncRedisPrincipalsCache, LocalPrincipalsCache
+from src.lib.apicache import AsyncAPICacheStorage
 
 from src.entrypoints.web.errors.base import (
     async_no_result_found_handler,
@@ -29,7 +34,9 @@ from marshmallow import ValidationError
 
 from src import models
 from src import schemas
-from src.entrypoints.web import api
+from src.schemas.compiler import preload_schemas
+from src.entrypoints.web import async_api
+from src.entrypoints.web.lib.routes import add_routes
 
 
 class AppLogFilter(logging.Filter):
@@ -45,18 +52,22 @@ def make_app(
 ) -> falcon.asgi.App:
     _init_environment(config)
 
+    db_sessionmaker, db_engine = async_session_factory(config)
+    redis_ = _make_redis(config)
+    principals_cache = _make_principals_cache(config, redis_)
+
     if not message_bus:
-        message_bus = make_message_bus(config)
+        # the responses cached by the WSGI app are dropped on the changes made here
+        message_bus = make_async_message_bus(config, db_sessionmaker, principals_cache, AsyncAPICacheStorage(redis_))
 
-    db_sessionmaker, db_engine = async_session_factory(config)
     Base.metadata.bind = db_engine
 
     middlewares = [
         ConfigMiddleware(config),
         DatabaseMiddleware(config, db_engine, db_sessionmaker),
         MessageBudsMiddleware(message_bus),
-        AuthMiddleware(config),
-        EncodeMiddleware(),
+        AuthMiddleware(config, principals_cache),
+        EncodeMiddleware(make_json_codec(config.json_codec), config.max_request_body_size),
     ]
 
     if config.is_cors_enable:
@@ -72,14 +83,48 @@ def make_app(
     app.add_error_handler(NoResultFound, async_no_result_found_handler)
     app.add_error_handler(Exception, async_base_exception)
 
-    venusian.Scanner().scan(schemas)
-    venusian.Scanner(api=app).scan(api)
+    add_routes(app, async_api)
+    preload_schemas(schemas)
 
     os.environ['PYTHON_EGG_CACHE'] = os.path.dirname(os.path.abspath(__file__)) + '/.cache'
 
     return app
 
 
+def _make_redis(config: Type[Config]) -> Redis:
+    return Redis(
+        host=config.redis_host,
+        port=config.redis_port,
+        db=config.redis_db,
+        password=config.redis_password,
+        socket_connect_timeout=10,
+    )
+
+
+def _make_principals_cache(config: Type[Config], redis_: Redis) -> Optional[AsyncRedisPrincipalsCache]:
+    if not config.is_principals_cache_enabled:
+        return None
+
+    principals_cache = AsyncRedisPrincipalsCache(
+        redis_,
+        ttl=config.principals_cache_ttl,
+        local_cache=LocalPrincipalsCache(
+            max_size=config.principals_cache_local_size,
+            ttl=config.principals_cache_local_ttl,
+        ),
+        invalidations_redis=redis.Redis(
+            host=config.redis_host,
+            port=config.redis_port,
+            db=config.redis_db,
+            password=config.redis_password,
+            socket_connect_timeout=10,
+        ),
+    )
+    atexit.register(principals_cache.close)
+
+    return principals_cache
+
+
 def _init_environment(config: Type[Config]):
     root_logger = logging.getLogger()
     root_logger.addFilter(AppLogFilter())
@@ -87,4 +132,4 @@ def _init_environment(config: Type[Config]):
     logger.format = logging.Formatter(config.logger_format)
     logger.setLevel(config.log_level)
 
-    venusian.Scanner().scan(models)
+    models.import_models()
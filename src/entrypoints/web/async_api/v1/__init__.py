@@ -0,0 +1,8 @@
+# controllers of falcon.asgi.App, routes are the same as of the WSGI api package
+from src.entrypoints.web.api.v1 import PREFIX, url, api_resource
+
+__all__ = [
+    PREFIX,
+    url,
+    api_resource,
+]
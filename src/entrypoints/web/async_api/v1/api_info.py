@@ -0,0 +1,31 @@
+import logging
+import json
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.entrypoints.web.async_api.v1 import api_resource
+from src import app_globals
+
+logger = logging.getLogger(__name__)
+
+
+@api_resource("/api-info")
+class APIInfo:
+    @classmethod
+    async def on_get(cls, req, resp):
+        config = req.context["config"]
+        db_session: AsyncSession = req.context["db_session"]
+
+        db_connection_active = False
+
+        try:
+            await db_session.execute(sa.text("SELECT 1;"))
+            db_connection_active = True
+        except Exception as e:
+            logger.exception(e)
+            pass
+
+        resp.text = json.dumps({
+            "name": config.app_name,
+            "version": app_globals.api_version,
+            "db_connection_active": db_connection_active
+        })
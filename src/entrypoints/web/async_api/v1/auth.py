@@ -0,0 +1,148 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.message_bus import MessageBusABC
+from src.entrypoints.web.async_api.v1 import api_resource
+from src.entrypoints.web.api.v1.auth import (
+    SignInController as SyncSignInController,
+    RefreshSessionController as SyncRefreshSessionController,
+)
+from src.entrypoints.web.lib.message_bus import async_batch_handle
+from src.services.auth import (
+    TokenSessionMaker,
+    AuthSessionInput,
+    TokenSessionRefresher,
+    RefreshSessionInput,
+    AuthSessionRefreshError,
+)
+from src.repositories.auth_sessions import SAAuthSessionsRepo, AsyncSAAuthSessionsRepo
+from src.repositories.users import SAUsersRepo, AsyncSAUsersRepo
+from src.schemas.auth import (
+    UserAuthSchema,
+    AuthSessionRefreshSchema,
+    SignOutSessionSchema,
+)
+from src.schemas.compiler import compiled_load
+from src.lib.hashing import PasswordEncoder, TokenEncoder
+from src.lib.utils import run_in_thread
+from src.entrypoints.web.errors.base import (
+    HTTPUnauthorized,
+    HTTPWrongCredentials,
+)
+from src.message_bus import events
+
+
+@api_resource("/auth/sign-in")
+class SignInController:
+    @classmethod
+    async def on_post(cls, req, resp):
+        req_body = compiled_load(UserAuthSchema)(req.text)
+
+        db_session: AsyncSession = req.context["db_session"]
+
+        users_repo = AsyncSAUsersRepo(db_session)
+
+        user = await users_repo.get_by_email(req_body["email"])
+
+        # bcrypt takes tens of milliseconds of CPU, it is checked in a worker thread not to stall other requests
+        if user is None or not await run_in_thread(
+            PasswordEncoder().validate,
+            req_body["password"],
+            user.password,
+        ):
+            raise HTTPWrongCredentials
+
+        device_data = SyncSignInController.get_device_data(req, req_body)
+
+        session_maker = TokenSessionMaker(
+            sessions_repo=SAAuthSessionsRepo(
+                db_session.sync_session,
+                TokenEncoder(),
+            ),
+            encoder=TokenEncoder(),
+            config=req.context["config"],
+        )
+
+        session = await db_session.run_sync(
+            lambda _: session_maker.make(
+                AuthSessionInput(
+                    user_id=user.id,
+                    credential_version=user.credential_version,
+                    device_id=device_data["device_id"],
+                    device_type=device_data["device_type"],
+                    device_name=device_data["device_name"],
+                    device_os=device_data["device_os"],
+                    ip=req.remote_addr,
+                )
+            )
+        )
+
+        await db_session.commit()
+
+        resp.text = {
+            "access_token": session.access_token,
+            "refresh_token": session.refresh_token,
+        }
+
+
+@api_resource("/auth/refresh")
+class RefreshSessionController:
+    @classmethod
+    async def on_post(cls, req, resp):
+        req_body = compiled_load(AuthSessionRefreshSchema)(req.text)
+        refresh_token, device_id = SyncRefreshSessionController._get_refresh_credentials(req_body, req)
+
+        if not refresh_token or not device_id:
+            raise HTTPUnauthorized
+
+        db_session: AsyncSession = req.context["db_session"]
+
+        token_encoder = TokenEncoder()
+
+        session_refresher = TokenSessionRefresher(
+            sessions_repo=SAAuthSessionsRepo(db_session.sync_session, token_encoder),
+            users_repo=SAUsersRepo(db_session.sync_session),
+            encoder=token_encoder,
+            config=req.context["config"],
+        )
+
+        try:
+            session = await db_session.run_sync(
+                lambda _: session_refresher.refresh(RefreshSessionInput(
+                    uuid=refresh_token,
+                    device_id=device_id,
+                ))
+            )
+            await db_session.commit()
+        except AuthSessionRefreshError:
+            raise HTTPUnauthorized
+
+        resp.text = {
+            "access_token": session.access_token,
+            "refresh_token": session.refresh_token,
+        }
+
+
+@api_resource("/auth/sign-out")
+class SignOutSessionController:
+    @classmethod
+    async def on_post(cls, req, resp):
+        req_body = compiled_load(SignOutSessionSchema)(req.text)
+
+        db_session: AsyncSession = req.context["db_session"]
+        message_bus: MessageBusABC = req.context["message_bus"]
+
+        refresh_token = req_body.get("refresh_token")
+
+        if not refresh_token:
+            raise HTTPUnauthorized
+
+        sessions_repo = AsyncSAAuthSessionsRepo(db_session, TokenEncoder())
+
+        session = await sessions_repo.remove(refresh_token)
+
+        if session:
+            await db_session.commit()
+
+            await async_batch_handle(
+                message_bus,
+                [events.AuthSessionClosed(id=session.id)],
+            )
@@ -0,0 +1,287 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.entrypoints.web.async_api.v1 import api_resource
+from src.entrypoints.web.lib.decorators import async_auth_required
+from src.entrypoints.web.middleware.encode import JSON_CONTENT_TYPE
+from src.entrypoints.web.lib.message_bus import async_batch_handle
+from src.entrypoints.web.errors.folder import (
+    HTTPFolderNotFound,
+    HTTPFolderCreationError,
+    HTTPFolderUpdateError,
+)
+from src.entrypoints.web.errors.base import HTTPInvalidCursor
+
+from src.lib.json_codec import JSONArrayStream
+from src.lib.pagination import (
+    InvalidCursorError,
+    DEFAULT_PAGE_SIZE,
+)
+
+from src.repositories.folders import SAFoldersRepo, AsyncSAFoldersRepo
+from src.services.folders.creator import (
+    FolderCreator,
+    FolderCreationInput,
+    FolderCreationError,
+)
+
+from src.services.folders.updater import (
+    FolderUpdater,
+    FolderUpdateError,
+)
+
+from src.services.folders.remover import (
+    FolderRemover,
+    FolderRemoveError
+)
+
+from src.schemas.folder import (
+    FolderDumpSchema,
+    FolderDetailDumpSchema,
+    FolderCreationSchema,
+    FolderByIdParamsSchema,
+    FolderUpdateSchema,
+    FoldersCollectionParamsSchema,
+    folders_tree_dump,
+)
+from src.schemas.base import keyset_pagination_dump
+from src.schemas.compiler import compiled_dump, compiled_load
+
+from src.message_bus import MessageBusABC
+
+from src.models.folder import Folder
+from src.lib.principals_cache import Principal
+
+from uuid import UUID
+
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+@api_resource("/folders")
+class FoldersCollectionHTTPController:
+    @classmethod
+    @async_auth_required()
+    async def on_get(cls, req, resp):
+        req_params = compiled_load(FoldersCollectionParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+
+        if FoldersCollectionParamsSchema.is_paginated(req_params):
+            await cls._on_get_page(resp, req_params, folders_repo, current_user)
+            return
+
+        folders = await folders_repo.list(
+            title=req_params["title"],
+            user_id=current_user.id,
+            parent_id=req_params["parent_id"],
+            profile="list_view",
+        )
+
+        dump_folder = compiled_dump(FolderDumpSchema)
+
+        # the list is not paginated, it is dumped and sent item by item
+        resp.content_type = JSON_CONTENT_TYPE
+        resp.stream = JSONArrayStream(
+            folders,
+            req.context["json_codec"],
+            dump=lambda folder: {"folder": dump_folder(folder)},
+        )
+
+    @classmethod
+    async def _on_get_page(cls, resp, req_params: dict, folders_repo: AsyncSAFoldersRepo, current_user: Principal):
+        try:
+            pagination = await folders_repo.paginate(
+                page_size=req_params["page_size"] or DEFAULT_PAGE_SIZE,
+                cursor=req_params["cursor"],
+                order_by=req_params["order_by"],
+                with_total=req_params["with_total"],
+                title=req_params["title"],
+                parent_id=req_params["parent_id"],
+                user_id=current_user.id,
+                profile="list_view",
+            )
+        except InvalidCursorError:
+            raise HTTPInvalidCursor
+
+        dump_folder = compiled_dump(FolderDumpSchema)
+
+        result = []
+
+        for folder in pagination.items:
+            result.append({
+                "folder": dump_folder(folder)
+            })
+
+        resp.text = keyset_pagination_dump(result, pagination)
+
+
+@api_resource("/folders/tree")
+class FoldersTreeHTTPController:
+    @classmethod
+    @async_auth_required()
+    async def on_get(cls, req, resp):
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+
+        folders = await folders_repo.get_tree(user_id=current_user.id)
+
+        resp.text = {
+            "folders": folders_tree_dump(folders),
+        }
+
+
+# folder services query the repo while they work (parent lookup, subtree updates),
+# so they run on the sync session behind the async one by AsyncSession.run_sync
+@api_resource("/folder")
+class FolderHTTPController:
+    @classmethod
+    @async_auth_required()
+    async def on_get(cls, req, resp):
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+
+        folder = await folders_repo.get(id_=req_params["folder_id"], user_id=current_user.id, profile="detail_view")
+
+        if folder is None:
+            raise HTTPFolderNotFound
+
+        resp.text = {
+            "folder": compiled_dump(FolderDetailDumpSchema)(folder)
+        }
+
+    @classmethod
+    @async_auth_required()
+    async def on_post(cls, req, resp):
+        req_body = compiled_load(FolderCreationSchema)(req.text)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+
+        creator = FolderCreator(
+            folders_repo=SAFoldersRepo(db_session.sync_session),
+        )
+
+        try:
+            folder = await db_session.run_sync(
+                lambda _: creator.create(
+                    data=FolderCreationInput(
+                        **req_body
+                    ),
+                    user_id=current_user.id,
+                )
+            )
+        except FolderCreationError:
+            raise HTTPFolderCreationError
+
+        await db_session.commit()
+
+        await async_batch_handle(
+            message_bus,
+            creator.get_events(),
+        )
+
+        folder = await cls._reload(db_session, folder, current_user.id)
+
+        resp.text = {
+            "folder": compiled_dump(FolderDumpSchema)(folder)
+        }
+
+    @classmethod
+    @async_auth_required()
+    async def on_patch(cls, req, resp):
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
+        req_body = compiled_load(FolderUpdateSchema)(req.text)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+
+        folder = await folders_repo.get(id_=req_params["folder_id"], user_id=current_user.id)
+
+        if folder is None:
+            raise HTTPFolderNotFound
+
+        updater = FolderUpdater(
+            folders_repo=SAFoldersRepo(db_session.sync_session),
+        )
+
+        try:
+            folder = await db_session.run_sync(
+                lambda _: updater.update(
+                    data=req_body,
+                    folder=folder,
+                    user_id=current_user.id,
+                )
+            )
+        except FolderUpdateError as e:
+            raise HTTPFolderUpdateError(message=e.message)
+
+        await db_session.commit()
+
+        await async_batch_handle(
+            message_bus,
+            updater.get_events(),
+        )
+
+        folder = await cls._reload(db_session, folder, current_user.id)
+
+        resp.text = {
+            "folder": compiled_dump(FolderDumpSchema)(folder)
+        }
+
+    @classmethod
+    @async_auth_required()
+    async def on_delete(cls, req, resp):
+        req_params = compiled_load(FolderByIdParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+
+        folder = await folders_repo.get(id_=req_params["folder_id"], user_id=current_user.id)
+
+        if folder is None:
+            return
+
+        remover = FolderRemover(
+            folders_repo=SAFoldersRepo(db_session.sync_session),
+        )
+
+        try:
+            await db_session.run_sync(
+                lambda _: remover.remove(
+                    folder=folder,
+                    user_id=current_user.id,
+                )
+            )
+        except FolderRemoveError:
+            return
+
+        await db_session.commit()
+
+        await async_batch_handle(
+            message_bus,
+            remover.get_events(),
+        )
+
+    @staticmethod
+    async def _reload(db_session: AsyncSession, folder: Folder, user_id: UUID) -> Folder:
+        # relationships are not lazy loaded under asyncio, the folder is loaded again with the dump profile
+        folder_id = folder.id
+        db_session.expire(folder)
+
+        return await AsyncSAFoldersRepo(db_session).get(id_=folder_id, user_id=user_id, profile="list_view")
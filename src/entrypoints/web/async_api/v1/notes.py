@@ -0,0 +1,289 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.entrypoints.web.async_api.v1 import api_resource
+from src.entrypoints.web.lib.decorators import async_auth_required
+from src.entrypoints.web.middleware.encode import JSON_CONTENT_TYPE
+from src.entrypoints.web.lib.message_bus import async_batch_handle
+from src.entrypoints.web.errors.note import (
+    HTTPNoteNotFound,
+    HTTPNoteCreationError,
+    HTTPNoteUpdateError,
+)
+from src.entrypoints.web.errors.folder import (
+    HTTPFolderNotFound,
+)
+from src.entrypoints.web.errors.base import HTTPInvalidCursor
+
+from src.lib.json_codec import JSONArrayStream
+from src.lib.pagination import (
+    InvalidCursorError,
+    DEFAULT_PAGE_SIZE,
+)
+
+from src.repositories.folders import AsyncSAFoldersRepo
+from src.repositories.notes import AsyncSANotesRepo
+
+from src.services.notes.creator import (
+    NoteCreator,
+    NoteCreationInput,
+    NoteCreationError,
+)
+
+from src.services.notes.updater import (
+    NoteUpdater,
+    NoteUpdateError,
+)
+
+from src.services.notes.remover import (
+    NoteRemover,
+    NoteRemoveError,
+)
+
+from src.schemas.note import (
+    NoteDumpSchema,
+    NoteDetailDumpSchema,
+    NoteCreationInputSchema,
+    NoteUpdateSchema,
+    NoteByIdParamsSchema,
+    NotesCollectionParamsSchema,
+)
+from src.schemas.base import keyset_pagination_dump
+from src.schemas.compiler import compiled_dump, compiled_load
+
+from src.message_bus import MessageBusABC
+
+from src.models.note import Note
+from src.lib.principals_cache import Principal
+
+from uuid import UUID
+
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+@api_resource("/notes")
+class NotesCollectionHTTPController:
+    @classmethod
+    @async_auth_required()
+    async def on_get(cls, req, resp):
+        req_params = compiled_load(NotesCollectionParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+
+        notes_repo = AsyncSANotesRepo(db_session)
+
+        if NotesCollectionParamsSchema.is_paginated(req_params):
+            await cls._on_get_page(resp, req_params, notes_repo, current_user)
+            return
+
+        notes = await notes_repo.list(
+            title=req_params["title"],
+            by_folder=req_params["by_folder"],
+            folder_id=req_params["folder_id"],
+            user_id=current_user.id,
+            profile="list_view",
+        )
+
+        dump_note = compiled_dump(NoteDumpSchema)
+
+        # the list is not paginated, it is dumped and sent item by item
+        resp.content_type = JSON_CONTENT_TYPE
+        resp.stream = JSONArrayStream(
+            notes,
+            req.context["json_codec"],
+            dump=lambda note: {"note": dump_note(note)},
+        )
+
+    @classmethod
+    async def _on_get_page(cls, resp, req_params: dict, notes_repo: AsyncSANotesRepo, current_user: Principal):
+        try:
+            pagination = await notes_repo.paginate(
+                page_size=req_params["page_size"] or DEFAULT_PAGE_SIZE,
+                cursor=req_params["cursor"],
+                order_by=req_params["order_by"],
+                with_total=req_params["with_total"],
+                title=req_params["title"],
+                by_folder=req_params["by_folder"],
+                folder_id=req_params["folder_id"],
+                user_id=current_user.id,
+                profile="list_view",
+            )
+        except InvalidCursorError:
+            raise HTTPInvalidCursor
+
+        dump_note = compiled_dump(NoteDumpSchema)
+
+        result = []
+
+        for note in pagination.items:
+            result.append({
+                "note": dump_note(note)
+            })
+
+        resp.text = keyset_pagination_dump(result, pagination)
+
+
+@api_resource("/note")
+class NoteHTTPController:
+    @classmethod
+    @async_auth_required()
+    async def on_get(cls, req, resp):
+        req_params = compiled_load(NoteByIdParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+
+        notes_repo = AsyncSANotesRepo(db_session)
+
+        note = await notes_repo.get(id_=req_params["note_id"], user_id=current_user.id, profile="detail_view")
+
+        if note is None:
+            raise HTTPNoteNotFound
+
+        resp.text = {
+            "note": compiled_dump(NoteDetailDumpSchema)(note)
+        }
+
+    @classmethod
+    @async_auth_required()
+    async def on_post(cls, req, resp):
+        req_body = compiled_load(NoteCreationInputSchema)(req.text)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+        notes_repo = AsyncSANotesRepo(db_session)
+
+        folder_id = req_body.pop("folder_id", None)
+        folder = None
+
+        if folder_id:
+            folder = await folders_repo.get(id_=folder_id, user_id=current_user.id)
+
+            if folder is None:
+                raise HTTPFolderNotFound
+
+        creator = NoteCreator(notes_repo=notes_repo)
+
+        try:
+            note = creator.create(
+                data=NoteCreationInput(
+                    **req_body
+                ),
+                folder=folder,
+                user_id=current_user.id
+            )
+        except NoteCreationError as e:
+            raise HTTPNoteCreationError(message=e.message)
+
+        await db_session.commit()
+
+        await async_batch_handle(
+            message_bus,
+            creator.get_events(),
+        )
+
+        note = await cls._reload(db_session, note, current_user.id)
+
+        resp.text = {
+            "note": compiled_dump(NoteDumpSchema)(note)
+        }
+
+    @classmethod
+    @async_auth_required()
+    async def on_patch(cls, req, resp):
+        req_params = compiled_load(NoteByIdParamsSchema)(req.params)
+        req_body = compiled_load(NoteUpdateSchema)(req.text)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+
+        folders_repo = AsyncSAFoldersRepo(db_session)
+        notes_repo = AsyncSANotesRepo(db_session)
+
+        note = await notes_repo.get(id_=req_params["note_id"], user_id=current_user.id)
+
+        if note is None:
+            raise HTTPNoteNotFound
+
+        # the updater gets the folder loaded, it does not query the repo itself
+        folder_id = req_body.pop("folder_id", None)
+        folder = None
+
+        if folder_id:
+            folder = await folders_repo.get(id_=folder_id, user_id=current_user.id)
+
+            if folder is None:
+                raise HTTPNoteUpdateError(
+                    message=f"Note update error. Folder (uuid={str(folder_id)}) not found"
+                )
+
+        updater = NoteUpdater(folders_repo=folders_repo)
+
+        try:
+            note = updater.update(
+                data=req_body,
+                note=note,
+                user_id=current_user.id,
+                folder=folder,
+            )
+        except NoteUpdateError as e:
+            raise HTTPNoteUpdateError(message=e.message)
+
+        await db_session.commit()
+
+        await async_batch_handle(
+            message_bus,
+            updater.get_events(),
+        )
+
+        note = await cls._reload(db_session, note, current_user.id)
+
+        resp.text = {
+            "note": compiled_dump(NoteDumpSchema)(note)
+        }
+
+    @classmethod
+    @async_auth_required()
+    async def on_delete(cls, req, resp):
+        req_params = compiled_load(NoteByIdParamsSchema)(req.params)
+
+        current_user: Principal = req.context.get("current_user")
+        db_session: AsyncSession = req.context.get("db_session")
+        message_bus: MessageBusABC = req.context.get("message_bus")
+
+        notes_repo = AsyncSANotesRepo(db_session)
+
+        note = await notes_repo.get(id_=req_params["note_id"], user_id=current_user.id)
+
+        if note is None:
+            return
+
+        remover = NoteRemover(notes_repo=notes_repo)
+
+        try:
+            remover.remove(
+                note=note,
+                user_id=current_user.id,
+            )
+        except NoteRemoveError:
+            return
+
+        await db_session.commit()
+
+        await async_batch_handle(
+            message_bus,
+            remover.get_events(),
+        )
+
+    @staticmethod
+    async def _reload(db_session: AsyncSession, note: Note, user_id: UUID) -> Note:
+        # relationships are not lazy loaded under asyncio, the note is loaded again with the dump profile
+        note_id = note.id
+        db_session.expire(note)
+
+        return await AsyncSANotesRepo(db_session).get(id_=note_id, user_id=user_id, profile="list_view")
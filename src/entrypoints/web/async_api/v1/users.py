@@ -0,0 +1,16 @@
+from src.entrypoints.web.async_api.v1 import api_resource
+from src.entrypoints.web.lib.decorators import async_auth_required
+from src.schemas.user import CurrentUserDumpSchema
+from src.schemas.compiler import compiled_dump
+
+
+@api_resource("/current-user")
+class CurrentUserController:
+    @classmethod
+    @async_auth_required()
+    async def on_get(cls, req, resp):
+        current_user = req.context.get("current_user")
+
+        resp.text = {
+            "user": compiled_dump(CurrentUserDumpSchema)(current_user)
+        }
@@ -1,17 +1,22 @@
-from typing import Type
+from typing import Type, Optional
 from config import Config
 from src.repositories.users import AsyncSAUsersRepo
 from src.entrypoints.web.errors.base import HTTPUnauthorized
 from src.lib.jwt import JWTToken
+from src.lib.principals_cache import AsyncRedisPrincipalsCache, Principal
+
+from uuid import UUID
 
 
 class AuthMiddleware:
-    def __init__(self, config: Type[Config]):
+    def __init__(self, config: Type[Config], principals_cache: Optional[AsyncRedisPrincipalsCache] = None):
         self._config = config
+        self._principals_cache = principals_cache
 
     async def process_request(self, req, resp):
         if req.auth is None:
             req.context["current_user"] = None
+            req.context["current_user_id"] = None
             return
 
         auth = req.auth.split() if req.auth \
@@ -26,12 +31,37 @@ class AuthMiddleware:
                 "error_message": "invalid token"
             })
 
-        async with req.context["db_session"]() as db_session:
-            repo = AsyncSAUsersRepo(db_session)
+        user_id = UUID(token["object_id"])
+        credential_version = UUID(token.payload["credential_version"])
+
+        # the same session the request gets from DatabaseMiddleware
+        users_repo = AsyncSAUsersRepo(req.context["db_session"])
+
+        if self._principals_cache is None:
+            current_user = await users_repo.get(user_id)
+        else:
+            current_user = await self._principals_cache.get(user_id)
+
+            # a token issued after the principal was cached is checked against the database
+            if current_user is None or current_user.credential_version != credential_version:
+                current_user = await self._load_principal(user_id, users_repo)
+
+        if current_user is None or current_user.credential_version != credential_version:
+            raise HTTPUnauthorized
+
+        req.context["current_user"] = current_user
+        # part of APICache keys and tags
+        req.context["current_user_id"] = current_user.id
+
+    async def _load_principal(self, user_id: UUID, users_repo: AsyncSAUsersRepo) -> Optional[Principal]:
+        # the version is read before the user, a principal loaded before an invalidation is not cached
+        version = await self._principals_cache.get_version(user_id)
+        user = await users_repo.get(user_id)
 
-            current_user = await repo.get(token["object_id"])
+        if user is None:
+            return None
 
-            if current_user.credential_version != token.payload["credential_version"]:
-                raise HTTPUnauthorized
+        principal = Principal.from_user(user)
+        await self._principals_cache.set(principal, version)
 
-            req.context["current_user"] = current_user
+        return principal
@@ -11,11 +11,22 @@ class DatabaseMiddleware:
         self._db_sessionmaker = db_sessionmaker
 
     async def process_shutdown(self, scope, event):
-
+        # connections are closed, the pool is filled again if the app serves requests after that
         if self._engine:
             await self._engine.dispose()
 
-        self._db_sessionmaker = None
-
     async def process_request(self, req, resp):
         req.context["db_sessionmaker"] = self._db_sessionmaker
+        # a session takes a connection from the pool only when it runs the first statement
+        req.context["db_session"] = self._db_sessionmaker()
+
+    async def process_response(self, req, resp, resource, is_success):
+        db_session = req.context.get("db_session")
+
+        if db_session is None:
+            return
+
+        if not is_success:
+            await db_session.rollback()
+
+        await db_session.close()
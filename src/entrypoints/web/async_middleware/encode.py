@@ -1,34 +1,50 @@
-import json
-import sys
+from src.entrypoints.web.errors.base import HTTPBadRequest, HTTPRequestBodyTooLarge
+from src.entrypoints.web.middleware.encode import (
+    JSON_CONTENT_TYPE,
+    MAX_BODY_SIZE,
+    check_body_size,
+    encode_response,
+)
+from src.lib.json_codec import JSONCodecABC, make_json_codec
 
-from src.entrypoints.web.errors.base import HTTPBadRequest
 
-JSON_CONTENT_TYPE = 'application/json'
-CHARSET = 'utf-8'
+class EncodeMiddleware:
+    def __init__(self, codec: JSONCodecABC = None, max_body_size: int = MAX_BODY_SIZE):
+        self._codec = codec or make_json_codec()
+        self._max_body_size = max_body_size
 
+    async def process_request(self, req, resp):
+        req.context["json_codec"] = self._codec
 
-class EncodeMiddleware:
-    @classmethod
-    async def process_request(cls, req, resp):
         content_type = req.content_type or ''
 
         if JSON_CONTENT_TYPE in content_type:
-            body = await req.stream.read(sys.maxsize).decode(CHARSET)
+            body = await self._read_body(req)
 
             try:
-                req.text = json.loads(body or '{}')
+                req.text = self._codec.loads(body or b'{}')
             except ValueError:
                 raise HTTPBadRequest(description={
                     "message": 'Not valid JSON'
                 })
         else:
-            req.text = json.loads('{}')
+            req.text = {}
 
-    @classmethod
-    async def process_response(cls, req, resp, resource, is_success):
+    async def process_response(self, req, resp, resource, is_success):
         if not is_success:
             return
 
-        if isinstance(resp.text, (dict, list)):
-            resp.content_type = JSON_CONTENT_TYPE
-            resp.text = json.dumps(resp.text)
+        encode_response(resp, self._codec)
+
+    async def _read_body(self, req) -> bytes:
+        check_body_size(req, self._max_body_size)
+
+        body = bytearray()
+
+        async for chunk in req.stream:
+            body += chunk
+
+            if len(body) > self._max_body_size:
+                raise HTTPRequestBodyTooLarge(self._max_body_size)
+
+        return bytes(body)
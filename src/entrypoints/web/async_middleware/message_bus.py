@@ -1,3 +1,4 @@
+import inspect
 from src.message_bus import MessageBusABC
 
 
@@ -5,5 +6,15 @@ class MessageBudsMiddleware:
     def __init__(self, message_bus: MessageBusABC):
         self._message_bus = message_bus
 
+    async def process_shutdown(self, scope, event):
+        # write out buffered events log rows before the worker exits
+        writer = getattr(self._message_bus, "context", {}).get("events_log_writer")
+
+        if writer:
+            result = writer.close()
+
+            if inspect.isawaitable(result):
+                await result
+
     async def process_request(self, req, resp):
         req.context["message_bus"] = self._message_bus
@@ -7,7 +7,9 @@ from falcon import (
     HTTP_404,
     HTTP_408,
     HTTP_409,
+    HTTP_413,
     HTTP_422,
+    HTTP_429,
     HTTP_500,
     HTTPError,
 )
@@ -33,7 +35,7 @@ async def async_no_result_found_handler(req, resp, ex, params, ws=None):
 
 async def async_base_exception(req, resp, ex, params, ws=None):
     logger.exception(ex)
-    raise HTTP_500
+    raise HTTPInternalServerError
 
 
 class BaseHTTPError(HTTPError):
@@ -81,6 +83,16 @@ class HTTPRequestTimeout(BaseHTTPError):
         super().__init__(HTTP_408, code=403, *args, **kwargs)
 
 
+class HTTPPayloadTooLarge(BaseHTTPError):
+    def __init__(self, *args, **kwargs):
+        super().__init__(HTTP_413, *args, **kwargs)
+
+
+class HTTPTooManyRequests(BaseHTTPError):
+    def __init__(self, *args, **kwargs):
+        super().__init__(HTTP_429, *args, **kwargs)
+
+
 class HTTPInternalServerError(BaseHTTPError):
     def __init__(self, *args, **kwargs):
         super().__init__(HTTP_500, code=500, *args, **kwargs)
@@ -112,3 +124,42 @@ class HTTPFileMissing(HTTPBadRequest):
                 "message": message,
             }
         )
+
+
+class HTTPInvalidCursor(HTTPBadRequest):
+    code = 1111003
+
+    def __init__(self):
+        message = "Invalid pagination cursor"
+
+        super().__init__(
+            description={
+                "code": self.code,
+                "message": message,
+            }
+        )
+
+
+class HTTPRateLimitExceeded(HTTPTooManyRequests):
+    code = 6111001
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            description={
+                "code": self.code,
+                "message": "Rate limit exceeded",
+            },
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class HTTPRequestBodyTooLarge(HTTPPayloadTooLarge):
+    code = 7111001
+
+    def __init__(self, max_body_size: int):
+        super().__init__(
+            description={
+                "code": self.code,
+                "message": f"Request body is larger than {max_body_size} bytes",
+            }
+        )
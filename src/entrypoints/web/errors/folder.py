@@ -6,7 +6,7 @@ class HTTPFolderNotFound(HTTPNotFound):
 
     def __init__(self, id_: str = None):
         if id_:
-            message = f"Folder (id={id}) not found"
+            message = f"Folder (id={id_}) not found"
         else:
             message = "Folder not found"
 
@@ -50,3 +50,20 @@ class HTTPFolderUpdateError(HTTPBadRequest):
                 "message": default_message,
             }
         )
+
+
+class HTTPFolderRestoreError(HTTPBadRequest):
+    code = 1002003
+
+    def __init__(self, message: str = None):
+        default_message = "Folder restore error"
+
+        if message:
+            default_message = f'{default_message}. {message}'
+
+        super().__init__(
+            description={
+                "code": self.code,
+                "message": default_message,
+            }
+        )
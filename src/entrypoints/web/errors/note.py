@@ -6,7 +6,7 @@ class HTTPNoteNotFound(HTTPNotFound):
 
     def __init__(self, id_: str = None):
         if id_:
-            message = f"Note (id={id}) not found"
+            message = f"Note (id={id_}) not found"
         else:
             message = "Note not found"
 
@@ -84,3 +84,20 @@ class HTTPNoteRelationRemoveError(HTTPBadRequest):
                 "message": default_message,
             }
         )
+
+
+class HTTPNoteBatchError(HTTPBadRequest):
+    code = 1003005
+
+    def __init__(self, index: int, message: str = None):
+        default_message = f"Note batch operation (index={index}) error"
+
+        if message:
+            default_message = f'{default_message}. {message}'
+
+        super().__init__(
+            description={
+                "code": self.code,
+                "message": default_message,
+            }
+        )
@@ -4,8 +4,8 @@ import falcon
 import datetime as dt
 import logging
 from typing import List
-from redis import Redis
-from src.lib.redis import RedisHelper
+from redis import RedisError
+from src.lib.apicache import APICacheStorage
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +16,9 @@ class APICache:
     invalidate_methods = ["POST", "PATCH", "PUT", "DELETE", "PROPPATCH"]
     cache_methods = ["GET", "PROPFIND", "REPORT"]
     CACHE_HEADER = 'X-WSGILook-Cache'
-
-    API_CACHE_HIT_COUNTER_KEY = "API_CACHE:HIT_COUNTER"
-    API_CACHE_MISS_COUNTER_KEY = "API_CACHE:MISS_COUNTER"
+    # responses tagged by the user are dropped by the events of their changes (APICacheInvalidator),
+    # the timeout only bounds the memory they take
+    DEFAULT_TIMEOUT = 60 * 60
 
     @staticmethod
     def make_cache_key(req: falcon.Request):
@@ -46,41 +46,65 @@ class APICache:
         resp.set_headers(headers)
         resp.complete = True
 
+    @staticmethod
+    def _format_tags(req: falcon.Request, tags_templates: List[str]) -> List[str]:
+        format_keys = {
+            **req.context,
+            **req.params
+        }
+
+        return [tag.format(**format_keys) for tag in tags_templates]
+
+    @staticmethod
+    def _set_last_modified(storage: APICacheStorage, resp: falcon.Response, tags: List[str]):
+        # taken before the controller reads the data, redis being down only turns Last-Modified off
+        try:
+            resp.last_modified = storage.get_modified(tags)
+        except RedisError as e:
+            logger.exception(e)
+
     @staticmethod
     def cached(
             timeout: int,
             tags_templates: List[str] = None,
             stream_length_restriction: int = 512,
+            last_modified: bool = False,
     ):
+        # with `last_modified` the response gets Last-Modified of the latest change of its tags,
+        # it is stored with the response, so a cache hit is still one lookup
         if tags_templates is None:
             tags_templates = []
 
         def decorator(func, *args):
             def wrapper(cls, req, resp, *args, **kwargs):
+                storage: APICacheStorage = req.context.get("api_cache")
+
                 if not APICache.enabled:
+                    if last_modified and storage is not None:
+                        APICache._set_last_modified(storage, resp, APICache._format_tags(req, tags_templates))
+
                     func(cls, req, resp, *args, **kwargs)
                     return
 
-                redis: Redis = req.context["redis"]
-                redis_helper: RedisHelper = RedisHelper(redis)
                 key = APICache.make_cache_key(req)
 
                 logger.debug(f"APICache used for key: {key}")
 
                 if req.method in APICache.invalidate_methods:
-                    redis.delete(key)
+                    storage.delete(key)
 
                 if req.method in APICache.cache_methods:
-                    data = redis.get(key)
+                    data = storage.get(key)
 
                     if data:
                         APICache._deserialize_response(resp, data)
                         resp.set_header(APICache.CACHE_HEADER, 'Hit')
-                        APICache._increase_hit_counter(redis, key)
                         return
                     else:
                         resp.set_header(APICache.CACHE_HEADER, 'Miss')
-                        APICache._increase_miss_counter(redis, key)
+
+                    if last_modified:
+                        APICache._set_last_modified(storage, resp, APICache._format_tags(req, tags_templates))
 
                 func(cls, req, resp, *args, **kwargs)
 
@@ -90,17 +114,9 @@ class APICache:
 
                     try:
                         value = APICache._serialize_response(resp)
+                        tags = APICache._format_tags(req, tags_templates)
 
-                        tags = []
-                        format_keys = {
-                            **req.context,
-                            **req.params
-                        }
-
-                        for tag in tags_templates:
-                            tags.append(tag.format(**format_keys))
-
-                        redis_helper.set_with_tags(key, value, ex=dt.timedelta(seconds=timeout), tags=tags)
+                        storage.set(key, value, ex=dt.timedelta(seconds=timeout), tags=tags)
                     except Exception as e:
                         logger.error(e)
 
@@ -108,43 +124,19 @@ class APICache:
 
         return decorator
 
-    @staticmethod
-    def _increase_hit_counter(redis: Redis, key: str):
-        try:
-            if not redis.exists(APICache.API_CACHE_HIT_COUNTER_KEY):
-                redis.set(APICache.API_CACHE_HIT_COUNTER_KEY, 0, ex=dt.timedelta(days=1))
-
-            if not redis.exists(f"{key}:HIT"):
-                redis.set(f"{key}:HIT", 0, ex=dt.timedelta(days=1))
-
-            redis.incr(f"{key}:HIT")
-            redis.incr(APICache.API_CACHE_HIT_COUNTER_KEY)
-        except Exception as e:
-            logger.error(e)
 
-    @staticmethod
-    def _increase_miss_counter(redis: Redis, key: str):
-        try:
-            if not redis.exists(APICache.API_CACHE_MISS_COUNTER_KEY):
-                redis.set(APICache.API_CACHE_MISS_COUNTER_KEY, 0, ex=dt.timedelta(days=1))
-
-            if not redis.exists(f"{key}:MISS"):
-                redis.set(f"{key}:MISS", 0, ex=dt.timedelta(days=1))
-
-            redis.incr(f"{key}:MISS")
-            redis.incr(APICache.API_CACHE_MISS_COUNTER_KEY)
-        except Exception as e:
-            logger.error(e)
+class CacheMiddleware:
+    def __init__(self, storage: APICacheStorage):
+        self._storage = storage
 
+    def process_request(self, req, resp):
+        req.context["api_cache"] = self._storage
 
-class CacheMiddleware:
-    @classmethod
-    def process_response(cls, req, resp, resource, req_succeeded):
+    def process_response(self, req, resp, resource, req_succeeded):
         if not req_succeeded:
             return
 
-        redis: Redis = req.context["redis"]
         key = APICache.make_cache_key(req)
 
         if req.method in APICache.invalidate_methods:
-            redis.delete(key)
+            self._storage.delete(key)
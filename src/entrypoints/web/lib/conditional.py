@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import datetime as dt
+from typing import Optional, Callable, List
+from uuid import UUID
+from redis import RedisError
+from falcon import HTTP_200, HTTP_304, http_date_to_dt
+from src.entrypoints.web.middleware.encode import encode_response
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def make_version_etag(req, id_: UUID, updated: Optional[dt.datetime], tags: List[str]) -> Optional[str]:
+    # strong ETag of an object dump from (id, updated) of its row and the last change of the APICache tags
+    # of the response: the dump embeds related objects, their changes drop the tags and so change the ETag
+    storage = req.context.get("api_cache")
+
+    if updated is None or storage is None:
+        return None
+
+    try:
+        modified = storage.get_modified([tag.format(**req.context, **req.params) for tag in tags])
+    except RedisError as e:
+        logger.error(e)
+        return None
+
+    return make_etag(f"{id_}:{updated.isoformat()}:{modified.isoformat()}".encode())
+
+
+def conditional(version: Callable[..., Optional[str]] = None):
+    # strong ETag of the body and If-None-Match -> 304, goes above APICache.cached,
+    # so an unchanged response is answered from the cache without the database and the dump.
+    # `version(req)` gives the ETag without the controller (make_version_etag), If-None-Match
+    # with it is answered before the object is loaded and dumped. Without it the ETag is the hash of the body.
+    # Last-Modified comes with the response (APICache.cached(last_modified=True) keeps it in the cache entry)
+    # and answers If-Modified-Since
+    def decorator(func):
+        def wrapper(cls, req, resp, *args, **kwargs):
+            etag = version(req) if version is not None else None
+
+            if etag is not None and _matches(req, etag):
+                resp.etag = etag
+                _set_not_modified(resp)
+                return
+
+            func(cls, req, resp, *args, **kwargs)
+
+            if resp.status != HTTP_200 or resp.stream is not None:
+                return
+
+            last_modified = _get_last_modified(resp)
+
+            if last_modified is not None and req.if_none_match is None and _is_not_modified_since(req, last_modified):
+                _set_not_modified(resp)
+                return
+
+            encode_response(resp, req.context["json_codec"])
+
+            if resp.data is None:
+                return
+
+            if etag is None:
+                etag = make_etag(resp.data)
+
+            resp.etag = etag
+
+            if _matches(req, etag):
+                _set_not_modified(resp)
+
+        return wrapper
+
+    return decorator
+
+
+def _matches(req, etag: str) -> bool:
+    return req.if_none_match is not None and any(tag in ("*", etag) for tag in req.if_none_match)
+
+
+def _set_not_modified(resp):
+    resp.status = HTTP_304
+    resp.text = None
+    resp.data = None
+    resp.delete_header("Content-Type")
+
+
+def _get_last_modified(resp) -> Optional[dt.datetime]:
+    header = resp.get_header("Last-Modified")
+
+    if header is None:
+        return None
+
+    last_modified = http_date_to_dt(header)
+
+    # http dates are in seconds: a change in the current second may be followed by another one
+    # with the same date, so such a response goes without Last-Modified (as apache does)
+    if last_modified >= dt.datetime.utcnow().replace(microsecond=0):
+        resp.delete_header("Last-Modified")
+        return None
+
+    return last_modified
+
+
+def _is_not_modified_since(req, last_modified: dt.datetime) -> bool:
+    if_modified_since = req.if_modified_since
+
+    return if_modified_since is not None and last_modified <= if_modified_since
@@ -0,0 +1,13 @@
+import inspect
+from typing import List
+from src.message_bus import MessageBusABC
+from src.message_bus.types import Message
+from src.lib.utils import run_in_thread
+
+
+async def async_batch_handle(message_bus: MessageBusABC, messages: List[Message], *args, **kwargs):
+    # handlers of a synchronous message bus run in a worker thread, so they do not block the event loop
+    if inspect.iscoroutinefunction(message_bus.batch_handle):
+        await message_bus.batch_handle(messages, *args, **kwargs)
+    else:
+        await run_in_thread(message_bus.batch_handle, messages, *args, **kwargs)
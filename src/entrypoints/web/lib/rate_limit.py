@@ -0,0 +1,64 @@
+import math
+import logging
+from redis import RedisError
+from src.lib.rate_limiter import RateLimiterABC, RateLimit
+from src.entrypoints.web.errors.base import HTTPRateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+LIMIT_HEADER = "X-RateLimit-Limit"
+REMAINING_HEADER = "X-RateLimit-Remaining"
+RESET_HEADER = "X-RateLimit-Reset"
+
+
+def check_rate_limit(limiter: RateLimiterABC, resp, key: str, limit: int, interval: int):
+    # redis being down must not take the api down, the request goes unlimited
+    try:
+        rate_limit = limiter.hit(key, limit, interval)
+    except RedisError as e:
+        logger.exception(e)
+        return
+
+    _set_headers(resp, rate_limit)
+
+    if not rate_limit.allowed:
+        raise HTTPRateLimitExceeded(retry_after=math.ceil(rate_limit.retry_after))
+
+
+def _set_headers(resp, rate_limit: RateLimit):
+    # with several limits on a request the client sees the one closest to be exceeded
+    remaining = resp.get_header(REMAINING_HEADER)
+
+    if remaining is not None and int(remaining) <= rate_limit.remaining:
+        return
+
+    resp.set_header(LIMIT_HEADER, str(rate_limit.limit))
+    resp.set_header(REMAINING_HEADER, str(rate_limit.remaining))
+    resp.set_header(RESET_HEADER, str(math.ceil(rate_limit.reset_after)))
+
+
+def request_identity(req, by: str) -> str:
+    current_user = req.context.get("current_user")
+
+    if by == "user" and current_user is not None:
+        return f"user:{current_user.id}"
+
+    return f"ip:{req.remote_addr}"
+
+
+def rate_limited(limit: int, interval: int, by: str = "ip"):
+    # a limit of the route on top of the global one of RateLimitMiddleware,
+    # `by` is "ip" or "user" (anonymous requests are counted by ip)
+    def decorator(func):
+        def wrapper(self, req, resp, *args, **kwargs):
+            limiter = req.context.get("rate_limiter")
+
+            if limiter is not None:
+                key = f"route:{req.method}:{req.uri_template}:{request_identity(req, by)}"
+                check_rate_limit(limiter, resp, key, limit, interval)
+
+            return func(self, req, resp, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+from pathlib import Path
+from typing import List, Optional
+from src.lib.background import BackgroundThread
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+# Writes request log records as JSON lines from a background thread.
+# Records go through a bounded queue; when it is full the record is dropped (and counted),
+# so the request path never waits for the disk. The file handle is kept open between batches
+# and the file is rotated by size (requests_log.jsonl -> requests_log.jsonl.1 -> ...).
+class RequestsLogWriter(BackgroundThread):
+    def __init__(
+            self,
+            path: str,
+            filename: str = "requests_log.jsonl",
+            max_bytes: int = 100 * 1024 * 1024,
+            backup_count: int = 5,
+            max_queue_size: int = 10000,
+            batch_size: int = 500,
+            flush_interval: float = 1.0,
+    ):
+        super().__init__("requests-log-writer")
+        self._dir_path = Path(path)
+        self._file_path = self._dir_path / filename
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._max_queue_size = max_queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+        self._queue: Optional[queue.Queue] = None
+        self._file = None
+        self.dropped = 0
+
+        atexit.register(self.close)
+
+    def put(self, record: dict):
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        if self._is_running():
+            self._queue.join()
+
+    def _on_start(self):
+        self._queue = queue.Queue(maxsize=self._max_queue_size)
+        self._file = None
+
+    def _stop(self):
+        # records queued before are written first
+        self._queue.put(_STOP)
+
+    def _run(self):
+        stopped = False
+
+        while not stopped:
+            batch, stopped = self._take_batch()
+
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.exception(f"Error writing {len(batch)} request log records", exc_info=e)
+            finally:
+                for _ in range(len(batch) + int(stopped)):
+                    self._queue.task_done()
+
+        self._close_file()
+
+    def _take_batch(self) -> (List[dict], bool):
+        item = self._queue.get()
+
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self._flush_interval
+
+        while len(batch) < self._batch_size:
+            timeout = deadline - time.monotonic()
+
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    def _write(self, records: List[dict]):
+        if not records:
+            return
+
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            for record in records
+        )
+
+        self._open_file()
+        self._file.write(lines)
+        self._file.flush()
+
+        if self._file.tell() >= self._max_bytes:
+            self._rotate()
+
+    def _open_file(self):
+        # another worker may have rotated the file, then the handle points to a backup
+        if self._file is not None:
+            try:
+                is_current = os.fstat(self._file.fileno()).st_ino == os.stat(self._file_path).st_ino
+            except FileNotFoundError:
+                is_current = False
+
+            if is_current:
+                return
+
+            self._close_file()
+
+        self._dir_path.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._file_path, "a", encoding="utf-8")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        self._close_file()
+
+        for index in range(self._backup_count - 1, 0, -1):
+            source = Path(f"{self._file_path}.{index}")
+
+            if source.exists():
+                source.replace(f"{self._file_path}.{index + 1}")
+
+        try:
+            if self._backup_count > 0:
+                self._file_path.replace(f"{self._file_path}.1")
+            else:
+                self._file_path.unlink()
+        except FileNotFoundError:
+            # rotated by another worker
+            pass
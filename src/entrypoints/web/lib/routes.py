@@ -0,0 +1,66 @@
+import json
+import importlib
+import venusian
+from pathlib import Path
+from types import ModuleType
+from typing import List, Optional
+
+# routes of an api package collected from the api_resource decorators: [[uri, "module:Class"], ...].
+# The manifest is written next to the package (make routes), a worker imports only the listed
+# controllers and adds their routes without a venusian scan. Without the manifest the package is scanned
+MANIFEST_NAME = "routes.json"
+
+Route = List[str]
+
+
+class _RoutesCollector:
+    # stands for the app in the api_resource callback
+    def __init__(self):
+        self.routes: List[Route] = []
+
+    def add_route(self, uri: str, resource):
+        resource_cls = type(resource)
+        self.routes.append([uri, f"{resource_cls.__module__}:{resource_cls.__qualname__}"])
+
+
+def scan_routes(package: ModuleType) -> List[Route]:
+    collector = _RoutesCollector()
+    venusian.Scanner(api=collector).scan(package)
+
+    return sorted(collector.routes)
+
+
+def manifest_path(package: ModuleType) -> Path:
+    return Path(package.__file__).parent / MANIFEST_NAME
+
+
+def write_manifest(package: ModuleType) -> Path:
+    path = manifest_path(package)
+
+    # a route per line
+    with open(path, "w") as f:
+        f.write("[\n" + ",\n".join(f"  {json.dumps(route)}" for route in scan_routes(package)) + "\n]\n")
+
+    return path
+
+
+def read_manifest(package: ModuleType) -> Optional[List[Route]]:
+    try:
+        with open(manifest_path(package)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def add_routes(app, package: ModuleType):
+    routes = read_manifest(package)
+
+    if routes is None:
+        venusian.Scanner(api=app).scan(package)
+        return
+
+    for uri, target in routes:
+        module_name, resource_name = target.split(":")
+        resource_cls = getattr(importlib.import_module(module_name), resource_name)
+
+        app.add_route(uri, resource_cls())
@@ -4,6 +4,7 @@ from .encode import EncodeMiddleware
 from .logging import LoggingMiddleware
 from .redis import RedisMiddleware
 from .message_bus import MessageBusMiddleware
+from .outbox import OutboxMiddleware
 from .config_middleware import ConfigMiddleware
 # from .auth_middleware import AuthMiddleware
 
@@ -14,6 +15,7 @@ __all__ = [
     LoggingMiddleware,
     RedisMiddleware,
     MessageBusMiddleware,
+    OutboxMiddleware,
     ConfigMiddleware,
     # AuthMiddleware,
 ]
@@ -1,11 +1,12 @@
-from typing import Type, Optional
+from typing import Type, Optional, Union
 from config import Config
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import scoped_session
 from src.repositories.users import SAUsersRepo, UsersRepoABC
 from src.entrypoints.web.errors.base import HTTPUnauthorized
 from src.lib.jwt import JWTToken
 from src.lib.hashing import PasswordEncoder
 from src.services.auth import UserAuthenticator
+from src.lib.principals_cache import PrincipalsCacheABC, Principal
 import base64
 
 from src.models.user import User
@@ -14,13 +15,20 @@ from uuid import UUID
 
 
 class AuthMiddleware:
-    def __init__(self, db_session: Session, config: Type[Config]):
+    def __init__(
+            self,
+            db_session: scoped_session,
+            config: Type[Config],
+            principals_cache: Optional[PrincipalsCacheABC] = None,
+    ):
         self._db_session = db_session
         self._config = config
+        self._principals_cache = principals_cache
 
     def process_request(self, req, resp):
         if req.auth is None:
             req.context["current_user"] = None
+            req.context["current_user_id"] = None
             return
 
         auth = req.auth.split() if req.auth \
@@ -29,7 +37,8 @@ class AuthMiddleware:
         if auth is None:
             raise HTTPUnauthorized
 
-        users_repo = SAUsersRepo(self._db_session)
+        # the same session the request gets from SADBSessionMiddleware
+        users_repo = SAUsersRepo(self._db_session())
 
         if auth[0] == "Bearer":
             current_user = self._bearer_auth(token=auth[1], users_repo=users_repo)
@@ -40,8 +49,10 @@ class AuthMiddleware:
             raise HTTPUnauthorized
 
         req.context["current_user"] = current_user
+        # part of APICache keys and tags
+        req.context["current_user_id"] = current_user.id
 
-    def _bearer_auth(self, token: str, users_repo: UsersRepoABC) -> Optional[User]:
+    def _bearer_auth(self, token: str, users_repo: UsersRepoABC) -> Union[Principal, User]:
         token = JWTToken(token, self._config.jwt_secret)
 
         if not token.is_valid():
@@ -49,13 +60,36 @@ class AuthMiddleware:
                 "error_message": "invalid token"
             })
 
-        current_user = users_repo.get(UUID(token["object_id"]))
+        user_id = UUID(token["object_id"])
+        credential_version = UUID(token.payload["credential_version"])
 
-        if current_user.credential_version != UUID(token.payload["credential_version"]):
+        if self._principals_cache is None:
+            current_user = users_repo.get(user_id)
+        else:
+            current_user = self._principals_cache.get(user_id)
+
+            # a token issued after the principal was cached is checked against the database
+            if current_user is None or current_user.credential_version != credential_version:
+                current_user = self._load_principal(user_id, users_repo)
+
+        if current_user is None or current_user.credential_version != credential_version:
             raise HTTPUnauthorized
 
         return current_user
 
+    def _load_principal(self, user_id: UUID, users_repo: UsersRepoABC) -> Optional[Principal]:
+        # the version is read before the user, a principal loaded before an invalidation is not cached
+        version = self._principals_cache.get_version(user_id)
+        user = users_repo.get(user_id)
+
+        if user is None:
+            return None
+
+        principal = Principal.from_user(user)
+        self._principals_cache.set(principal, version)
+
+        return principal
+
     @classmethod
     def _basic_auth(cls, encoded_credentials: str, users_repo: UsersRepoABC) -> Optional[User]:
         email, password = base64.b64decode(encoded_credentials).decode().split(":", 1)
@@ -1,4 +1,5 @@
 
+from typing import Union, Iterable, Optional
 from falcon.request import Request
 from falcon.response import Response
 
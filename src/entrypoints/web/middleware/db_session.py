@@ -1,14 +1,16 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import scoped_session
 
 
 class SADBSessionMiddleware:
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: scoped_session):
         self._db_session = db_session
 
     def process_request(self, req, resp):
-        req.context["db_session"] = self._db_session
+        req.context["db_session"] = self._db_session()
 
     def process_response(self, req, resp, resource, is_success, *args, **kwargs):
         if not is_success:
             self._db_session.rollback()
-        self._db_session.close()
+
+        # closes the request session and returns its connection to the pool
+        self._db_session.remove()
@@ -1,39 +1,65 @@
-import json
-import sys
-
-from src.entrypoints.web.errors.base import HTTPBadRequest
+from src.entrypoints.web.errors.base import HTTPBadRequest, HTTPRequestBodyTooLarge
+from src.lib.json_codec import JSONCodecABC, make_json_codec
 
 JSON_CONTENT_TYPE = 'application/json'
 CHARSET = 'utf-8'
+MAX_BODY_SIZE = 10 * 1024 * 1024
 
 
 class EncodeMiddleware:
-    @classmethod
-    def process_request(cls, req, resp):
+    def __init__(self, codec: JSONCodecABC = None, max_body_size: int = MAX_BODY_SIZE):
+        self._codec = codec or make_json_codec()
+        self._max_body_size = max_body_size
+
+    def process_request(self, req, resp):
+        req.context["json_codec"] = self._codec
+
         content_type = req.content_type or ''
 
         if JSON_CONTENT_TYPE in content_type:
-            body = req.bounded_stream.read(sys.maxsize).decode(CHARSET)
+            body = read_body(req, self._max_body_size)
 
             try:
-                req.text = json.loads(body or '{}')
+                req.text = self._codec.loads(body or b'{}')
             except ValueError:
                 raise HTTPBadRequest(description={
                     "message": 'Not valid JSON'
                 })
         else:
-            req.text = json.loads("{}")
+            req.text = {}
 
         if ("application/xml" in content_type) or \
                 ("text/xml" in content_type) or \
                 ("text/calendar" in content_type):
-            req.text = req.bounded_stream.read(sys.maxsize)
+            req.text = read_body(req, self._max_body_size)
 
-    @classmethod
-    def process_response(cls, req, resp, resource, is_success):
+    def process_response(self, req, resp, resource, is_success):
         if not is_success:
             return
 
-        if isinstance(resp.text, (dict, list)):
-            resp.content_type = JSON_CONTENT_TYPE
-            resp.text = json.dumps(resp.text)
+        encode_response(resp, self._codec)
+
+
+def check_body_size(req, max_body_size: int):
+    # the declared length is checked before anything is read
+    if req.content_length is not None and req.content_length > max_body_size:
+        raise HTTPRequestBodyTooLarge(max_body_size)
+
+
+def read_body(req, max_body_size: int) -> bytes:
+    check_body_size(req, max_body_size)
+
+    # a chunked body has no length, one byte over the limit tells it is too large
+    body = req.bounded_stream.read(max_body_size + 1)
+
+    if len(body) > max_body_size:
+        raise HTTPRequestBodyTooLarge(max_body_size)
+
+    return body
+
+
+def encode_response(resp, codec: JSONCodecABC):
+    if isinstance(resp.text, (dict, list)):
+        resp.content_type = JSON_CONTENT_TYPE
+        resp.data = codec.dumps(resp.text)
+        resp.text = None
@@ -1,28 +1,31 @@
-import copy
+import random
 import falcon
 from typing import Type
 from datetime import datetime
-from pathlib import Path
 from uuid import uuid4
 from config import Config
 from src import app_globals
+from src.entrypoints.web.lib.requests_log import RequestsLogWriter
 
-
-def save_log(path, filename, message):
-    dir_path = Path(path)
-    file_path = str(dir_path) + "/" + filename
-    try:
-        dir_path.mkdir()
-        with open(file_path, "a+") as log:
-            log.write(message)
-    except FileExistsError:
-        with open(file_path, "a+") as log:
-            log.write(message)
+SECRET_FIELDS = ("password", "refresh_token", "access_token")
+SECRET_HEADERS = ("AUTHORIZATION", "SERVICE-TOKEN")
+SECRET_COOKIES = ("qvik.session.refresh_token",)
+MASK = "***********"
 
 
 class LoggingMiddleware:
     def __init__(self, config: Type[Config]):
         self._config = config
+        self._sample_rate = config.web_logging_sample_rate
+        self._writer = None
+
+        if config.enable_logging:
+            self._writer = RequestsLogWriter(
+                config.web_logging_dir,
+                max_bytes=config.web_logging_max_bytes,
+                backup_count=config.web_logging_backup_count,
+                max_queue_size=config.web_logging_queue_size,
+            )
 
     def process_request(self, req, _):
         request_id = str(uuid4())
@@ -32,49 +35,65 @@ class LoggingMiddleware:
         request_id = req.context.get("request_id")
         resp.set_header("X-Request-Id", request_id)
 
-        if not self._config.enable_logging:
+        if self._writer is None:
             return
 
-        req_body = copy.deepcopy(req.text) if hasattr(req, "text") else {}
-        if type(req_body) == dict:
-            _mask_secrets(req_body)
-
-        resp_body = copy.deepcopy(resp.data) if not is_success and hasattr(resp, "data") else {}
-        if type(resp_body) == dict:
-            _mask_secrets(resp_body)
-
-        req_headers = copy.deepcopy(req.headers)
-
-        if "AUTHORIZATION" in req_headers:
-            req_headers["AUTHORIZATION"] = "**********"
-
-        if "SERVICE-TOKEN" in req_headers:
-            req_headers["SERVICE-TOKEN"] = "***********"
-
-        if "COOKIE" in req_headers:
-            cookies = req_headers["COOKIE"].split('; ')
-            for cookie_index in range(len(cookies)):
-                if cookies[cookie_index].startswith("qvik.session.refresh_token"):
-                    cookies[cookie_index] = "qvik.session.refresh_token=***********"
-            req_headers["COOKIE"] = "; ".join(cookies)
-
-        response = f"[{datetime.now()}]: request_id={request_id} status={resp.status} " \
-                   f"method={req.method} path={req.relative_uri} remote_addr={req.remote_addr} " \
-                   f"access_route={req.access_route} forwarded_host={req.forwarded_host} " \
-                   f"host={req.host} params={req.params} body={req_body} " \
-                   f"headers={req_headers} api_version={app_globals.api_version} " \
-                   f"success={is_success} error_message={resp_body}\n"
-
-        # save file
-        save_log(self._config.web_logging_dir, "requests_log.txt", response)
-
-
-def _mask_secrets(data: dict):
-    if "password" in data:
-        data["password"] = "***********"
-
-    if "refresh_token" in data:
-        data["refresh_token"] = "***********"
+        # failed requests are always logged, successful ones are sampled
+        if is_success and self._sample_rate < 1 and random.random() >= self._sample_rate:
+            return
 
-    if "access_token" in data:
-        data["access_token"] = "***********"
+        self._writer.put(make_request_log_record(req, resp, is_success, request_id))
+
+
+def make_request_log_record(
+        req: 'falcon.Request',
+        resp: 'falcon.Response',
+        is_success: bool,
+        request_id: str,
+) -> dict:
+    req_body = getattr(req, "text", None)
+    resp_body = getattr(resp, "data", None) if not is_success else None
+
+    return {
+        "datetime": datetime.now().isoformat(),
+        "request_id": request_id,
+        "status": resp.status,
+        "method": req.method,
+        "path": req.relative_uri,
+        "remote_addr": req.remote_addr,
+        "access_route": req.access_route,
+        "forwarded_host": req.forwarded_host,
+        "host": req.host,
+        "params": req.params,
+        "body": _mask_secrets(req_body) if type(req_body) == dict else req_body,
+        "headers": _mask_headers(req.headers),
+        "api_version": app_globals.api_version,
+        "success": is_success,
+        "error_message": _mask_secrets(resp_body) if type(resp_body) == dict else resp_body,
+    }
+
+
+def _mask_secrets(data: dict) -> dict:
+    # a shallow copy is enough, only top level values are replaced
+    return {
+        key: MASK if key in SECRET_FIELDS else value
+        for key, value in data.items()
+    }
+
+
+def _mask_headers(headers: dict) -> dict:
+    headers = {
+        key: MASK if key in SECRET_HEADERS else value
+        for key, value in headers.items()
+    }
+
+    if "COOKIE" in headers:
+        cookies = headers["COOKIE"].split("; ")
+
+        for index, cookie in enumerate(cookies):
+            if cookie.startswith(SECRET_COOKIES):
+                cookies[index] = f"{cookie.split('=', 1)[0]}={MASK}"
+
+        headers["COOKIE"] = "; ".join(cookies)
+
+    return headers
@@ -0,0 +1,13 @@
+from typing import Type
+from config import Config
+from src.repositories.outbox import SAOutboxRepo
+
+
+class OutboxMiddleware:
+    def __init__(self, config: Type[Config]):
+        self._is_enabled = config.is_outbox_enabled
+
+    def process_request(self, req, resp):
+        # services write their events to the outbox in the request transaction
+        if self._is_enabled:
+            req.context["outbox_repo"] = SAOutboxRepo(req.context["db_session"])
@@ -0,0 +1,24 @@
+from typing import Type
+from config import Config
+from src.lib.rate_limiter import RateLimiterABC
+from src.entrypoints.web.lib.rate_limit import check_rate_limit, request_identity
+
+
+class RateLimitMiddleware:
+    # goes after AuthMiddleware: authenticated requests are limited per user, the others per ip
+    def __init__(self, limiter: RateLimiterABC, config: Type[Config]):
+        self._limiter = limiter
+        self._config = config
+
+    def process_resource(self, req, resp, resource, params):
+        if resource is None:
+            return
+
+        req.context["rate_limiter"] = self._limiter
+
+        if req.context.get("current_user") is not None:
+            limit, interval = self._config.rate_limit_user_requests, self._config.rate_limit_user_interval
+        else:
+            limit, interval = self._config.rate_limit_ip_requests, self._config.rate_limit_ip_interval
+
+        check_rate_limit(self._limiter, resp, request_identity(req, "user"), limit, interval)
@@ -1,10 +1,12 @@
+import atexit
 import logging
 import os
+import importlib
+import datetime as dt
 import falcon
 import redis
-from typing import Type
+from typing import Type, Optional
 from depot.manager import DepotManager
-from sqlalchemy.orm import Session
 from config import Config
 from .middleware import (
     SADBSessionMiddleware,
@@ -12,24 +14,41 @@ from .middleware import (
     LoggingMiddleware,
     RedisMiddleware,
     MessageBusMiddleware,
+    OutboxMiddleware,
     ConfigMiddleware,
 )
 from src.entrypoints.web.middleware.auth_middleware import AuthMiddleware
 from .middleware.depot_middleware import DepotMiddleware
 from .middleware.cors_middleware import CORSMiddleware
 from src.entrypoints.web.lib.apicache import CacheMiddleware
-from src.models.meta import session_factory
+from src.lib.apicache import APICacheStorage, APICacheCounters, LocalAPICache
+from src.models.meta import scoped_session_factory
 from src import models
+from src import schemas
+from src.schemas.compiler import preload_schemas
 from src.entrypoints.web import api
+from src.entrypoints.web.lib.routes import add_routes
 from .errors.base import (
     validation_error_handler,
     no_result_found_handler,
 )
 
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm import configure_mappers
 from marshmallow import ValidationError
-from src.message_bus import make_message_bus, MessageBusABC
-import venusian
+from src.message_bus import make_message_bus, MessageBusABC, EventsPublisherABC
+from src.message_bus.publishers import OutboxEventsPublisher
+from src.lib.json_codec import make_json_codec
+from src.lib.principals_cache import RedisPrincipalsCache, LocalPrincipalsCache
+from src.lib.rate_limiter import RateLimiterABC, RedisTokenBucketRateLimiter, RedisSlidingWindowRateLimiter
+from .middleware.rate_limit import RateLimitMiddleware
+
+# heavy dependencies imported on first use, so a worker without preload does not pay for them at boot
+LAZY_MODULES = [
+    "user_agents",
+    "magic",
+    "PIL.Image",
+]
 
 
 class AppLogFilter(logging.Filter):
@@ -50,24 +69,32 @@ def make_app(
     if not depot:
         depot = _init_file_storage(config)
 
-    db_session = _make_db_session(config)
+    db_session = scoped_session_factory(config)
     redis_ = _make_redis_conn(config)
+    principals_cache = _make_principals_cache(config, redis_)
+    api_cache = _make_api_cache_storage(config, redis_)
 
     if not message_bus:
-        message_bus = make_message_bus(config)
+        message_bus = make_message_bus(config, _make_events_publisher(config), principals_cache, api_cache)
 
     middlewares = [
         ConfigMiddleware(config),
         DepotMiddleware(depot),
         RedisMiddleware(redis_),
-        CacheMiddleware(),
-        AuthMiddleware(db_session, config),
-        EncodeMiddleware(),
-        LoggingMiddleware(config),
+        CacheMiddleware(api_cache),
         SADBSessionMiddleware(db_session),
+        AuthMiddleware(db_session, config, principals_cache),
+        EncodeMiddleware(make_json_codec(config.json_codec), config.max_request_body_size),
+        LoggingMiddleware(config),
+        OutboxMiddleware(config),
         MessageBusMiddleware(message_bus),
     ]
 
+    if config.is_rate_limit_enabled:
+        middlewares.append(
+            RateLimitMiddleware(_make_rate_limiter(config, redis_), config)
+        )
+
     if config.is_cors_enabled:
         middlewares.append(
             CORSMiddleware(allow_origins='*', allow_credentials='*')
@@ -80,14 +107,28 @@ def make_app(
     app.add_error_handler(ValidationError, validation_error_handler)
     app.add_error_handler(NoResultFound, no_result_found_handler)
 
-    venusian.Scanner().scan(models)
-    venusian.Scanner(api=app).scan(api)
+    models.import_models()
+    add_routes(app, api)
+    preload_schemas(schemas)
 
     os.environ['PYTHON_EGG_CACHE'] = os.path.dirname(os.path.abspath(__file__)) + '/.cache'
 
     return app
 
 
+def make_preloaded_app(config: Type[Config] = Config) -> falcon.App:
+    # app factory for gunicorn preload_app: the work below is done once in the master,
+    # and the workers forked from it (also the ones restarted after max_requests) start ready
+    app = make_app(config)
+
+    configure_mappers()
+
+    for module_name in LAZY_MODULES:
+        importlib.import_module(module_name)
+
+    return app
+
+
 def _init_file_storage(config: Type[Config]):
     return DepotManager.configure(
         "default",
@@ -103,10 +144,67 @@ def _init_environment(config: Type[Config]):
     logger.setLevel(config.log_level)
 
 
-def _make_db_session(config: Type[Config]) -> Session:
-    session = session_factory(config)()
+def _make_events_publisher(config: Type[Config]) -> Optional[EventsPublisherABC]:
+    # with the outbox events are published by the relay, the request only runs synchronous handlers
+    if config.is_outbox_enabled:
+        return OutboxEventsPublisher()
+
+    if config.is_events_dispatch_enabled:
+        # celery is imported only by the apps that publish to it
+        from src.entrypoints.celery.publisher import CeleryEventsPublisher
+
+        return CeleryEventsPublisher()
+
+    return None
+
+
+def _make_principals_cache(config: Type[Config], redis_: redis.Redis) -> Optional[RedisPrincipalsCache]:
+    if not config.is_principals_cache_enabled:
+        return None
+
+    principals_cache = RedisPrincipalsCache(
+        redis_,
+        ttl=config.principals_cache_ttl,
+        local_cache=LocalPrincipalsCache(
+            max_size=config.principals_cache_local_size,
+            ttl=config.principals_cache_local_ttl,
+        ),
+    )
+    atexit.register(principals_cache.close)
+
+    return principals_cache
+
+
+def _make_api_cache_storage(config: Type[Config], redis_: redis.Redis) -> APICacheStorage:
+    counters_ttl = dt.timedelta(seconds=config.api_cache_counters_ttl)
+    counters = None
+
+    local_cache = None
+
+    if config.api_cache_counters_flush_interval > 0:
+        counters = APICacheCounters(
+            redis_,
+            ttl=counters_ttl,
+            flush_interval=config.api_cache_counters_flush_interval,
+        )
+
+    if config.api_cache_local_max_bytes > 0:
+        local_cache = LocalAPICache(
+            max_bytes=config.api_cache_local_max_bytes,
+            ttl=config.api_cache_local_ttl,
+        )
+
+    storage = APICacheStorage(redis_, counters_ttl=counters_ttl, counters=counters, local_cache=local_cache)
+    atexit.register(storage.close)
+
+    return storage
+
+
+def _make_rate_limiter(config: Type[Config], redis_: redis.Redis) -> RateLimiterABC:
+    if config.rate_limit_algorithm == "sliding_window":
+        return RedisSlidingWindowRateLimiter(redis_)
 
-    return session
+    return RedisTokenBucketRateLimiter(redis_)
 
 
 def _make_redis_conn(config: Type[Config]) -> redis.Redis:
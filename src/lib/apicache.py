@@ -0,0 +1,411 @@
+import json
+import time
+import threading
+import datetime as dt
+import logging
+from collections import Counter, OrderedDict
+from typing import List, Optional, Dict, Iterable
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from src.lib.redis import RedisHelper, InvalidationsListener
+from src.lib.background import BackgroundThread
+
+logger = logging.getLogger(__name__)
+
+HIT_COUNTERS_KEY = "API_CACHE:HIT_COUNTERS"
+MISS_COUNTERS_KEY = "API_CACHE:MISS_COUNTERS"
+# field of the counters hash with the count of every key
+TOTAL_FIELD = "__total__"
+# keys of deleted responses, the workers drop them from their local caches
+INVALIDATIONS_CHANNEL = "API_CACHE:INVALIDATIONS"
+MODIFIED_KEY = "API_CACHE:MODIFIED:{tag}"
+
+# GET of the cached response and the hit/miss count in one round trip,
+# KEYS - cache key, hit and miss counters hashes, ARGV - counters ttl (s)
+LOOKUP_SCRIPT = """
+local data = redis.call("GET", KEYS[1])
+local counters = KEYS[3]
+
+if data then
+    counters = KEYS[2]
+end
+
+redis.call("HINCRBY", counters, KEYS[1], 1)
+redis.call("HINCRBY", counters, "__total__", 1)
+
+if redis.call("TTL", counters) < 0 then
+    redis.call("EXPIRE", counters, ARGV[1])
+end
+
+return data
+"""
+
+# the counters hash keeps the ttl of its first write
+EXPIRE_SCRIPT = """
+if redis.call("TTL", KEYS[1]) < 0 then
+    redis.call("EXPIRE", KEYS[1], ARGV[1])
+end
+"""
+
+# cached responses of the tags and the tag sets themselves are deleted in one round trip
+# and the time of the change is written for Last-Modified,
+# KEYS - tag sets and then modification time keys of the tags, ARGV - modification time ttl (s),
+# returns the keys of the responses
+DELETE_TAGS_SCRIPT = """
+redis.replicate_commands()
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tags_count = #KEYS / 2
+local deleted = {}
+
+for t = 1, tags_count do
+    local members = redis.call("SMEMBERS", KEYS[t])
+
+    for i = 1, #members, 1000 do
+        redis.call("DEL", unpack(members, i, math.min(i + 999, #members)))
+    end
+
+    for _, member in ipairs(members) do
+        table.insert(deleted, member)
+    end
+
+    redis.call("DEL", KEYS[t])
+    redis.call("SET", KEYS[tags_count + t], now, "EX", ARGV[1])
+end
+
+return deleted
+"""
+
+# the latest modification time (ms) of the tags, a tag without one is taken as modified now,
+# so a response is never reported older than it is. KEYS - modification time keys, ARGV - their ttl (s)
+MODIFIED_SCRIPT = """
+redis.replicate_commands()
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local modified = 0
+
+for _, key in ipairs(KEYS) do
+    local value = tonumber(redis.call("GET", key))
+
+    if value == nil then
+        value = now
+        redis.call("SET", key, value, "EX", ARGV[1])
+    end
+
+    modified = math.max(modified, value)
+end
+
+return modified
+"""
+
+
+class APICacheCounters(BackgroundThread):
+    # hits and misses of the worker process are summed in memory and written by a background thread
+    # every `flush_interval` seconds in one pipeline, so the cache lookup is a plain GET
+    def __init__(self, redis: Redis, ttl: dt.timedelta = dt.timedelta(days=1), flush_interval: float = 5.0):
+        super().__init__("api-cache-counters")
+        self._redis = redis
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+        self._expire_script = redis.register_script(EXPIRE_SCRIPT)
+
+        self._lock = threading.Lock()
+        self._counts: Dict[tuple, int] = Counter()
+
+    def add(self, key: str, hit: bool):
+        self._ensure_started()
+
+        counters_key = HIT_COUNTERS_KEY if hit else MISS_COUNTERS_KEY
+
+        with self._lock:
+            self._counts[(counters_key, key)] += 1
+            self._counts[(counters_key, TOTAL_FIELD)] += 1
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+
+        if not counts:
+            return
+
+        try:
+            with self._redis.pipeline(transaction=False) as pipe:
+                for (counters_key, field), count in counts.items():
+                    pipe.hincrby(counters_key, field, count)
+
+                for counters_key in {counters_key for counters_key, _ in counts}:
+                    self._expire_script(
+                        keys=[counters_key],
+                        args=[int(self._ttl.total_seconds())],
+                        client=pipe,
+                    )
+
+                pipe.execute()
+        except Exception as e:
+            logger.error(e)
+
+    def close(self):
+        super().close()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self._flush_interval):
+            self.flush()
+
+
+class LocalAPICache:
+    # LRU of the worker process in front of redis bounded by the size of the responses,
+    # entries live at most `ttl` seconds in case an invalidation message is lost.
+    # The generation grows on every delete and clear: a value read from redis before an invalidation
+    # is not stored after it
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 30.0):
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._items: OrderedDict = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+
+            if item is not None and item[1] < time.monotonic():
+                self._pop(key)
+                item = None
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+
+            return item[0]
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: str, value: bytes, ttl: float = None, generation: int = None):
+        # `generation` - the one read before the value was taken from redis
+        ttl = self._ttl if ttl is None else min(ttl, self._ttl)
+
+        if ttl <= 0 or len(value) > self._max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            self._pop(key)
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._size += len(value)
+
+            while self._size > self._max_bytes:
+                self._pop(next(iter(self._items)))
+
+    def delete(self, keys: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+
+            for key in keys:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+            self._size = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "hit": self.hits,
+                "miss": self.misses,
+                "entries": len(self._items),
+                "bytes": self._size,
+            }
+
+    def _pop(self, key: str):
+        item = self._items.pop(key, None)
+
+        if item is not None:
+            self._size -= len(item[0])
+
+
+class APICacheInvalidationsListener(InvalidationsListener):
+    def __init__(self, redis: Redis, local_cache: LocalAPICache, reconnect_interval: float = 1.0):
+        super().__init__("api-cache-invalidations", redis, INVALIDATIONS_CHANNEL, reconnect_interval)
+        self._local_cache = local_cache
+
+    def _reset(self):
+        self._local_cache.clear()
+
+    def _invalidate(self, data: bytes):
+        self._local_cache.delete(json.loads(data))
+
+
+class APICacheStorage:
+    def __init__(
+            self,
+            redis: Redis,
+            counters_ttl: dt.timedelta = dt.timedelta(days=1),
+            counters: Optional[APICacheCounters] = None,
+            local_cache: Optional[LocalAPICache] = None,
+            modified_ttl: dt.timedelta = dt.timedelta(days=30),
+    ):
+        self._redis = redis
+        self._counters_ttl = counters_ttl
+        self._modified_ttl = modified_ttl
+        self._counters = counters
+        self._local_cache = local_cache
+        self._listener = None
+        self._lookup_script = redis.register_script(LOOKUP_SCRIPT)
+        self._delete_tags_script = redis.register_script(DELETE_TAGS_SCRIPT)
+        self._modified_script = redis.register_script(MODIFIED_SCRIPT)
+
+        if local_cache is not None:
+            self._listener = APICacheInvalidationsListener(redis, local_cache)
+
+    def get(self, key: str) -> Optional[bytes]:
+        local_cache = self._get_local_cache()
+
+        if local_cache is not None:
+            data = local_cache.get(key)
+
+            if data is not None:
+                return data
+
+            generation = local_cache.generation
+
+        data = self._get(key)
+
+        if data is not None and local_cache is not None:
+            local_cache.set(key, data, generation=generation)
+
+        return data
+
+    def _get(self, key: str) -> Optional[bytes]:
+        if self._counters is not None:
+            data = self._redis.get(key)
+            self._counters.add(key, hit=data is not None)
+
+            return data
+
+        return self._lookup_script(
+            keys=[key, HIT_COUNTERS_KEY, MISS_COUNTERS_KEY],
+            args=[int(self._counters_ttl.total_seconds())],
+        )
+
+    def set(self, key: str, value: bytes, ex: dt.timedelta, tags: List[str]):
+        RedisHelper(self._redis).set_with_tags(key, value, ex=ex, tags=tags)
+
+        local_cache = self._get_local_cache()
+
+        if local_cache is not None:
+            local_cache.set(key, value, ttl=ex.total_seconds())
+
+    def delete(self, key: str):
+        self._redis.delete(key)
+        self._invalidate([key])
+
+    def delete_by_tags(self, tags: List[str]) -> int:
+        if not tags:
+            return 0
+
+        deleted = self._delete_tags_script(
+            keys=[RedisHelper.tag_prefix(tag) for tag in tags] + [MODIFIED_KEY.format(tag=tag) for tag in tags],
+            args=[int(self._modified_ttl.total_seconds())],
+        )
+        keys = [key.decode() if isinstance(key, bytes) else key for key in deleted]
+
+        self._invalidate(keys)
+
+        return len(keys)
+
+    def get_modified(self, tags: List[str]) -> dt.datetime:
+        # utc time of the latest delete_by_tags of the tags
+        modified = self._modified_script(
+            keys=[MODIFIED_KEY.format(tag=tag) for tag in tags],
+            args=[int(self._modified_ttl.total_seconds())],
+        )
+
+        return dt.datetime.utcfromtimestamp(modified / 1000)
+
+    def _get_local_cache(self) -> Optional[LocalAPICache]:
+        if self._listener is not None and self._listener.is_subscribed():
+            return self._local_cache
+
+        return None
+
+    def _invalidate(self, keys: List[str]):
+        if not keys or self._local_cache is None:
+            return
+
+        # the worker drops its own copies at once, the others on the message
+        self._local_cache.delete(keys)
+        self._redis.publish(INVALIDATIONS_CHANNEL, json.dumps(keys))
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+
+        if self._counters is not None:
+            self._counters.close()
+
+    def get_counters(self, key: str = TOTAL_FIELD) -> dict:
+        if self._counters is not None:
+            self._counters.flush()
+
+        with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hget(HIT_COUNTERS_KEY, key)
+            pipe.hget(MISS_COUNTERS_KEY, key)
+            hit, miss = pipe.execute()
+
+        return {
+            "hit": int(hit or 0),
+            "miss": int(miss or 0),
+        }
+
+    def get_stats(self) -> dict:
+        # hit rates of the tiers: the local cache of this worker process and redis of all the workers,
+        # redis lookups are only the misses of the local cache
+        tiers = {"redis": self.get_counters()}
+
+        if self._local_cache is not None:
+            tiers["local"] = self._local_cache.get_stats()
+
+        for tier in tiers.values():
+            total = tier["hit"] + tier["miss"]
+            tier["hit_rate"] = round(tier["hit"] / total, 4) if total else None
+
+        return tiers
+
+
+class AsyncAPICacheStorage:
+    # the ASGI app does not cache responses, it drops the ones the WSGI app cached for the data it changes:
+    # the same script deletes them by tags and the keys go to the local caches of the WSGI workers
+    def __init__(self, redis: AsyncRedis, modified_ttl: dt.timedelta = dt.timedelta(days=30)):
+        self._redis = redis
+        self._modified_ttl = modified_ttl
+        self._delete_tags_script = redis.register_script(DELETE_TAGS_SCRIPT)
+
+    async def delete_by_tags(self, tags: List[str]) -> int:
+        if not tags:
+            return 0
+
+        deleted = await self._delete_tags_script(
+            keys=[RedisHelper.tag_prefix(tag) for tag in tags] + [MODIFIED_KEY.format(tag=tag) for tag in tags],
+            args=[int(self._modified_ttl.total_seconds())],
+        )
+        keys = [key.decode() if isinstance(key, bytes) else key for key in deleted]
+
+        if keys:
+            await self._redis.publish(INVALIDATIONS_CHANNEL, json.dumps(keys))
+
+        return len(keys)
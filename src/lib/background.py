@@ -0,0 +1,55 @@
+import os
+import threading
+from typing import Optional
+
+
+class BackgroundThread:
+    # daemon thread of an object started on first use (_ensure_started) and stopped by close.
+    # A thread started before fork (gunicorn --preload) does not exist in the worker,
+    # so it is started again in every process
+    def __init__(self, name: str):
+        self._thread_name = name
+        self._thread_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def close(self):
+        with self._thread_lock:
+            if not self._is_running():
+                return
+
+            self._stop()
+            self._thread.join()
+            self._thread = None
+
+    def _is_running(self) -> bool:
+        return self._thread is not None and self._pid == os.getpid()
+
+    def _ensure_started(self):
+        if self._is_running():
+            return
+
+        with self._thread_lock:
+            if self._is_running():
+                return
+
+            self._pid = os.getpid()
+            self._stopped = threading.Event()
+            self._on_start()
+            self._thread = threading.Thread(
+                target=self._run,
+                name=self._thread_name,
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _on_start(self):
+        # state the new thread works with (queues, events) is made here
+        pass
+
+    def _stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        raise NotImplementedError
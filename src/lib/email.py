@@ -7,7 +7,6 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from io import BytesIO
 from config import Config
-import magic
 
 
 FILE_HEAD_SIZE = 1024
@@ -46,6 +45,10 @@ class EmailSender:
         if html_body:
             message.attach(MIMEText(html_body, "html"))
 
+        if attachments:
+            # libmagic is loaded only to check attachments
+            import magic
+
         for attachment in attachments:
             if attachment['type'] == 'bytes':
                 file = BytesIO(attachment['file'])
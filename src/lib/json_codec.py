@@ -0,0 +1,148 @@
+import abc
+import json
+import datetime as dt
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, AsyncIterator, Optional
+from uuid import UUID
+from src.models.primitives.base import Primitive
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+def _default(obj: Any):
+    # types the dump schemas leave as is, orjson and msgspec encode UUID and datetime themselves
+    if isinstance(obj, UUID):
+        return str(obj)
+
+    if isinstance(obj, (dt.datetime, dt.date, dt.time)):
+        return obj.isoformat()
+
+    if isinstance(obj, Decimal):
+        return str(obj)
+
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+
+    if isinstance(obj, Primitive):
+        return obj.value
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONCodecABC(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodecABC):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodecABC):
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        # naive datetimes are written without an offset, as datetime.isoformat does
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodecABC):
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder(enc_hook=_default)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+
+JSON_CODECS = {
+    StdlibJSONCodec.name: (StdlibJSONCodec, json),
+    OrjsonCodec.name: (OrjsonCodec, orjson),
+    MsgspecCodec.name: (MsgspecCodec, msgspec),
+}
+
+
+def make_json_codec(name: str = "auto") -> JSONCodecABC:
+    # "auto" takes the fastest installed backend, orjson and msgspec are optional dependencies
+    if name == "auto":
+        for name in (OrjsonCodec.name, MsgspecCodec.name):
+            if JSON_CODECS[name][1] is not None:
+                break
+        else:
+            name = StdlibJSONCodec.name
+
+    if name not in JSON_CODECS:
+        raise ValueError(f"Unknown json codec: {name}")
+
+    codec_cls, module = JSON_CODECS[name]
+
+    if module is None:
+        raise ValueError(f"Json codec {name} is not installed")
+
+    return codec_cls()
+
+
+class JSONArrayStream:
+    # JSON array written item by item, so a large collection is never held in memory as one string.
+    # `dump` turns an item into a JSON-compatible value, e.g. a dump schema method
+    def __init__(
+            self,
+            items: Iterable,
+            codec: JSONCodecABC,
+            dump: Optional[Callable[[Any], Any]] = None,
+            chunk_size: int = 64 * 1024,
+    ):
+        self._items = items
+        self._codec = codec
+        self._dump = dump
+        self._chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        chunk = bytearray(b"[")
+
+        for index, item in enumerate(self._items):
+            if index:
+                chunk += b","
+
+            chunk += self._codec.dumps(self._dump(item) if self._dump else item)
+
+            if len(chunk) >= self._chunk_size:
+                yield bytes(chunk)
+                chunk = bytearray()
+
+        chunk += b"]"
+
+        yield bytes(chunk)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self:
+            yield chunk
@@ -1,8 +1,17 @@
 import abc
+import base64
+import binascii
+import datetime as dt
+import json
+import logging
 import sqlalchemy as sa
+from redis import Redis, RedisError
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Tuple, Any, Optional, Iterable
 from math import ceil
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_PAGE_SIZE = 20
 
@@ -102,3 +111,306 @@ class AsyncSAPagination(PaginationABC):
         total = result.scalar()
 
         return total
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class KeysetOrdering:
+    # columns is a list of (sql expression, python type) pairs,
+    # the last expression must be unique (usually id) to keep the order strict
+    def __init__(self, columns: List[Tuple[Any, type]], desc: bool = False):
+        self.columns = columns
+        self.desc = desc
+
+    @property
+    def expressions(self) -> List:
+        return [expression for expression, _ in self.columns]
+
+    def order_by(self) -> List:
+        if self.desc:
+            return [expression.desc() for expression in self.expressions]
+
+        return [expression.asc() for expression in self.expressions]
+
+    def after(self, values: List[Any]):
+        keys = sa.tuple_(*self.expressions)
+        bound_values = sa.tuple_(*[
+            sa.literal(value, type_=expression.type) for expression, value in zip(self.expressions, values)
+        ])
+
+        if self.desc:
+            return keys < bound_values
+
+        return keys > bound_values
+
+    def encode_cursor(self, values: Iterable[Any]) -> str:
+        raw = json.dumps([_encode_cursor_value(value) for value in values], separators=(",", ":"))
+
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            raw_values = json.loads(base64.urlsafe_b64decode(cursor + padding).decode("utf-8"))
+        except (ValueError, TypeError, binascii.Error):
+            raise InvalidCursorError("Invalid cursor")
+
+        if not isinstance(raw_values, list) or len(raw_values) != len(self.columns):
+            raise InvalidCursorError("Invalid cursor")
+
+        try:
+            return [
+                _decode_cursor_value(value, python_type)
+                for value, (_, python_type) in zip(raw_values, self.columns)
+            ]
+        except (ValueError, TypeError):
+            raise InvalidCursorError("Invalid cursor")
+
+
+def _encode_cursor_value(value: Any):
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+
+    if isinstance(value, UUID):
+        return str(value)
+
+    return value
+
+
+def _decode_cursor_value(value: Any, python_type: type):
+    if python_type is dt.datetime:
+        return dt.datetime.fromisoformat(value)
+
+    if python_type is UUID:
+        return UUID(value)
+
+    if not isinstance(value, python_type):
+        raise TypeError(f"Cursor value {value} is not {python_type}")
+
+    return value
+
+
+class CountCacheABC(abc.ABC):
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[int]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: str, value: int):
+        raise NotImplementedError
+
+
+class RedisCountCache(CountCacheABC):
+    KEY_PREFIX = "PAGINATION_TOTAL"
+
+    def __init__(self, redis: Redis, ttl: dt.timedelta = dt.timedelta(seconds=30)):
+        self._redis = redis
+        self._ttl = ttl
+
+    def get(self, key: str) -> Optional[int]:
+        try:
+            value = self._redis.get(f"{self.KEY_PREFIX}:{key}")
+        except RedisError as e:
+            logger.error(e)
+            return None
+
+        return int(value) if value is not None else None
+
+    def set(self, key: str, value: int):
+        try:
+            self._redis.set(f"{self.KEY_PREFIX}:{key}", value, ex=self._ttl)
+        except RedisError as e:
+            logger.error(e)
+
+
+class KeysetPaginationABC(abc.ABC):
+    def __init__(self, ordering: KeysetOrdering, page_size: int, cursor: Optional[str] = None):
+        self.ordering = ordering
+        self.page_size = page_size
+        self.cursor = cursor
+
+    @property
+    @abc.abstractmethod
+    def items(self) -> List:
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def next_cursor(self) -> Optional[str]:
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def total(self) -> Optional[int]:
+        raise NotImplementedError
+
+    def _split_rows(self, rows: List) -> Tuple[List, Optional[str]]:
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        items = [row[0] for row in rows]
+        next_cursor = None
+
+        if has_next and rows:
+            next_cursor = self.ordering.encode_cursor(rows[-1][1:])
+
+        return items, next_cursor
+
+
+class SAKeysetPagination(KeysetPaginationABC):
+    def __init__(
+            self,
+            query,
+            ordering: KeysetOrdering,
+            page_size: int,
+            cursor: Optional[str] = None,
+            with_total: bool = False,
+            count_cache: Optional[CountCacheABC] = None,
+            count_cache_key: Optional[str] = None,
+    ):
+        super().__init__(ordering, page_size, cursor)
+
+        self._query = query
+        self._with_total = with_total
+        self._count_cache = count_cache
+        self._count_cache_key = count_cache_key
+
+        self._cursor_values = ordering.decode_cursor(cursor) if cursor else None
+
+        self._items = None
+        self._next_cursor = None
+        self._total = None
+
+    @property
+    def items(self) -> List:
+        if self._items is None:
+            self._items, self._next_cursor = self._split_rows(self._paginate().all())
+
+        return self._items
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if self._items is None:
+            self.items
+
+        return self._next_cursor
+
+    @property
+    def total(self) -> Optional[int]:
+        if not self._with_total:
+            return None
+
+        if self._total is None:
+            self._total = self._get_total()
+
+        return self._total
+
+    def _paginate(self):
+        query = self._query.add_columns(*self.ordering.expressions)
+
+        if self._cursor_values is not None:
+            query = query.filter(self.ordering.after(self._cursor_values))
+
+        return query.order_by(None).order_by(
+            *self.ordering.order_by()
+        ).limit(self.page_size + 1)
+
+    def _get_total(self) -> int:
+        use_cache = self._count_cache is not None and self._count_cache_key is not None
+
+        if use_cache:
+            total = self._count_cache.get(self._count_cache_key)
+
+            if total is not None:
+                return total
+
+        total = self._query.order_by(None).count()
+
+        if use_cache:
+            self._count_cache.set(self._count_cache_key, total)
+
+        return total
+
+
+class AsyncSAKeysetPagination(KeysetPaginationABC):
+    def __init__(
+            self,
+            db_session: AsyncSession,
+            ordering: KeysetOrdering,
+            page_size: int,
+            cursor: Optional[str] = None,
+            with_total: bool = False,
+            count_cache: Optional[CountCacheABC] = None,
+            count_cache_key: Optional[str] = None,
+    ):
+        super().__init__(ordering, page_size, cursor)
+
+        self._db_session = db_session
+        self._with_total = with_total
+        self._count_cache = count_cache
+        self._count_cache_key = count_cache_key
+
+        self._cursor_values = ordering.decode_cursor(cursor) if cursor else None
+
+        self._items = None
+        self._next_cursor = None
+        self._total = None
+
+    async def create(self, query) -> 'AsyncSAKeysetPagination':
+        if self._with_total:
+            self._total = await self._get_total(query)
+
+        rows = await self._paginate(query)
+        self._items, self._next_cursor = self._split_rows(rows)
+
+        return self
+
+    @property
+    def items(self) -> List:
+        return self._items
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        return self._next_cursor
+
+    @property
+    def total(self) -> Optional[int]:
+        return self._total
+
+    async def _paginate(self, query) -> List:
+        query = query.add_columns(*self.ordering.expressions)
+
+        if self._cursor_values is not None:
+            query = query.where(self.ordering.after(self._cursor_values))
+
+        query = query.order_by(None).order_by(
+            *self.ordering.order_by()
+        ).limit(self.page_size + 1)
+
+        result = await self._db_session.execute(query)
+
+        return result.unique().all()
+
+    async def _get_total(self, query) -> int:
+        use_cache = self._count_cache is not None and self._count_cache_key is not None
+
+        if use_cache:
+            total = self._count_cache.get(self._count_cache_key)
+
+            if total is not None:
+                return total
+
+        # eager loads of the entity query are not rendered inside the subquery
+        query = sa.select(sa.func.count()).select_from(
+            query.order_by(None).subquery()
+        )
+
+        result = await self._db_session.execute(query)
+        total = result.scalar()
+
+        if use_cache:
+            self._count_cache.set(self._count_cache_key, total)
+
+        return total
@@ -0,0 +1,390 @@
+import abc
+import json
+import time
+import threading
+import datetime as dt
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+from src.models.user import User
+from src.lib.redis import InvalidationsListener
+from src.models.primitives.user import (
+    Email,
+    FirstName,
+    LastName,
+    MiddleName,
+)
+from uuid import UUID
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_KEY = "PRINCIPAL:{user_id}"
+# grows on every invalidation of the user, a principal loaded from the database before it is not cached
+PRINCIPAL_VERSION_KEY = "PRINCIPAL:VERSION:{user_id}"
+# the version only has to outlive the load of a principal
+PRINCIPAL_VERSION_TTL = int(dt.timedelta(days=1).total_seconds())
+# ids of invalidated users, the workers drop them from their local caches
+INVALIDATIONS_CHANNEL = "PRINCIPALS:INVALIDATIONS"
+
+# the principal is cached only if the user was not invalidated since the version was read,
+# KEYS - principal key, version key, ARGV - version, principal, ttl (s)
+SET_SCRIPT = """
+if (redis.call("GET", KEYS[2]) or "0") ~= ARGV[1] then
+    return 0
+end
+
+redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+
+return 1
+"""
+
+# KEYS - principal key, version key, ARGV - channel, user id, version ttl (s)
+INVALIDATE_SCRIPT = """
+redis.call("DEL", KEYS[1])
+redis.call("INCR", KEYS[2])
+redis.call("EXPIRE", KEYS[2], ARGV[3])
+redis.call("PUBLISH", ARGV[1], ARGV[2])
+"""
+
+
+@dataclass(frozen=True)
+class Principal:
+    # snapshot of the user the bearer auth needs, controllers get it as current_user
+    id: UUID
+    email: Email
+    credential_version: UUID
+    is_admin: bool = False
+    first_name: Optional[FirstName] = None
+    last_name: Optional[LastName] = None
+    middle_name: Optional[MiddleName] = None
+    created: Optional[dt.datetime] = None
+    updated: Optional[dt.datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> 'Principal':
+        return cls(
+            id=user.id,
+            email=user.email,
+            credential_version=user.credential_version,
+            is_admin=user.is_admin,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            middle_name=user.middle_name,
+            created=user.created,
+            updated=user.updated,
+        )
+
+    def serialize(self) -> str:
+        return json.dumps({
+            "id": str(self.id),
+            "email": self.email.value,
+            "credential_version": str(self.credential_version),
+            "is_admin": self.is_admin,
+            "first_name": self.first_name.value if self.first_name else None,
+            "last_name": self.last_name.value if self.last_name else None,
+            "middle_name": self.middle_name.value if self.middle_name else None,
+            "created": self.created.isoformat() if self.created else None,
+            "updated": self.updated.isoformat() if self.updated else None,
+        })
+
+    @classmethod
+    def deserialize(cls, data) -> 'Principal':
+        data = json.loads(data)
+
+        return cls(
+            id=UUID(data["id"]),
+            email=Email(data["email"]),
+            credential_version=UUID(data["credential_version"]),
+            is_admin=data["is_admin"],
+            first_name=FirstName(data["first_name"]) if data["first_name"] else None,
+            last_name=LastName(data["last_name"]) if data["last_name"] else None,
+            middle_name=MiddleName(data["middle_name"]) if data["middle_name"] else None,
+            created=dt.datetime.fromisoformat(data["created"]) if data["created"] else None,
+            updated=dt.datetime.fromisoformat(data["updated"]) if data["updated"] else None,
+        )
+
+
+class LocalPrincipalsCache:
+    # LRU of the worker process in front of redis, entries are dropped by the invalidations listener
+    # and live at most `ttl` seconds in case a message is lost.
+    # The generation grows on every invalidation: a principal read before it is not stored after it
+    def __init__(self, max_size: int = 1024, ttl: float = 5.0):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._items: OrderedDict = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        with self._lock:
+            item = self._items.get(user_id)
+
+            if item is None:
+                return None
+
+            principal, expires = item
+
+            if expires < time.monotonic():
+                del self._items[user_id]
+                return None
+
+            self._items.move_to_end(user_id)
+
+            return principal
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, principal: Principal, generation: int = None):
+        if self._max_size <= 0 or self._ttl <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            self._items[principal.id] = (principal, time.monotonic() + self._ttl)
+            self._items.move_to_end(principal.id)
+
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        with self._lock:
+            self._generation += 1
+            self._items.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+
+
+class PrincipalsInvalidationsListener(InvalidationsListener):
+    def __init__(self, redis: Redis, local_cache: LocalPrincipalsCache, reconnect_interval: float = 1.0):
+        super().__init__("principals-invalidations", redis, INVALIDATIONS_CHANNEL, reconnect_interval)
+        self._local_cache = local_cache
+
+    def _reset(self):
+        self._local_cache.clear()
+
+    def _invalidate(self, data: bytes):
+        self._local_cache.invalidate(UUID(data.decode()))
+
+
+class PrincipalsCacheABC(abc.ABC):
+    @abc.abstractmethod
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_version(self, user_id: UUID) -> Optional[str]:
+        # read before the user is loaded from the database and passed to set
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, principal: Principal, version: Optional[str]):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def invalidate(self, user_id: UUID):
+        raise NotImplementedError
+
+
+def _decode_version(version) -> str:
+    if version is None:
+        return "0"
+
+    return version.decode() if isinstance(version, bytes) else str(version)
+
+
+# redis errors are logged and taken as a cache miss, the auth then goes to the database
+class RedisPrincipalsCache(PrincipalsCacheABC):
+    def __init__(self, redis: Redis, ttl: int = 60, local_cache: Optional[LocalPrincipalsCache] = None):
+        self._redis = redis
+        self._ttl = ttl
+        self._local_cache = local_cache
+        self._listener = None
+        self._set_script = redis.register_script(SET_SCRIPT)
+        self._invalidate_script = redis.register_script(INVALIDATE_SCRIPT)
+
+        if local_cache is not None:
+            self._listener = PrincipalsInvalidationsListener(redis, local_cache)
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        local_cache = self._get_local_cache()
+        generation = None
+
+        if local_cache is not None:
+            principal = local_cache.get(user_id)
+
+            if principal is not None:
+                return principal
+
+            generation = local_cache.generation
+
+        try:
+            data = self._redis.get(PRINCIPAL_KEY.format(user_id=user_id))
+        except RedisError as e:
+            logger.exception(e)
+            return None
+
+        if data is None:
+            return None
+
+        principal = Principal.deserialize(data)
+
+        if local_cache is not None:
+            local_cache.set(principal, generation)
+
+        return principal
+
+    def get_version(self, user_id: UUID) -> Optional[str]:
+        try:
+            return _decode_version(self._redis.get(PRINCIPAL_VERSION_KEY.format(user_id=user_id)))
+        except RedisError as e:
+            logger.exception(e)
+            return None
+
+    def set(self, principal: Principal, version: Optional[str]):
+        if version is None:
+            return
+
+        local_cache = self._get_local_cache()
+        generation = local_cache.generation if local_cache is not None else None
+
+        try:
+            stored = self._set_script(
+                keys=[PRINCIPAL_KEY.format(user_id=principal.id), PRINCIPAL_VERSION_KEY.format(user_id=principal.id)],
+                args=[version, principal.serialize(), self._ttl],
+            )
+        except RedisError as e:
+            logger.exception(e)
+            return
+
+        if stored and local_cache is not None:
+            local_cache.set(principal, generation)
+
+    def invalidate(self, user_id: UUID):
+        # the worker drops its own copy at once, the others on the message
+        if self._local_cache is not None:
+            self._local_cache.invalidate(user_id)
+
+        try:
+            self._invalidate_script(
+                keys=[PRINCIPAL_KEY.format(user_id=user_id), PRINCIPAL_VERSION_KEY.format(user_id=user_id)],
+                args=[INVALIDATIONS_CHANNEL, str(user_id), PRINCIPAL_VERSION_TTL],
+            )
+        except RedisError as e:
+            logger.exception(e)
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+
+    def _get_local_cache(self) -> Optional[LocalPrincipalsCache]:
+        if self._listener is not None and self._listener.is_subscribed():
+            return self._local_cache
+
+        return None
+
+
+class AsyncRedisPrincipalsCache(PrincipalsCacheABC):
+    # the invalidations listener is a thread with its own sync connection
+    def __init__(
+            self,
+            redis: AsyncRedis,
+            ttl: int = 60,
+            local_cache: Optional[LocalPrincipalsCache] = None,
+            invalidations_redis: Optional[Redis] = None,
+    ):
+        self._redis = redis
+        self._ttl = ttl
+        self._local_cache = local_cache
+        self._listener = None
+        self._set_script = redis.register_script(SET_SCRIPT)
+        self._invalidate_script = redis.register_script(INVALIDATE_SCRIPT)
+
+        if local_cache is not None and invalidations_redis is not None:
+            self._listener = PrincipalsInvalidationsListener(invalidations_redis, local_cache)
+
+    async def get(self, user_id: UUID) -> Optional[Principal]:
+        local_cache = self._get_local_cache()
+        generation = None
+
+        if local_cache is not None:
+            principal = local_cache.get(user_id)
+
+            if principal is not None:
+                return principal
+
+            generation = local_cache.generation
+
+        try:
+            data = await self._redis.get(PRINCIPAL_KEY.format(user_id=user_id))
+        except RedisError as e:
+            logger.exception(e)
+            return None
+
+        if data is None:
+            return None
+
+        principal = Principal.deserialize(data)
+
+        if local_cache is not None:
+            local_cache.set(principal, generation)
+
+        return principal
+
+    async def get_version(self, user_id: UUID) -> Optional[str]:
+        try:
+            return _decode_version(await self._redis.get(PRINCIPAL_VERSION_KEY.format(user_id=user_id)))
+        except RedisError as e:
+            logger.exception(e)
+            return None
+
+    async def set(self, principal: Principal, version: Optional[str]):
+        if version is None:
+            return
+
+        local_cache = self._get_local_cache()
+        generation = local_cache.generation if local_cache is not None else None
+
+        try:
+            stored = await self._set_script(
+                keys=[PRINCIPAL_KEY.format(user_id=principal.id), PRINCIPAL_VERSION_KEY.format(user_id=principal.id)],
+                args=[version, principal.serialize(), self._ttl],
+            )
+        except RedisError as e:
+            logger.exception(e)
+            return
+
+        if stored and local_cache is not None:
+            local_cache.set(principal, generation)
+
+    async def invalidate(self, user_id: UUID):
+        if self._local_cache is not None:
+            self._local_cache.invalidate(user_id)
+
+        try:
+            await self._invalidate_script(
+                keys=[PRINCIPAL_KEY.format(user_id=user_id), PRINCIPAL_VERSION_KEY.format(user_id=user_id)],
+                args=[INVALIDATIONS_CHANNEL, str(user_id), PRINCIPAL_VERSION_TTL],
+            )
+        except RedisError as e:
+            logger.exception(e)
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+
+    def _get_local_cache(self) -> Optional[LocalPrincipalsCache]:
+        if self._listener is not None and self._listener.is_subscribed():
+            return self._local_cache
+
+        return None
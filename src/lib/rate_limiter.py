@@ -1,61 +1,152 @@
 import abc
-import time
-import logging
-from redis import Redis, ConnectionError
+from dataclasses import dataclass
+from redis import Redis
+from uuid import uuid4
 
-logger = logging.getLogger(__name__)
+# both scripts take the time from redis, so web servers with different clocks share one limit,
+# and run in one round trip: the check and the update cannot interleave with another request
 
+# KEYS[1] - bucket hash, ARGV - capacity, refill interval of the whole bucket (ms), cost
+TOKEN_BUCKET_SCRIPT = """
+redis.replicate_commands()
 
-class TokenBucketRateLimiterABC(abc.ABC):
-    @abc.abstractmethod
-    def rate_limit(self, token: str, interval: int, max_requests: int) -> bool:
-        raise NotImplementedError
+local capacity = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rate = capacity / interval
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
 
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) / rate)
+end
 
-class RedisTokenBucketRateLimiter(TokenBucketRateLimiterABC):
-    def __init__(self, redis: Redis):
-        self._redis = redis
+local reset_after = math.ceil((capacity - tokens) / rate)
 
-    def rate_limit(self, token: str, interval: int, max_requests: int) -> bool:
-        counter_key = f"rate_limit:{token}_counter"
-        last_reset_key = f"rate_limit:{token}_last_reset"
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.max(reset_after, 1))
 
-        try:
-            if self._check_reset_interval(last_reset_key, interval):
-                self._reset_counter(counter_key, last_reset_key, max_requests, interval)
-            else:
-                if self._check_counter_value(counter_key) is False:
-                    return False
+return {allowed, math.floor(tokens), retry_after, reset_after}
+"""
 
-            self._decrement_counter(counter_key)
+# KEYS[1] - sorted set of request times, ARGV - limit, window (ms), cost, unique request id
+SLIDING_WINDOW_SCRIPT = """
+redis.replicate_commands()
 
-            return True
-        except ConnectionError as e:
-            logger.exception(e)
-            return False
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
 
-    def _check_reset_interval(self, last_reset_key: str, interval: int) -> bool:
-        last_reset_time = self._get_last_reset_time(last_reset_key)
-        now = int(time.time())
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
 
-        return (now - last_reset_time) >= interval
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
 
-    def _get_last_reset_time(self, key: str) -> int:
-        last_reset_time = self._redis.get(key)
+local count = redis.call("ZCARD", KEYS[1])
+local allowed = 0
+local retry_after = 0
 
-        return int(last_reset_time or 0)
+if count + cost <= limit then
+    for i = 1, cost do
+        redis.call("ZADD", KEYS[1], now, ARGV[4] .. ":" .. i)
+    end
+    count = count + cost
+    allowed = 1
+else
+    local oldest = redis.call("ZRANGE", KEYS[1], count + cost - limit - 1, count + cost - limit - 1, "WITHSCORES")
+    retry_after = math.max(tonumber(oldest[2]) + window - now, 1)
+end
 
-    def _check_counter_value(self, counter_key: str) -> bool:
-        counter_value = self._get_counter_value(counter_key)
-        return counter_value > 0
+local reset_after = 0
+local newest = redis.call("ZRANGE", KEYS[1], -1, -1, "WITHSCORES")
 
-    def _get_counter_value(self, counter_key: str) -> int:
-        counter_value = self._redis.get(counter_key)
-        return int(counter_value or 0)
+if newest[2] then
+    reset_after = tonumber(newest[2]) + window - now
+    redis.call("PEXPIRE", KEYS[1], window)
+end
+
+return {allowed, limit - count, retry_after, reset_after}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    allowed: bool
+    limit: int
+    remaining: int
+    # seconds
+    retry_after: float
+    reset_after: float
+
+
+class RateLimiterABC(abc.ABC):
+    @abc.abstractmethod
+    def hit(self, key: str, limit: int, interval: int, cost: int = 1) -> RateLimit:
+        raise NotImplementedError
 
-    def _decrement_counter(self, counter_key: str):
-        self._redis.decr(counter_key)
 
-    def _reset_counter(self, counter_key: str, last_reset_key: str, max_requests: int, interval: int):
-        self._redis.set(counter_key, max_requests, ex=interval)
-        self._redis.set(last_reset_key, int(time.time()), ex=interval)
+class RedisTokenBucketRateLimiter(RateLimiterABC):
+    # a bucket of `limit` tokens is refilled continuously, the whole bucket in `interval` seconds,
+    # so short bursts up to the limit are allowed and the average rate is kept
+    def __init__(self, redis: Redis, prefix: str = "rate_limit:bucket"):
+        self._prefix = prefix
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def hit(self, key: str, limit: int, interval: int, cost: int = 1) -> RateLimit:
+        if cost > limit:
+            raise ValueError("cost is greater than the limit")
+
+        allowed, remaining, retry_after, reset_after = self._script(
+            keys=[f"{self._prefix}:{key}"],
+            args=[limit, int(interval * 1000), cost],
+        )
+
+        return RateLimit(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=remaining,
+            retry_after=retry_after / 1000,
+            reset_after=reset_after / 1000,
+        )
+
+
+class RedisSlidingWindowRateLimiter(RateLimiterABC):
+    # at most `limit` requests in any `interval` seconds, every request is kept in a sorted set
+    def __init__(self, redis: Redis, prefix: str = "rate_limit:window"):
+        self._prefix = prefix
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, key: str, limit: int, interval: int, cost: int = 1) -> RateLimit:
+        if cost > limit:
+            raise ValueError("cost is greater than the limit")
+
+        allowed, remaining, retry_after, reset_after = self._script(
+            keys=[f"{self._prefix}:{key}"],
+            args=[limit, int(interval * 1000), cost, uuid4().hex],
+        )
+
+        return RateLimit(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=remaining,
+            retry_after=retry_after / 1000,
+            reset_after=reset_after / 1000,
+        )
@@ -1,7 +1,12 @@
+import threading
 import datetime as dt
-from redis import Redis
+import logging
+from redis import Redis, RedisError
 from typing import Optional, Dict, Set, Union
 from redis.client import Pipeline
+from src.lib.background import BackgroundThread
+
+logger = logging.getLogger(__name__)
 
 
 class RedisHelper:
@@ -96,3 +101,66 @@ class RedisHelper:
             if ex is not None:
                 pipe.expire(name, ex)
             pipe.execute()
+
+
+class InvalidationsListener(BackgroundThread):
+    # applies the invalidations published by the other workers to a local cache,
+    # the local cache is used only while the subscription is alive and is reset on (re)subscribe,
+    # so no invalidation is missed
+    def __init__(self, name: str, redis: Redis, channel: str, reconnect_interval: float = 1.0):
+        super().__init__(name)
+        self._redis = redis
+        self._channel = channel
+        self._reconnect_interval = reconnect_interval
+
+        self._subscribed = threading.Event()
+
+    def is_subscribed(self) -> bool:
+        self._ensure_started()
+
+        return self._subscribed.is_set()
+
+    def wait_subscribed(self, timeout: float = None) -> bool:
+        self._ensure_started()
+
+        return self._subscribed.wait(timeout)
+
+    def close(self):
+        super().close()
+        self._subscribed.clear()
+
+    def _on_start(self):
+        self._subscribed = threading.Event()
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _invalidate(self, data: bytes):
+        raise NotImplementedError
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except RedisError as e:
+                logger.error(e)
+
+            self._subscribed.clear()
+            self._reset()
+            self._stopped.wait(self._reconnect_interval)
+
+    def _listen(self):
+        with self._redis.pubsub() as pubsub:
+            pubsub.subscribe(self._channel)
+
+            while not self._stopped.is_set():
+                message = pubsub.get_message(timeout=1.0)
+
+                if message is None:
+                    continue
+
+                if message["type"] == "subscribe":
+                    self._reset()
+                    self._subscribed.set()
+                elif message["type"] == "message":
+                    self._invalidate(message["data"])
@@ -1,5 +1,16 @@
 import pytz
+import asyncio
+import functools
+import contextvars
 
 
 def local_to_utc(datetime):
     return datetime.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+async def run_in_thread(func, *args, **kwargs):
+    # asyncio.to_thread appeared in python 3.9, the thread sees the context variables of the caller as there
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+
+    return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
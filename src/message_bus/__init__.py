@@ -1,11 +1,15 @@
-from .factory import make_message_bus
-from .message_bus import MessageBus, MessageBusABC, AsyncMessageBus
+from .factory import make_message_bus, make_async_message_bus
+from .message_bus import MessageBus, MessageBusABC, AsyncMessageBus, DispatchingMessageBus
+from .publishers import EventsPublisherABC
 from .events import Event
 
 __all__ = [
     MessageBusABC,
     MessageBus,
     AsyncMessageBus,
+    DispatchingMessageBus,
+    EventsPublisherABC,
     make_message_bus,
+    make_async_message_bus,
     Event,
 ]
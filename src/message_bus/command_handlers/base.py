@@ -1,7 +1,7 @@
 import abc
 from typing import List
 from src.message_bus import commands
-from src.message_bus.types import Message
+from src.message_bus.types import Message, EMITTED_MESSAGES
 
 
 class CommandHandlerABC(abc.ABC):
@@ -13,7 +13,12 @@ class CommandHandlerABC(abc.ABC):
         pass
 
     def emmit_message(self, message: Message):
-        self._emitted_messages.append(message)
+        emitted_messages = EMITTED_MESSAGES.get()
+
+        if emitted_messages is None:
+            emitted_messages = self._emitted_messages
+
+        emitted_messages.append(message)
 
     @property
     def emitted_messages(self) -> List[Message]:
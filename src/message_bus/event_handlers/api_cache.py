@@ -0,0 +1,59 @@
+from dataclasses import asdict
+from typing import Dict, List, Type
+from .base import EventHandlerABC
+from .. import events
+from src.lib.apicache import APICacheStorage, AsyncAPICacheStorage
+
+# tags of APICache.cached responses dropped by an event, formatted with the event fields.
+# a folder dump embeds its children and a note dump its folder and related notes,
+# so responses are tagged per user and not per object
+API_CACHE_TAGS: Dict[Type[events.Event], List[str]] = {
+    events.UserPasswordChanged: ["user:{id}:user"],
+
+    events.NoteCreated: ["user:{user_id}:notes"],
+    events.NoteUpdated: ["user:{user_id}:notes"],
+    events.NoteRemoved: ["user:{user_id}:notes"],
+    events.NoteRelationCreated: ["user:{user_id}:notes"],
+    events.NoteRelationRemoved: ["user:{user_id}:notes"],
+
+    events.FolderCreated: ["user:{user_id}:folders"],
+    events.FolderUpdated: ["user:{user_id}:folders", "user:{user_id}:notes"],
+    events.FolderRemoved: ["user:{user_id}:folders", "user:{user_id}:notes"],
+    events.FolderRestored: ["user:{user_id}:folders", "user:{user_id}:notes"],
+}
+
+
+# synchronous: the response of a change is sent after the cached responses it affects are dropped
+class APICacheInvalidator(EventHandlerABC):
+    is_sync = True
+
+    def __init__(self, api_cache: APICacheStorage, tags: Dict[Type[events.Event], List[str]] = None):
+        super().__init__()
+        self._api_cache = api_cache
+        self._tags = tags if tags is not None else API_CACHE_TAGS
+
+    def _handle(self, event: events.Event, *args, **kwargs):
+        fields = asdict(event)
+
+        self._api_cache.delete_by_tags([
+            tag.format(**fields) for tag in self._tags.get(type(event), [])
+        ])
+
+
+class AsyncAPICacheInvalidator(EventHandlerABC):
+    is_sync = True
+
+    def __init__(self, api_cache: AsyncAPICacheStorage, tags: Dict[Type[events.Event], List[str]] = None):
+        super().__init__()
+        self._api_cache = api_cache
+        self._tags = tags if tags is not None else API_CACHE_TAGS
+
+    async def handle(self, event: events.Event, context: dict, *args, **kwargs):
+        fields = asdict(event)
+
+        await self._api_cache.delete_by_tags([
+            tag.format(**fields) for tag in self._tags.get(type(event), [])
+        ])
+
+    def _handle(self, event: events.Event, *args, **kwargs):
+        pass
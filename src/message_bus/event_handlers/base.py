@@ -1,10 +1,13 @@
 import abc
-from typing import List
+from typing import List, Callable, Union
 from src.message_bus import events
-from src.message_bus.types import Message
+from src.message_bus.types import Message, EMITTED_MESSAGES
 
 
 class EventHandlerABC(abc.ABC):
+    # synchronous handlers run inline in the request, the others may be dispatched to a worker
+    is_sync: bool = False
+
     def __init__(self):
         self._emitted_messages = []
 
@@ -26,8 +29,22 @@ class EventHandlerABC(abc.ABC):
         pass
 
     def emmit_message(self, message: Message):
-        self._emitted_messages.append(message)
+        emitted_messages = EMITTED_MESSAGES.get()
+
+        if emitted_messages is None:
+            emitted_messages = self._emitted_messages
+
+        emitted_messages.append(message)
 
     @property
     def emitted_messages(self) -> List[Message]:
         return self._emitted_messages
+
+
+def sync_handler(handler: Callable) -> Callable:
+    handler.is_sync = True
+    return handler
+
+
+def is_sync_handler(handler: Union[Callable, EventHandlerABC]) -> bool:
+    return getattr(handler, "is_sync", False)
@@ -0,0 +1,214 @@
+import time
+import queue
+import asyncio
+from logging import getLogger
+from typing import List, Type, Optional
+from sqlalchemy.orm import sessionmaker
+from src.lib.background import BackgroundThread
+from src.repositories.events_log import (
+    EventsLogRepoABC,
+    SAEventsLogRepo,
+    AsyncSAEventsLogRepo,
+)
+
+logger = getLogger(__name__)
+
+_STOP = object()
+
+
+# Buffers events log rows in a bounded queue and writes them from a background thread,
+# one multi-row INSERT per batch of `batch_size` rows or per `flush_interval` seconds.
+# When the queue is full `put` blocks up to `put_timeout` and then writes the row
+# in the caller thread, so rows are never dropped.
+class EventsLogWriter(BackgroundThread):
+    def __init__(
+            self,
+            db_sessionmaker: sessionmaker,
+            logs_repo_class: Type[EventsLogRepoABC] = SAEventsLogRepo,
+            max_queue_size: int = 10000,
+            batch_size: int = 500,
+            flush_interval: float = 1.0,
+            put_timeout: float = 1.0,
+    ):
+        super().__init__("events-log-writer")
+        self._db_sessionmaker = db_sessionmaker
+        self._logs_repo_class = logs_repo_class
+        self._max_queue_size = max_queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._put_timeout = put_timeout
+
+        self._queue: Optional[queue.Queue] = None
+
+    def put(self, row: dict):
+        self._ensure_started()
+
+        try:
+            self._queue.put(row, timeout=self._put_timeout)
+        except queue.Full:
+            logger.warning("Events log queue is full, writing row synchronously")
+            self._write([row])
+
+    def flush(self):
+        # blocks until every queued row is written
+        if self._is_running():
+            self._queue.join()
+
+    def _on_start(self):
+        self._queue = queue.Queue(maxsize=self._max_queue_size)
+
+    def _stop(self):
+        # rows queued before are written first
+        self._queue.put(_STOP)
+
+    def _run(self):
+        stopped = False
+
+        while not stopped:
+            batch, stopped = self._take_batch()
+
+            try:
+                self._write(batch)
+            finally:
+                for _ in range(len(batch) + int(stopped)):
+                    self._queue.task_done()
+
+    def _take_batch(self) -> (List[dict], bool):
+        item = self._queue.get()
+
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self._flush_interval
+
+        while len(batch) < self._batch_size:
+            timeout = deadline - time.monotonic()
+
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    def _write(self, rows: List[dict]):
+        if not rows:
+            return
+
+        db_session = self._db_sessionmaker()
+
+        try:
+            self._logs_repo_class.create(db_session).add_many(rows)
+            db_session.commit()
+        except Exception as e:
+            logger.exception(f"Error writing {len(rows)} events log rows", exc_info=e)
+            db_session.rollback()
+        finally:
+            db_session.close()
+
+
+# asyncio counterpart of EventsLogWriter: batches are written by a background task
+class AsyncEventsLogWriter:
+    def __init__(
+            self,
+            db_sessionmaker: sessionmaker,
+            logs_repo_class: Type[EventsLogRepoABC] = AsyncSAEventsLogRepo,
+            max_queue_size: int = 10000,
+            batch_size: int = 500,
+            flush_interval: float = 1.0,
+            put_timeout: float = 1.0,
+    ):
+        self._db_sessionmaker = db_sessionmaker
+        self._logs_repo_class = logs_repo_class
+        self._max_queue_size = max_queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._put_timeout = put_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def put(self, row: dict):
+        self._ensure_started()
+
+        try:
+            await asyncio.wait_for(self._queue.put(row), timeout=self._put_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Events log queue is full, writing row synchronously")
+            await self._write([row])
+
+    async def flush(self):
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self):
+        if self._task is None:
+            return
+
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def _ensure_started(self):
+        if self._task is not None:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        stopped = False
+
+        while not stopped:
+            batch, stopped = await self._take_batch()
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in range(len(batch) + int(stopped)):
+                    self._queue.task_done()
+
+    async def _take_batch(self) -> (List[dict], bool):
+        item = await self._queue.get()
+
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._flush_interval
+
+        while len(batch) < self._batch_size:
+            timeout = deadline - loop.time()
+
+            try:
+                if timeout > 0:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+
+            if item is _STOP:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    async def _write(self, rows: List[dict]):
+        if not rows:
+            return
+
+        try:
+            async with self._db_sessionmaker() as db_session:
+                await self._logs_repo_class.create(db_session).add_many(rows)
+                await db_session.commit()
+        except Exception as e:
+            logger.exception(f"Error writing {len(rows)} events log rows", exc_info=e)
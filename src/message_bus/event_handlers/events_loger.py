@@ -1,92 +1,99 @@
-from copy import deepcopy
-from typing import Type
+import datetime as dt
+from dataclasses import replace, fields
+from typing import Type, Optional
 from .base import EventHandlerABC
+from .events_log_writer import EventsLogWriter, AsyncEventsLogWriter
 from .. import events
 from logging import getLogger
 from src.repositories.events_log import EventsLogRepoABC
 from src.models.event_log import EventLog
+from uuid import uuid4
 
 logger = getLogger(__name__)
 
+SECRET_FIELDS = ("password", "token")
+
+
+def make_event_log_row(event: events.Event, **kwargs) -> dict:
+    secrets = {
+        field.name: "*******" for field in fields(event)
+        if field.name in SECRET_FIELDS
+    }
+
+    if secrets:
+        event = replace(event, **secrets)
+
+    # the event is rendered right away, so the row does not hold a reference to it
+    return {
+        "id": uuid4(),
+        "user_id": kwargs.get("user_id"),
+        "object_id": kwargs.get("object_id") or getattr(event, "id", None),
+        "type": type(event),
+        "event": str(event),
+        "info": kwargs.get("meta"),
+        "datetime": dt.datetime.now(),
+    }
+
 
 class EventsLogger(EventHandlerABC):
+    is_sync = True
+
     def __init__(
             self,
             logs_repo_class: Type[EventsLogRepoABC],
+            writer: Optional[EventsLogWriter] = None,
     ):
         super().__init__()
         self._logs_repo_class = logs_repo_class
+        self._writer = writer
 
     def _before_handle(self, context: dict):
-        self._db_session = context["db_session"]
+        self._db_session = None if self._writer else context["db_session"]
 
     def _handle(self, event: events.Event, context: dict, *args, **kwargs):
-        event = deepcopy(event)
+        row = make_event_log_row(event, **kwargs)
 
-        if hasattr(event, "password"):
-            event.password = "*******"
-
-        if hasattr(event, "token"):
-            event.token = "*******"
-
-        event_log = EventLog(
-            user_id=kwargs.get("user_id"),
-            object_id=kwargs.get("object_id") or getattr(event, "id", None),
-            type=type(event),
-            event=event,
-            info=kwargs.get("meta"),
-        )
+        if self._writer:
+            self._writer.put(row)
+            return
 
         log_repo = self._logs_repo_class.create(self._db_session)
 
-        log_repo.add(event_log)
+        log_repo.add(EventLog(**row))
 
         self._db_session.commit()
 
     def _after_handle(self, context: dict):
-        self._db_session.close()
+        if self._db_session:
+            self._db_session.close()
 
 
 class AsyncEventsLogger(EventHandlerABC):
+    is_sync = True
+
     def __init__(
             self,
             logs_repo_class: Type[EventsLogRepoABC],
+            writer: Optional[AsyncEventsLogWriter] = None,
     ):
         super().__init__()
         self._logs_repo_class = logs_repo_class
+        self._writer = writer
 
     async def handle(self, event: events.Event, context: dict, *args, **kwargs):
-        await self._before_handle(context)
-        try:
-            await self._handle(event, context=context, *args, **kwargs)
-        finally:
-            await self._after_handle(context)
-
-    async def _before_handle(self, context: dict):
-        self._db_sessionmaker = context["db_sessionmaker"]
-
-    async def _after_handle(self, context: dict):
-        pass
+        await self._handle(event, context=context, *args, **kwargs)
 
     async def _handle(self, event: events.Event, context: dict, *args, **kwargs):
-        event = deepcopy(event)
-
-        if hasattr(event, "password"):
-            event.password = "*******"
+        row = make_event_log_row(event, **kwargs)
 
-        if hasattr(event, "token"):
-            event.token = "*******"
+        if self._writer:
+            await self._writer.put(row)
+            return
 
-        event_log = EventLog(
-            user_id=kwargs.get("user_id"),
-            object_id=kwargs.get("object_id") or getattr(event, "id", None),
-            type=type(event),
-            event=event,
-            info=kwargs.get("meta"),
-        )
+        # the session is made by AsyncMessageBus for this handler call only
+        db_session = context["db_session"]
 
-        async with self._db_sessionmaker() as db_session:
-            log_repo = self._logs_repo_class.create(db_session)
-            log_repo.add(event_log)
+        log_repo = self._logs_repo_class.create(db_session)
+        log_repo.add(EventLog(**row))
 
-            await db_session.commit()
+        await db_session.commit()
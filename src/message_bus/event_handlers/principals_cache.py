@@ -0,0 +1,30 @@
+from .base import EventHandlerABC
+from .. import events
+from src.lib.principals_cache import RedisPrincipalsCache, AsyncRedisPrincipalsCache
+
+
+# user events drop the cached principal right in the request,
+# the next bearer auth reads the new credential version from the database
+class PrincipalsCacheInvalidator(EventHandlerABC):
+    is_sync = True
+
+    def __init__(self, principals_cache: RedisPrincipalsCache):
+        super().__init__()
+        self._principals_cache = principals_cache
+
+    def _handle(self, event: events.Event, *args, **kwargs):
+        self._principals_cache.invalidate(event.id)
+
+
+class AsyncPrincipalsCacheInvalidator(EventHandlerABC):
+    is_sync = True
+
+    def __init__(self, principals_cache: AsyncRedisPrincipalsCache):
+        super().__init__()
+        self._principals_cache = principals_cache
+
+    async def handle(self, event: events.Event, context: dict, *args, **kwargs):
+        await self._principals_cache.invalidate(event.id)
+
+    def _handle(self, event: events.Event, *args, **kwargs):
+        pass
@@ -3,12 +3,20 @@ from dataclasses_serialization.json import JSONSerializer
 from src.models.primitives.user import (
     Email
 )
+from src.models.primitives.note import NoteTitle, NoteColor
+from src.models.primitives.folder import FolderTitle, FolderColor
 from uuid import UUID
 
 
 serializer = JSONSerializer
 serializer.serialization_functions[UUID] = lambda uuid_: str(uuid_)
 serializer.deserialization_functions[UUID] = lambda cls, uuid_: UUID(uuid_)
+serializer.serialization_functions[Email] = lambda email: email.value
+serializer.deserialization_functions[Email] = lambda cls, email: Email(email)
+
+# primitives in updated_fields are stored as plain values
+for primitive in (NoteTitle, NoteColor, FolderTitle, FolderColor):
+    serializer.serialization_functions[primitive] = lambda value: value.value
 
 
 class Event:
@@ -61,6 +69,16 @@ class FolderUpdated(Event):
 class FolderRemoved(Event):
     id: UUID
     user_id: UUID
+    folders_count: int = 1
+    notes_count: int = 0
+
+
+@dataclass
+class FolderRestored(Event):
+    id: UUID
+    user_id: UUID
+    folders_count: int = 1
+    notes_count: int = 0
 
 
 @dataclass
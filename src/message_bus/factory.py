@@ -1,48 +1,157 @@
-from typing import Type
+import atexit
+from typing import Type, Optional
 from config import Config
-from src.models.meta import session_factory
+from sqlalchemy.orm import scoped_session, sessionmaker
+from src.models.meta import session_factory, async_session_factory
 
-from .message_bus import MessageBus
+from .message_bus import MessageBus, DispatchingMessageBus, AsyncMessageBus
+from .publishers import EventsPublisherABC
 from . import events
-from src.repositories.events_log import SAEventsLogRepo
-from src.message_bus.event_handlers.events_loger import EventsLogger
+from src.repositories.events_log import SAEventsLogRepo, AsyncSAEventsLogRepo
+from src.message_bus.event_handlers.events_loger import EventsLogger, AsyncEventsLogger
+from src.message_bus.event_handlers.events_log_writer import EventsLogWriter, AsyncEventsLogWriter
 from src.message_bus.event_handlers.notificators import (
     PasswordChangeRequestEmailNotificator,
     UserPasswordChangedEmailNotificator,
 )
+from src.message_bus.event_handlers.principals_cache import (
+    PrincipalsCacheInvalidator,
+    AsyncPrincipalsCacheInvalidator,
+)
+from src.message_bus.event_handlers.api_cache import APICacheInvalidator, AsyncAPICacheInvalidator, API_CACHE_TAGS
+from src.lib.principals_cache import RedisPrincipalsCache, AsyncRedisPrincipalsCache
+from src.lib.apicache import APICacheStorage, AsyncAPICacheStorage
+
+
+def default_events_handlers(
+        config: Type[Config],
+        events_log_writer: Optional[EventsLogWriter] = None,
+        principals_cache: Optional[RedisPrincipalsCache] = None,
+        api_cache: Optional[APICacheStorage] = None,
+):
+    # without a writer every event is logged with its own commit (celery workers)
+    events_logger = EventsLogger(SAEventsLogRepo, writer=events_log_writer)
+    principals_cache_invalidator = PrincipalsCacheInvalidator(principals_cache) if principals_cache else None
+
+    events_handlers = _make_events_handlers(config, events_logger, principals_cache_invalidator)
+
+    if api_cache is not None:
+        api_cache_invalidator = APICacheInvalidator(api_cache)
+
+        for event_type in API_CACHE_TAGS:
+            events_handlers[event_type].append(api_cache_invalidator)
+
+    return events_handlers
+
+
+def default_async_events_handlers(
+        config: Type[Config],
+        events_log_writer: Optional[AsyncEventsLogWriter] = None,
+        principals_cache: Optional[AsyncRedisPrincipalsCache] = None,
+        api_cache: Optional[AsyncAPICacheStorage] = None,
+):
+    events_logger = AsyncEventsLogger(AsyncSAEventsLogRepo, writer=events_log_writer)
+    principals_cache_invalidator = AsyncPrincipalsCacheInvalidator(principals_cache) if principals_cache else None
+
+    events_handlers = _make_events_handlers(config, events_logger, principals_cache_invalidator)
+
+    if api_cache is not None:
+        api_cache_invalidator = AsyncAPICacheInvalidator(api_cache)
+
+        for event_type in API_CACHE_TAGS:
+            events_handlers[event_type].append(api_cache_invalidator)
+
+    return events_handlers
 
 
-def default_events_handlers(config: Type[Config]):
+def _make_events_handlers(config: Type[Config], events_logger, principals_cache_invalidator=None):
+    # revoke_access_tokens runs in the password change, its event drops the cached principal
+    user_handlers = [principals_cache_invalidator] if principals_cache_invalidator else []
+
     return {
-        events.UserCreated: [EventsLogger(SAEventsLogRepo)],
-        events.AuthSessionClosed: [EventsLogger(SAEventsLogRepo)],
+        events.UserCreated: [events_logger],
+        events.AuthSessionClosed: [events_logger],
 
         events.PasswordChangeRequestCreated: [
-            EventsLogger(SAEventsLogRepo),
+            events_logger,
             PasswordChangeRequestEmailNotificator(config),
         ],
         events.UserPasswordChanged: [
-            EventsLogger(SAEventsLogRepo),
+            events_logger,
             UserPasswordChangedEmailNotificator(config),
+            *user_handlers,
         ],
 
-        events.FolderCreated: [EventsLogger(SAEventsLogRepo)],
-        events.FolderUpdated: [EventsLogger(SAEventsLogRepo)],
-        events.FolderRemoved: [EventsLogger(SAEventsLogRepo)],
+        events.FolderCreated: [events_logger],
+        events.FolderUpdated: [events_logger],
+        events.FolderRemoved: [events_logger],
+        events.FolderRestored: [events_logger],
 
-        events.NoteCreated: [EventsLogger(SAEventsLogRepo)],
-        events.NoteUpdated: [EventsLogger(SAEventsLogRepo)],
-        events.NoteRemoved: [EventsLogger(SAEventsLogRepo)],
-        events.NoteRelationCreated: [EventsLogger(SAEventsLogRepo)],
-        events.NoteRelationRemoved: [EventsLogger(SAEventsLogRepo)],
+        events.NoteCreated: [events_logger],
+        events.NoteUpdated: [events_logger],
+        events.NoteRemoved: [events_logger],
+        events.NoteRelationCreated: [events_logger],
+        events.NoteRelationRemoved: [events_logger],
     }
 
 
-def make_message_bus(config: Type[Config]) -> MessageBus:
-    message_bus = MessageBus(
-        event_handlers=default_events_handlers(config)
+def make_message_bus(
+        config: Type[Config],
+        publisher: Optional[EventsPublisherABC] = None,
+        principals_cache: Optional[RedisPrincipalsCache] = None,
+        api_cache: Optional[APICacheStorage] = None,
+) -> MessageBus:
+    db_sessionmaker = session_factory(config)
+
+    events_log_writer = EventsLogWriter(
+        db_sessionmaker,
+        max_queue_size=config.events_log_queue_size,
+        batch_size=config.events_log_batch_size,
+        flush_interval=config.events_log_flush_interval,
+    )
+    atexit.register(events_log_writer.close)
+
+    if publisher:
+        message_bus = DispatchingMessageBus(
+            publisher,
+            event_handlers=default_events_handlers(config, events_log_writer, principals_cache, api_cache),
+        )
+    else:
+        message_bus = MessageBus(
+            event_handlers=default_events_handlers(config, events_log_writer, principals_cache, api_cache)
+        )
+
+    # handlers get their own session registry, so they never touch the request session
+    message_bus.context["db_session"] = scoped_session(db_sessionmaker)
+    message_bus.context["events_log_writer"] = events_log_writer
+
+    return message_bus
+
+
+def make_async_message_bus(
+        config: Type[Config],
+        db_sessionmaker: Optional[sessionmaker] = None,
+        principals_cache: Optional[AsyncRedisPrincipalsCache] = None,
+        api_cache: Optional[AsyncAPICacheStorage] = None,
+) -> AsyncMessageBus:
+    # the ASGI app passes its own sessionmaker, so handlers share the connection pool of the worker
+    if db_sessionmaker is None:
+        db_sessionmaker, _ = async_session_factory(config)
+
+    events_log_writer = AsyncEventsLogWriter(
+        db_sessionmaker,
+        max_queue_size=config.events_log_queue_size,
+        batch_size=config.events_log_batch_size,
+        flush_interval=config.events_log_flush_interval,
+    )
+
+    message_bus = AsyncMessageBus(
+        event_handlers=default_async_events_handlers(config, events_log_writer, principals_cache, api_cache),
+        max_concurrency=config.message_bus_max_concurrency,
+        handler_timeout=config.message_bus_handler_timeout,
     )
 
-    message_bus.context["db_session"] = session_factory(config)()
+    message_bus.context["db_sessionmaker"] = db_sessionmaker
+    message_bus.context["events_log_writer"] = events_log_writer
 
     return message_bus
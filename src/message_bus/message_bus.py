@@ -1,12 +1,15 @@
 import abc
 import logging
-from typing import Union, List, Type, Dict, Callable, Any, Tuple
+import contextlib
+from typing import Union, List, Type, Dict, Callable, Any, Optional
 import asyncio
 from . import events
 from . import commands
-from .event_handlers.base import EventHandlerABC
+from .event_handlers.base import EventHandlerABC, is_sync_handler
+from .publishers import EventsPublisherABC
 from .command_handlers.base import CommandHandlerABC
-from .types import Message
+from .types import Message, EMITTED_MESSAGES
+from src.lib.utils import run_in_thread
 
 logger = logging.getLogger(__name__)
 
@@ -121,13 +124,22 @@ class MessageBus(MessageBusABC):
             queue: List[Message],
             *args, **kwargs
     ) -> List[Any]:
-        results = []
-
         try:
             handlers = self._event_handlers[type(event)]
         except KeyError:
             logger.error(f"Event handlers for {type(event)} does not exist")
-            return results
+            return []
+
+        return self._run_event_handlers(event, handlers, queue, *args, **kwargs)
+
+    def _run_event_handlers(
+            self,
+            event: events.Event,
+            handlers: List[Union[Callable, EventHandlerABC]],
+            queue: List[Message],
+            *args, **kwargs
+    ) -> List[Any]:
+        results = []
 
         for handler in handlers:
             logger.debug(f"Handling  event {event} with handler {handler}")
@@ -175,11 +187,79 @@ class MessageBus(MessageBusABC):
         }
 
 
+# Runs only synchronous event handlers inline. Events that have other handlers are published
+# to a worker in one batch after all the messages are handled.
+class DispatchingMessageBus(MessageBus):
+    def __init__(
+            self,
+            publisher: EventsPublisherABC,
+            event_handlers: Dict[Type[events.Event], List[Union[Callable, EventHandlerABC]]] = None,
+            command_handlers: Dict[Type[commands.Command], Union[Callable, CommandHandlerABC]] = None,
+    ):
+        super().__init__(event_handlers, command_handlers)
+        self._publisher = publisher
+
+    def handle(self, message: Message, *args, **kwargs) -> List:
+        return self.batch_handle([message], *args, **kwargs)
+
+    def batch_handle(self, messages: List[Message], *args, **kwargs) -> List:
+        results = []
+        dispatched = []
+        queue = list(messages)
+
+        while queue:
+            message = queue.pop(0)
+
+            if isinstance(message, events.Event):
+                handlers = self._event_handlers.get(type(message))
+
+                if handlers is None:
+                    logger.error(f"Event handlers for {type(message)} does not exist")
+                    continue
+
+                sync_handlers = [h for h in handlers if is_sync_handler(h)]
+                results.extend(self._run_event_handlers(message, sync_handlers, queue, *args, **kwargs))
+
+                if len(sync_handlers) < len(handlers):
+                    dispatched.append(message)
+            elif isinstance(message, commands.Command):
+                result = self._handle_command(message, queue, *args, **kwargs)
+                results.append(result)
+            else:
+                raise Exception(f"{message} was not an Event or Command type")
+
+        if dispatched:
+            self._dispatch(dispatched, *args, **kwargs)
+
+        return results
+
+    def _dispatch(self, events_: List[events.Event], *args, **kwargs):
+        try:
+            self._publisher.publish(events_, **kwargs)
+        except Exception as e:
+            # the broker is unavailable, so the rest of the handlers still run in the request
+            logger.exception(f"Error publishing {len(events_)} events, handling them inline", exc_info=e)
+
+            for event in events_:
+                handlers = [h for h in self._event_handlers[type(event)] if not is_sync_handler(h)]
+                queue = []
+                self._run_event_handlers(event, handlers, queue, *args, **kwargs)
+                self.batch_handle(queue, *args, **kwargs)
+
+
+# Handlers of an event run concurrently, every handler gets its own db session
+# (context["db_session"], made by context["db_sessionmaker"]) and its own timeout,
+# so a failed or hanging handler does not affect the others.
+# The number of handlers running at the same time is limited by max_concurrency.
+# Synchronous handlers run in a worker thread without the timeout: a thread can not be cancelled,
+# so it would go on running after the timeout and beyond max_concurrency.
 class AsyncMessageBus(MessageBusABC):
     def __init__(
             self,
             event_handlers: Dict[Type[events.Event], List[Union[Callable, EventHandlerABC]]] = None,
             command_handlers: Dict[Type[commands.Command], Union[Callable, CommandHandlerABC]] = None,
+            max_concurrency: int = 100,
+            handler_timeout: Optional[float] = 30.0,
     ):
         if event_handlers:
             self._event_handlers = event_handlers
@@ -191,6 +271,12 @@ class AsyncMessageBus(MessageBusABC):
         else:
             self._command_handlers = dict()
 
+        self._handler_timeout = handler_timeout
+        self._max_concurrency = max_concurrency
+        # made in the running loop, python < 3.10 binds it to the loop current at creation
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
         self.context = {}
 
     def set_event_handlers(
@@ -219,9 +305,14 @@ class AsyncMessageBus(MessageBusABC):
     ) -> CommandHandlerABC:
         return self._command_handlers[command]
 
-    async def batch_handle(self, messages: List[Message], *args, **kwargs):
-        for message in messages:
-            await self.handle(message, *kwargs, **kwargs)
+    async def batch_handle(self, messages: List[Message], *args, **kwargs) -> List:
+        # messages of the batch are handled concurrently,
+        # messages emitted by handlers are handled after the message that emitted them
+        results = await asyncio.gather(*[
+            self.handle(message, *args, **kwargs) for message in messages
+        ])
+
+        return [result for message_results in results for result in message_results]
 
     async def handle(self, message: Message, *args, **kwargs) -> List:
         results = []
@@ -234,7 +325,7 @@ class AsyncMessageBus(MessageBusABC):
                 events_results = await self._handle_event(message, queue, *args, **kwargs)
                 results.extend(events_results)
             elif isinstance(message, commands.Command):
-                result = self._handle_command(message, queue, *args, **kwargs)
+                result = await self._handle_command(message, queue, *args, **kwargs)
                 results.append(result)
             else:
                 raise Exception(f"{message} was not an Event or Command type")
@@ -246,39 +337,45 @@ class AsyncMessageBus(MessageBusABC):
             event: events.Event,
             queue: List[Message],
             *args, **kwargs
-    ) -> Tuple[Any]:
-        coroutines = []
-
+    ) -> List[Any]:
         try:
             handlers = self._event_handlers[type(event)]
         except KeyError:
             logger.error(f"Event handlers for {type(event)} does not exist")
-            return tuple()
+            return []
 
-        for handler in handlers:
-            logger.debug(f"Handling event {event} with handler {handler}")
+        results = await asyncio.gather(*[
+            self._run_event_handler(event, handler, queue, *args, **kwargs)
+            for handler in handlers
+        ])
 
-            try:
-                if issubclass(type(handler), EventHandlerABC):
-                    coroutine = handler.handle(event, context=self.context, *args, **kwargs)
-                    coroutines.append(coroutine)
-                    queue.extend(handler.emitted_messages)
-                else:
-                    coroutine = handler(event, context=self.context, *args, **kwargs)
-                    coroutines.append(coroutine)
+        return list(results)
 
-            except Exception as e:
-                logger.exception(f"Error handling event {event}", exc_info=e)
-                continue
+    async def _run_event_handler(
+            self,
+            event: events.Event,
+            handler: Union[Callable, EventHandlerABC],
+            queue: List[Message],
+            *args, **kwargs
+    ) -> dict:
+        logger.debug(f"Handling event {event} with handler {handler}")
 
-        results = await asyncio.gather(*coroutines)
+        try:
+            result = await self._call_handler(handler, event, queue, *args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Error handling event {event} with handler {handler}", exc_info=e)
 
-        if "db_session" in self.context:
-            self.context["db_session"].close()
+            return {
+                "event": event,
+                "error": e,
+            }
 
-        return results
+        return {
+            "event": event,
+            "result": result,
+        }
 
-    def _handle_command(
+    async def _handle_command(
             self,
             cmd: commands.Command,
             queue: List[Message],
@@ -288,14 +385,62 @@ class AsyncMessageBus(MessageBusABC):
 
         try:
             handler = self._command_handlers[type(cmd)]
-
-            if issubclass(type(handler), CommandHandlerABC):
-                result = handler.handle(cmd, context=self.context, *args, **kwargs)
-                queue.extend(handler.emitted_messages)
-            else:
-                result = handler(cmd, context=self.context, *args, **kwargs)
+            result = await self._call_handler(handler, cmd, queue, *args, **kwargs)
         except Exception as e:
             logger.exception(f"Error handling command {cmd}", exc_info=e)
             raise
 
+        return {
+            "command": cmd,
+            "result": result,
+        }
+
+    async def _call_handler(
+            self,
+            handler: Union[Callable, EventHandlerABC, CommandHandlerABC],
+            message: Message,
+            queue: List[Message],
+            *args, **kwargs
+    ) -> Any:
+        is_handler_object = isinstance(handler, (EventHandlerABC, CommandHandlerABC))
+        func = handler.handle if is_handler_object else handler
+
+        emitted_messages = []
+        token = EMITTED_MESSAGES.set(emitted_messages)
+
+        try:
+            async with self._get_semaphore(), self._make_handler_context() as context:
+                if asyncio.iscoroutinefunction(func):
+                    result = await asyncio.wait_for(
+                        func(message, context=context, *args, **kwargs),
+                        timeout=self._handler_timeout,
+                    )
+                else:
+                    result = await run_in_thread(func, message, context=context, *args, **kwargs)
+        finally:
+            EMITTED_MESSAGES.reset(token)
+
+        if is_handler_object:
+            queue.extend(emitted_messages)
+
         return result
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._semaphore_loop = loop
+
+        return self._semaphore
+
+    @contextlib.asynccontextmanager
+    async def _make_handler_context(self):
+        db_sessionmaker = self.context.get("db_sessionmaker")
+
+        if db_sessionmaker is None:
+            yield self.context
+            return
+
+        async with db_sessionmaker() as db_session:
+            yield {**self.context, "db_session": db_session}
@@ -0,0 +1,127 @@
+import time
+import datetime as dt
+from logging import getLogger
+from typing import Dict, List, Type, Union, Callable
+from sqlalchemy.orm import sessionmaker
+from src.repositories.outbox import SAOutboxRepo
+from . import events
+from .event_handlers.base import EventHandlerABC, is_sync_handler
+from .publishers import EventsPublisherABC
+
+logger = getLogger(__name__)
+
+
+class OutboxRelay:
+    def __init__(
+            self,
+            db_sessionmaker: sessionmaker,
+            publisher: EventsPublisherABC,
+            event_handlers: Dict[Type[events.Event], List[Union[Callable, EventHandlerABC]]],
+            batch_size: int = 500,
+            retention: dt.timedelta = dt.timedelta(days=1),
+            purge_interval: float = 60.0,
+    ):
+        self._db_sessionmaker = db_sessionmaker
+        self._publisher = publisher
+        self._event_handlers = event_handlers
+        self._batch_size = batch_size
+        self._retention = retention
+        self._purge_interval = purge_interval
+
+    def relay_batch(self) -> int:
+        db_session = self._db_sessionmaker()
+
+        try:
+            outbox_repo = SAOutboxRepo(db_session)
+
+            # claimed rows stay locked until commit, a crash before it makes them pending again
+            messages = outbox_repo.claim(self._batch_size)
+            # consecutive events with the same handler kwargs are published together, in the outbox order
+            batches = []
+
+            for message in messages:
+                event = self._load_event(message.event_type, message.payload)
+
+                if event is None or not self._has_async_handlers(type(event)):
+                    continue
+
+                handler_kwargs = message.handler_kwargs or {}
+
+                if batches and batches[-1][0] == handler_kwargs:
+                    batches[-1][1].append(event)
+                else:
+                    batches.append((handler_kwargs, [event]))
+
+            for handler_kwargs, events_ in batches:
+                self._publisher.publish(events_, **handler_kwargs)
+
+            outbox_repo.mark_processed([message.id for message in messages])
+            db_session.commit()
+
+            return len(messages)
+        except Exception:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
+
+    def purge(self) -> int:
+        # processed messages older than the retention period are deleted by chunks of batch_size
+        before = dt.datetime.utcnow() - self._retention
+        deleted = 0
+
+        while True:
+            db_session = self._db_sessionmaker()
+
+            try:
+                chunk = SAOutboxRepo(db_session).delete_processed(before, self._batch_size)
+                db_session.commit()
+            except Exception:
+                db_session.rollback()
+                raise
+            finally:
+                db_session.close()
+
+            deleted += chunk
+
+            if chunk < self._batch_size:
+                return deleted
+
+    def run(self, poll_interval: float = 1.0):
+        purged = 0.0
+
+        while True:
+            if time.monotonic() - purged >= self._purge_interval:
+                try:
+                    self.purge()
+                except Exception as e:
+                    logger.exception("Error purging outbox messages", exc_info=e)
+
+                purged = time.monotonic()
+
+            try:
+                relayed = self.relay_batch()
+            except Exception as e:
+                logger.exception("Error relaying outbox messages", exc_info=e)
+                relayed = 0
+
+            # a full batch means there are more pending rows
+            if relayed < self._batch_size:
+                time.sleep(poll_interval)
+
+    def _has_async_handlers(self, event_type: Type[events.Event]) -> bool:
+        # synchronous handlers have already run in the request
+        return any(
+            not is_sync_handler(handler)
+            for handler in self._event_handlers.get(event_type, [])
+        )
+
+    @staticmethod
+    def _load_event(event_type_name: str, payload: dict):
+        event_type = getattr(events, event_type_name, None)
+
+        if event_type is None:
+            logger.error(f"Wrong event type in outbox: {event_type_name}")
+            return None
+
+        return event_type.deserialize(payload)
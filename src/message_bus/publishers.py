@@ -0,0 +1,17 @@
+import abc
+from typing import List
+from . import events
+
+
+class EventsPublisherABC(abc.ABC):
+    @abc.abstractmethod
+    def publish(self, events_: List[events.Event], **kwargs):
+        raise NotImplementedError
+
+
+class OutboxEventsPublisher(EventsPublisherABC):
+    def publish(self, events_: List[events.Event], **kwargs):
+        # the events are already in the outbox table, the relay publishes them.
+        # Synchronous handlers are not in the outbox, they run in the request after commit
+        # and are lost if the process dies before that
+        pass
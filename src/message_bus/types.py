@@ -1,5 +1,10 @@
-from typing import Union
+from contextvars import ContextVar
+from typing import Union, List, Optional
 from .events import Event
 from .commands import Command
 
 Message = Union[Event, Command]
+
+# messages emitted during one call of a handler by AsyncMessageBus: the same handler object
+# runs concurrently for several messages, so they are not collected on the handler
+EMITTED_MESSAGES: ContextVar[Optional[List[Message]]] = ContextVar("emitted_messages", default=None)
@@ -0,0 +1,8 @@
+import pkgutil
+import importlib
+
+
+def import_models():
+    # relationships refer to models by name, every model is imported before the mappers are configured
+    for module_info in pkgutil.iter_modules(__path__, f"{__name__}."):
+        importlib.import_module(module_info.name)
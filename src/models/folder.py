@@ -1,5 +1,5 @@
 import sqlalchemy as sa
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 from sqlalchemy.orm import relationship
 from src.models.meta import Base
 
@@ -20,9 +20,25 @@ if TYPE_CHECKING:
     from src.models.tag import Tag
     from src.models.user import User
 
+FOLDER_PATH_SEPARATOR = "/"
+
 
 class Folder(Base):
     __tablename__ = "folder"
+    __table_args__ = (
+        sa.Index(
+            "ix_folder_user_id_updated_id", "user_id", "updated", "id",
+            postgresql_where=sa.text("deleted IS NULL"),
+        ),
+        sa.Index(
+            "ix_folder_user_id_title_id", "user_id", "title", "id",
+            postgresql_where=sa.text("deleted IS NULL"),
+        ),
+        sa.Index(
+            "ix_folder_user_id_path", "user_id", "path",
+            postgresql_ops={"path": "text_pattern_ops"},
+        ),
+    )
 
     id: UUID = sa.Column(SAUUID, primary_key=True, default=lambda: uuid4())
 
@@ -32,6 +48,10 @@ class Folder(Base):
     parent_id: UUID = sa.Column(SAUUID, sa.ForeignKey("folder.id"), nullable=True, index=True)
     parent: 'Folder' = relationship("Folder", foreign_keys=[parent_id], remote_side=[id], uselist=False)
 
+    # materialized path of ids from the root folder down to this one, e.g. "/<root id>/<folder id>/",
+    # subtree of a folder is every folder which path starts with its path
+    path: str = sa.Column(sa.String, nullable=False)
+
     user_id: UUID = sa.Column(SAUUID, sa.ForeignKey("user.id"), nullable=False, index=True)
     user: 'User' = relationship("User", foreign_keys=[user_id])
 
@@ -52,6 +72,12 @@ class Folder(Base):
     updated = sa.Column(sa.DateTime, default=sa.func.now(), onupdate=sa.func.now())
     deleted = sa.Column(sa.DateTime, nullable=True)
 
+    @staticmethod
+    def make_path(id_: UUID, parent: Optional['Folder'] = None) -> str:
+        parent_path = parent.path if parent else FOLDER_PATH_SEPARATOR
+
+        return f"{parent_path}{id_.hex}{FOLDER_PATH_SEPARATOR}"
+
 
 class FolderTag(Base):
     __tablename__ = "folder_tag"
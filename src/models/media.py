@@ -3,7 +3,6 @@ from src.models.primitives.base import SAUUID
 from depot.fields.sqlalchemy import UploadedFileField
 from depot.manager import DepotManager
 from depot.fields.upload import UploadedFile
-from PIL import Image
 from depot.io import utils
 from tempfile import SpooledTemporaryFile
 from depot.io.interfaces import FileStorage
@@ -24,6 +23,9 @@ class UploadedImageWithThumb(UploadedFile):
         super(UploadedImageWithThumb, self).process_content(content, filename, content_type)
 
         if "image/" in content_type:
+            # models are imported by every worker, PIL only by the ones that take images
+            from PIL import Image
+
             uploaded_image = Image.open(content)
             if max(uploaded_image.size) >= self.max_size:
                 uploaded_image.thumbnail((self.max_size, self.max_size), Image.BILINEAR)
@@ -1,6 +1,8 @@
+from functools import lru_cache
 from typing import Type
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from config import Config
@@ -8,13 +10,40 @@ from config import Config
 Base = declarative_base()
 
 
+@lru_cache(maxsize=None)
+def get_engine(config: Type[Config]) -> Engine:
+    # one engine (and connection pool) per process and config
+    return create_engine(
+        config.db_uri,
+        # flush of many rows is sent as multi-row INSERTs and paged UPDATEs instead of a statement per row
+        executemany_mode="values_plus_batch",
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+    )
+
+
 def session_factory(config: Type[Config]) -> sessionmaker:
-    engine = create_engine(config.db_uri)
+    return sessionmaker(get_engine(config))
+
 
-    return sessionmaker(engine)
+def scoped_session_factory(config: Type[Config]) -> scoped_session:
+    # the registry keeps a session per thread (per greenlet under gevent),
+    # middleware removes it at the end of the request
+    return scoped_session(session_factory(config))
 
 
 def async_session_factory(config: Type[Config]) -> (sessionmaker, AsyncEngine):
-    engine = create_async_engine(Config.async_db_uri)
+    # one uvicorn worker serves all its requests from this pool
+    engine = create_async_engine(
+        config.async_db_uri,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+        pool_pre_ping=config.db_pool_pre_ping,
+    )
 
     return sessionmaker(engine, expire_on_commit=False, class_=AsyncSession), engine
@@ -1,6 +1,7 @@
 import sqlalchemy as sa
 from typing import TYPE_CHECKING, List
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from src.models.meta import Base
 
 from src.models.primitives.base import SAUUID
@@ -18,9 +19,31 @@ if TYPE_CHECKING:
     from src.models.tag import Tag
     from src.models.user import User
 
+# language-neutral config: notes are written both in russian and english
+SEARCH_CONFIG = "simple"
+
+NOTE_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(text, '')), 'B')"
+)
+
 
 class Note(Base):
     __tablename__ = "note"
+    __table_args__ = (
+        sa.Index(
+            "ix_note_user_id_updated_id", "user_id", "updated", "id",
+            postgresql_where=sa.text("deleted IS NULL"),
+        ),
+        sa.Index(
+            "ix_note_user_id_title_id", "user_id", "title", "id",
+            postgresql_where=sa.text("deleted IS NULL"),
+        ),
+        sa.Index(
+            "ix_note_search_vector", "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     id: UUID = sa.Column(SAUUID, primary_key=True, default=lambda: str(uuid4()))
 
@@ -29,6 +52,9 @@ class Note(Base):
 
     text = sa.Column(sa.String, nullable=True)
 
+    # maintained by postgres on every insert and update of title or text
+    search_vector = deferred(sa.Column(TSVECTOR, sa.Computed(NOTE_SEARCH_VECTOR, persisted=True)))
+
     folder_id: UUID = sa.Column(SAUUID, sa.ForeignKey("folder.id"), nullable=True, index=True)
     folder: 'Folder' = relationship("Folder", foreign_keys=[folder_id], back_populates="notes")
 
@@ -0,0 +1,32 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+from uuid import uuid4, UUID
+from .meta import Base
+from src.models.primitives.base import SAUUID
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    id: UUID = sa.Column(SAUUID, primary_key=True, default=lambda: uuid4())
+    event_type: str = sa.Column(sa.String, nullable=False)
+    payload: dict = sa.Column(JSONB, nullable=False)
+    # user_id, object_id, ... the request passes to the handlers with the event
+    handler_kwargs: dict = sa.Column(JSONB, nullable=True)
+    created = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
+    processed = sa.Column(sa.DateTime, nullable=True)
+
+    __table_args__ = (
+        # the relay only scans pending messages
+        sa.Index(
+            "ix_outbox_pending_created",
+            "created",
+            postgresql_where=sa.text("processed IS NULL"),
+        ),
+        # processed messages are deleted after the retention period
+        sa.Index(
+            "ix_outbox_processed",
+            "processed",
+            postgresql_where=sa.text("processed IS NOT NULL"),
+        ),
+    )
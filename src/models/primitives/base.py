@@ -1,5 +1,7 @@
 from sqlalchemy.dialects.postgresql import UUID as sa_uuid_type
 from sqlalchemy import types
+from typing import Optional, Dict, Type, Pattern
+import re
 import uuid
 from src.models.exc import AttributeValidationError
 
@@ -25,3 +27,104 @@ class SAUUID(types.TypeDecorator):
             return uuid.UUID(value)
         else:
             return None
+
+
+class Primitive:
+    # immutable value object over a str. Subclasses set the bounds and PATTERN, compiled once per class,
+    # and declare empty __slots__
+    __slots__ = ("_value",)
+
+    MIN_LENGTH: Optional[int] = None
+    MAX_LENGTH: Optional[int] = None
+    PATTERN: Optional[str] = None
+    # values loaded from the database share one instance, for a few distinct values (colors)
+    INTERNED: bool = False
+    INTERNED_MAX_SIZE = 1024
+
+    _regexp: Optional[Pattern] = None
+    _interned: Dict[str, 'Primitive'] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        cls._regexp = re.compile(cls.PATTERN) if cls.PATTERN else None
+        cls._interned = {}
+
+    def __init__(self, value: str):
+        self._validate(value)
+        self._value = value
+
+    @classmethod
+    def from_db(cls, value: str):
+        # the value was validated before it was written, so rows are loaded without the checks
+        if cls.INTERNED:
+            primitive = cls._interned.get(value)
+
+            if primitive is not None:
+                return primitive
+
+        primitive = cls.__new__(cls)
+        primitive._value = value
+
+        if cls.INTERNED and len(cls._interned) < cls.INTERNED_MAX_SIZE:
+            cls._interned[value] = primitive
+
+        return primitive
+
+    @classmethod
+    def _validate(cls, value: str):
+        name = cls.__name__
+
+        if value is None:
+            raise AttributeValidationError(f"{name} cannot be None")
+
+        if len(value) == 0:
+            raise AttributeValidationError(f"{name} cannot be empty")
+
+        if cls.MIN_LENGTH is not None and len(value) < cls.MIN_LENGTH:
+            raise AttributeValidationError(f"{name} is too short")
+
+        if cls.MAX_LENGTH is not None and len(value) > cls.MAX_LENGTH:
+            raise AttributeValidationError(f"{name} is too long")
+
+        if cls._regexp is not None and cls._regexp.match(value) is None:
+            raise AttributeValidationError(f"{name} does not match expected pattern")
+
+    @property
+    def value(self) -> str:
+        return self._value
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self._value == other._value
+
+    def __hash__(self):
+        return hash((type(self), self._value))
+
+    def __str__(self):
+        return self._value
+
+    def __repr__(self):
+        return f"<{type(self).__name__} value={self._value}>"
+
+
+class SAPrimitive(types.TypeDecorator):
+    # subclasses set `primitive` and cache_ok = True (sqlalchemy reads it from the class itself)
+    impl = types.String
+    primitive: Type[Primitive] = Primitive
+
+    @property
+    def python_type(self):
+        return self.primitive
+
+    def process_bind_param(self, value: Optional[Primitive], dialect):
+        if value is None:
+            return None
+
+        return value.value
+
+    def process_result_value(self, value: Optional[str], dialect):
+        # None comes from outer joins, e.g. eager loaded optional relationships
+        if not value:
+            return None
+
+        return self.primitive.from_db(value)
@@ -1,6 +1,7 @@
 import datetime as dt
 import sqlalchemy as sa
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio.session import AsyncSession
 from typing import Optional
 import abc
 from ..models.auth_session import AuthSession
@@ -118,3 +119,87 @@ class SAAuthSessionsRepo(AuthSessionsRepoABC):
 
         for session in sessions:
             session.deleted = sa.func.now()
+
+
+class AsyncSAAuthSessionsRepo(AuthSessionsRepoABC):
+    def __init__(
+            self,
+            db_session: AsyncSession,
+            encoder: EncoderABC,
+    ):
+        self._db_session = db_session
+        self._encoder = encoder
+
+    @classmethod
+    def create(cls, db_session: AsyncSession, encoder: EncoderABC) -> 'AsyncSAAuthSessionsRepo':
+        return cls(db_session, encoder)
+
+    async def get(self, token: str) -> Optional[AuthSession]:
+        token_hash = self._encoder.encode(token)
+
+        query = sa.select(
+            AuthSession
+        ).where(
+            AuthSession.token == token_hash,
+            AuthSession.expires_in > sa.func.now(),
+            AuthSession.deleted.is_(None),
+        )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().one_or_none()
+
+    def add(self, session: AuthSession):
+        self._db_session.add(session)
+
+    async def remove(self, token: str) -> Optional[AuthSession]:
+        session = await self.get(token)
+
+        if session:
+            await self._db_session.delete(session)
+
+        return session
+
+    async def get_by_user_device(self, user_id: UUID, device_id: str) -> Optional[AuthSession]:
+        result = await self._db_session.execute(
+            self._make_active_sessions_query(user_id, device_id)
+        )
+
+        return result.scalars().one_or_none()
+
+    async def remove_by_user_device(self, user_id: UUID, device_id: str) -> Optional[AuthSession]:
+        result = await self._db_session.execute(
+            self._make_active_sessions_query(user_id, device_id)
+        )
+
+        sessions = result.scalars().all()
+
+        for session in sessions:
+            session.deleted = dt.datetime.utcnow()
+
+        return sessions[0] if len(sessions) > 0 else None
+
+    async def remove_all_by_user(self, user_id: UUID):
+        result = await self._db_session.execute(
+            self._make_active_sessions_query(user_id)
+        )
+
+        for session in result.scalars().all():
+            session.deleted = sa.func.now()
+
+    @staticmethod
+    def _make_active_sessions_query(user_id: UUID, device_id: str = None):
+        query = sa.select(
+            AuthSession
+        ).where(
+            AuthSession.user_id == user_id,
+            AuthSession.expires_in > sa.func.now(),
+            AuthSession.deleted.is_(None),
+        )
+
+        if device_id is not None:
+            query = query.where(
+                AuthSession.device_id == device_id,
+            )
+
+        return query
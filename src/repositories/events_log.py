@@ -1,10 +1,9 @@
 import abc
-from typing import TYPE_CHECKING
+import sqlalchemy as sa
+from typing import List
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio.session import AsyncSession
-
-if TYPE_CHECKING:
-    from src.models.event_log import EventLog
+from src.models.event_log import EventLog
 
 
 class EventsLogRepoABC(abc.ABC):
@@ -12,6 +11,10 @@ class EventsLogRepoABC(abc.ABC):
     def add(self, event_log: 'EventLog'):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def add_many(self, rows: List[dict]):
+        raise NotImplementedError
+
     @classmethod
     @abc.abstractmethod
     def create(cls, *args, **kwargs):
@@ -29,6 +32,11 @@ class SAEventsLogRepo(EventsLogRepoABC):
     def add(self, event_log: 'EventLog'):
         self._db_session.add(event_log)
 
+    def add_many(self, rows: List[dict]):
+        # one multi-row INSERT ... VALUES for the whole batch
+        if rows:
+            self._db_session.execute(sa.insert(EventLog).values(rows))
+
 
 class AsyncSAEventsLogRepo(EventsLogRepoABC):
 
@@ -41,3 +49,7 @@ class AsyncSAEventsLogRepo(EventsLogRepoABC):
 
     def add(self, event_log: 'EventLog'):
         self._db_session.add(event_log)
+
+    async def add_many(self, rows: List[dict]):
+        if rows:
+            await self._db_session.execute(sa.insert(EventLog).values(rows))
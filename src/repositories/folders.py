@@ -2,11 +2,42 @@ import abc
 import datetime as dt
 import sqlalchemy as sa
 from sqlalchemy.orm import aliased
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from src.models.folder import Folder
-from sqlalchemy.orm import Session
+from src.models.note import Note
+from src.lib.pagination import (
+    KeysetOrdering,
+    KeysetPaginationABC,
+    SAKeysetPagination,
+    AsyncSAKeysetPagination,
+    CountCacheABC,
+)
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
+FOLDERS_ORDERINGS = {
+    "updated": KeysetOrdering(
+        [(Folder.updated, dt.datetime), (Folder.id, UUID)],
+        desc=True,
+    ),
+    "title": KeysetOrdering(
+        [(sa.type_coerce(Folder.title, sa.String), str), (Folder.id, UUID)],
+    ),
+}
+
+# loading profiles are matched to dump schemas, see NOTES_LOADING_PROFILES
+FOLDERS_LOADING_PROFILES = {
+    # FolderDumpSchema
+    "list_view": [
+        selectinload(Folder.children_folders),
+    ],
+    # FolderDetailDumpSchema
+    "detail_view": [
+        selectinload(Folder.children_folders).selectinload(Folder.children_folders),
+    ],
+}
+
 
 class FoldersRepoABC(abc.ABC):
     def get(
@@ -14,9 +45,23 @@ class FoldersRepoABC(abc.ABC):
             id_: UUID,
             with_deleted: bool = False,
             user_id: UUID = None,
+            profile: str = None,
     ) -> Optional[Folder]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_updated(self, id_: UUID, user_id: UUID) -> Optional[dt.datetime]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_many(
+            self,
+            ids_: List[UUID],
+            with_deleted: bool = False,
+            user_id: UUID = None,
+    ) -> List[Folder]:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add(self, folder: Folder):
         raise NotImplementedError
@@ -27,14 +72,55 @@ class FoldersRepoABC(abc.ABC):
             title: str = None,
             parent_id: UUID = None,
             user_id: UUID = None,
-            with_deleted: bool = False
+            with_deleted: bool = False,
+            profile: str = None,
     ) -> List[Folder]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def paginate(
+            self,
+            page_size: int,
+            cursor: str = None,
+            order_by: str = "updated",
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            title: str = None,
+            parent_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> KeysetPaginationABC:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_subtree(self, folder: Folder, with_deleted: bool = False) -> List[Folder]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_subtree_notes(self, folder: Folder, with_deleted: bool = False) -> List[Note]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_tree(self, user_id: UUID) -> List[Folder]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def move_subtree(self, folder: Folder, parent: Optional[Folder]):
+        raise NotImplementedError
+
     @abc.abstractmethod
     def remove(self, folder: Folder):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def remove_subtree(self, folder: Folder) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def restore_subtree(self, folder: Folder) -> Tuple[int, int]:
+        raise NotImplementedError
+
     @classmethod
     @abc.abstractmethod
     def create(cls, *args, **kwargs):
@@ -54,6 +140,7 @@ class SAFoldersRepo(FoldersRepoABC):
             id_: UUID,
             with_deleted: bool = False,
             user_id: UUID = None,
+            profile: str = None,
     ) -> Optional[Folder]:
         query = self._db_session.query(
             Folder
@@ -71,15 +158,109 @@ class SAFoldersRepo(FoldersRepoABC):
                 Folder.deleted.is_(None)
             )
 
+        if profile:
+            query = query.options(*FOLDERS_LOADING_PROFILES[profile])
+
         return query.one_or_none()
 
+    def get_updated(self, id_: UUID, user_id: UUID) -> Optional[dt.datetime]:
+        # the version of the folder for the ETag, one row by the primary key without the relationships
+        return self._db_session.execute(
+            sa.select(
+                sa.func.coalesce(Folder.updated, Folder.created)
+            ).where(
+                Folder.id == id_,
+                Folder.user_id == user_id,
+                Folder.deleted.is_(None),
+            )
+        ).scalar_one_or_none()
+
+    def get_many(
+            self,
+            ids_: List[UUID],
+            with_deleted: bool = False,
+            user_id: UUID = None,
+    ) -> List[Folder]:
+        if not ids_:
+            return []
+
+        query = self._db_session.query(
+            Folder
+        ).filter(
+            Folder.id.in_(ids_),
+        )
+
+        if user_id:
+            query = query.filter(
+                Folder.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.filter(
+                Folder.deleted.is_(None)
+            )
+
+        return query.all()
+
     def list(
             self,
             title: str = None,
             parent_id: UUID = None,
             user_id: UUID = None,
-            with_deleted: bool = False
+            with_deleted: bool = False,
+            profile: str = None,
     ) -> List[Folder]:
+        query = self._make_list_query(
+            title=title,
+            parent_id=parent_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        result = query.all()
+
+        return result
+
+    def paginate(
+            self,
+            page_size: int,
+            cursor: str = None,
+            order_by: str = "updated",
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            title: str = None,
+            parent_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> SAKeysetPagination:
+        query = self._make_list_query(
+            title=title,
+            parent_id=parent_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        return SAKeysetPagination(
+            query,
+            ordering=FOLDERS_ORDERINGS[order_by],
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_cache=count_cache,
+            count_cache_key=f"folders:{user_id}:{title}:{parent_id}:{with_deleted}",
+        )
+
+    def _make_list_query(
+            self,
+            title: str = None,
+            parent_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ):
         query = self._db_session.query(
             Folder
         )
@@ -116,9 +297,68 @@ class SAFoldersRepo(FoldersRepoABC):
                 Folder.deleted.is_(None)
             )
 
-        result = query.all()
+        if profile:
+            query = query.options(*FOLDERS_LOADING_PROFILES[profile])
 
-        return result
+        return query
+
+    def get_subtree(self, folder: Folder, with_deleted: bool = False) -> List[Folder]:
+        query = self._db_session.query(
+            Folder
+        ).filter(
+            Folder.user_id == folder.user_id,
+            Folder.path.like(f"{folder.path}%"),
+        )
+
+        if not with_deleted:
+            query = query.filter(
+                Folder.deleted.is_(None)
+            )
+
+        return query.order_by(Folder.path).all()
+
+    def get_subtree_notes(self, folder: Folder, with_deleted: bool = False) -> List[Note]:
+        query = self._db_session.query(
+            Note
+        ).join(
+            Folder, Folder.id == Note.folder_id,
+        ).filter(
+            Folder.user_id == folder.user_id,
+            Folder.path.like(f"{folder.path}%"),
+        )
+
+        if not with_deleted:
+            query = query.filter(
+                Folder.deleted.is_(None),
+                Note.deleted.is_(None),
+            )
+
+        return query.all()
+
+    def get_tree(self, user_id: UUID) -> List[Folder]:
+        # ordered by path, so every parent goes before its children
+        return self._db_session.query(
+            Folder
+        ).filter(
+            Folder.user_id == user_id,
+            Folder.deleted.is_(None),
+        ).order_by(
+            Folder.path,
+        ).all()
+
+    def move_subtree(self, folder: Folder, parent: Optional[Folder]):
+        old_path = folder.path
+        new_path = Folder.make_path(folder.id, parent)
+
+        self._db_session.query(
+            Folder
+        ).filter(
+            Folder.user_id == folder.user_id,
+            Folder.path.like(f"{old_path}%"),
+        ).update(
+            {Folder.path: sa.func.concat(new_path, sa.func.substr(Folder.path, len(old_path) + 1))},
+            synchronize_session="fetch",
+        )
 
     def add(self, folder: Folder):
         self._db_session.add(folder)
@@ -126,3 +366,320 @@ class SAFoldersRepo(FoldersRepoABC):
     def remove(self, folder: Folder):
         if folder.deleted is None:
             folder.deleted = dt.datetime.utcnow()
+
+    def remove_subtree(self, folder: Folder) -> Tuple[int, int]:
+        # everything removed together shares the deletion time, restore_subtree relies on it
+        return self._set_subtree_deleted(folder, deleted=None, new_deleted=dt.datetime.utcnow())
+
+    def restore_subtree(self, folder: Folder) -> Tuple[int, int]:
+        return self._set_subtree_deleted(folder, deleted=folder.deleted, new_deleted=None)
+
+    def _set_subtree_deleted(
+            self,
+            folder: Folder,
+            deleted: Optional[dt.datetime],
+            new_deleted: Optional[dt.datetime],
+    ) -> Tuple[int, int]:
+        # folders of the subtree and their notes are updated by one statement,
+        # returns counts of updated folders and notes
+        folder_table = Folder.__table__
+        note_table = Note.__table__
+
+        def is_deleted(column):
+            return column.is_(None) if deleted is None else column == deleted
+
+        self._db_session.flush()
+
+        folders = sa.update(
+            folder_table
+        ).where(
+            folder_table.c.user_id == folder.user_id,
+            folder_table.c.path.like(f"{folder.path}%"),
+            is_deleted(folder_table.c.deleted),
+        ).values(
+            deleted=new_deleted,
+        ).returning(
+            folder_table.c.id,
+        ).cte("subtree_folders")
+
+        notes = sa.update(
+            note_table
+        ).where(
+            note_table.c.folder_id.in_(sa.select(folders.c.id)),
+            is_deleted(note_table.c.deleted),
+        ).values(
+            deleted=new_deleted,
+        ).returning(
+            note_table.c.id,
+        ).cte("subtree_notes")
+
+        folders_count, notes_count = self._db_session.execute(
+            sa.select(
+                sa.select(sa.func.count()).select_from(folders).scalar_subquery(),
+                sa.select(sa.func.count()).select_from(notes).scalar_subquery(),
+            )
+        ).one()
+
+        # loaded folders and notes are stale after the bulk update
+        self._db_session.expire_all()
+
+        return folders_count, notes_count
+
+
+class AsyncSAFoldersRepo(FoldersRepoABC):
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    @classmethod
+    def create(cls, db_session: AsyncSession) -> 'AsyncSAFoldersRepo':
+        return cls(db_session)
+
+    async def get(
+            self,
+            id_: UUID,
+            with_deleted: bool = False,
+            user_id: UUID = None,
+            profile: str = None,
+    ) -> Optional[Folder]:
+        query = sa.select(
+            Folder
+        ).where(
+            Folder.id == id_,
+        )
+
+        if user_id:
+            query = query.where(
+                Folder.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.where(
+                Folder.deleted.is_(None)
+            )
+
+        if profile:
+            query = query.options(*FOLDERS_LOADING_PROFILES[profile])
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().one_or_none()
+
+    async def get_updated(self, id_: UUID, user_id: UUID) -> Optional[dt.datetime]:
+        result = await self._db_session.execute(
+            sa.select(
+                sa.func.coalesce(Folder.updated, Folder.created)
+            ).where(
+                Folder.id == id_,
+                Folder.user_id == user_id,
+                Folder.deleted.is_(None),
+            )
+        )
+
+        return result.scalar_one_or_none()
+
+    async def get_many(
+            self,
+            ids_: List[UUID],
+            with_deleted: bool = False,
+            user_id: UUID = None,
+    ) -> List[Folder]:
+        if not ids_:
+            return []
+
+        query = sa.select(
+            Folder
+        ).where(
+            Folder.id.in_(ids_),
+        )
+
+        if user_id:
+            query = query.where(
+                Folder.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.where(
+                Folder.deleted.is_(None)
+            )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().all()
+
+    async def list(
+            self,
+            title: str = None,
+            parent_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> List[Folder]:
+        query = self._make_list_query(
+            title=title,
+            parent_id=parent_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().all()
+
+    async def paginate(
+            self,
+            page_size: int,
+            cursor: str = None,
+            order_by: str = "updated",
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            title: str = None,
+            parent_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> AsyncSAKeysetPagination:
+        query = self._make_list_query(
+            title=title,
+            parent_id=parent_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        pagination = AsyncSAKeysetPagination(
+            self._db_session,
+            ordering=FOLDERS_ORDERINGS[order_by],
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_cache=count_cache,
+            count_cache_key=f"folders:{user_id}:{title}:{parent_id}:{with_deleted}",
+        )
+
+        return await pagination.create(query)
+
+    @staticmethod
+    def _make_list_query(
+            title: str = None,
+            parent_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ):
+        query = sa.select(
+            Folder
+        )
+
+        if title:
+            query = query.where(
+                sa.type_coerce(Folder.title, sa.String).ilike(f"%{title}%"),
+            )
+
+        if parent_id is not None:
+            parent = aliased(Folder)
+
+            query = query.join(
+                parent,
+                sa.and_(
+                    parent.id == Folder.parent_id,
+                    parent.deleted.is_(None),
+                )
+            ).where(
+                Folder.parent_id == parent_id,
+            )
+        else:
+            query = query.where(
+                Folder.parent_id.is_(None),
+            )
+
+        if user_id:
+            query = query.where(
+                Folder.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.where(
+                Folder.deleted.is_(None)
+            )
+
+        if profile:
+            query = query.options(*FOLDERS_LOADING_PROFILES[profile])
+
+        return query
+
+    async def get_subtree(self, folder: Folder, with_deleted: bool = False) -> List[Folder]:
+        query = sa.select(
+            Folder
+        ).where(
+            Folder.user_id == folder.user_id,
+            Folder.path.like(f"{folder.path}%"),
+        )
+
+        if not with_deleted:
+            query = query.where(
+                Folder.deleted.is_(None)
+            )
+
+        result = await self._db_session.execute(query.order_by(Folder.path))
+
+        return result.scalars().all()
+
+    async def get_subtree_notes(self, folder: Folder, with_deleted: bool = False) -> List[Note]:
+        query = sa.select(
+            Note
+        ).join(
+            Folder, Folder.id == Note.folder_id,
+        ).where(
+            Folder.user_id == folder.user_id,
+            Folder.path.like(f"{folder.path}%"),
+        )
+
+        if not with_deleted:
+            query = query.where(
+                Folder.deleted.is_(None),
+                Note.deleted.is_(None),
+            )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().all()
+
+    async def get_tree(self, user_id: UUID) -> List[Folder]:
+        # ordered by path, so every parent goes before its children
+        result = await self._db_session.execute(
+            sa.select(
+                Folder
+            ).where(
+                Folder.user_id == user_id,
+                Folder.deleted.is_(None),
+            ).order_by(
+                Folder.path,
+            )
+        )
+
+        return result.scalars().all()
+
+    # subtree updates run the statements of SAFoldersRepo on the sync session behind the async one
+
+    async def move_subtree(self, folder: Folder, parent: Optional[Folder]):
+        await self._db_session.run_sync(
+            lambda db_session: SAFoldersRepo(db_session).move_subtree(folder, parent)
+        )
+
+    def add(self, folder: Folder):
+        self._db_session.add(folder)
+
+    def remove(self, folder: Folder):
+        if folder.deleted is None:
+            folder.deleted = dt.datetime.utcnow()
+
+    async def remove_subtree(self, folder: Folder) -> Tuple[int, int]:
+        return await self._db_session.run_sync(
+            lambda db_session: SAFoldersRepo(db_session).remove_subtree(folder)
+        )
+
+    async def restore_subtree(self, folder: Folder) -> Tuple[int, int]:
+        return await self._db_session.run_sync(
+            lambda db_session: SAFoldersRepo(db_session).restore_subtree(folder)
+        )
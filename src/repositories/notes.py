@@ -2,10 +2,46 @@ import abc
 import datetime as dt
 import sqlalchemy as sa
 from typing import Optional, List
-from src.models.note import Note
-from sqlalchemy.orm import Session
+from src.models.note import Note, NoteToNoteRelation
+from src.lib.pagination import (
+    KeysetOrdering,
+    KeysetPaginationABC,
+    SAKeysetPagination,
+    AsyncSAKeysetPagination,
+    CountCacheABC,
+)
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
+NOTES_ORDERINGS = {
+    "updated": KeysetOrdering(
+        [(Note.updated, dt.datetime), (Note.id, UUID)],
+        desc=True,
+    ),
+    "title": KeysetOrdering(
+        [(sa.type_coerce(Note.title, sa.String), str), (Note.id, UUID)],
+    ),
+}
+
+# loading profiles are matched to dump schemas, so dumping a page of notes
+# runs a fixed number of statements no matter how many notes it contains
+NOTES_LOADING_PROFILES = {
+    # NoteDumpSchema
+    "list_view": [
+        joinedload(Note.folder),
+        selectinload(Note.notes_relations).joinedload(NoteToNoteRelation.child_note),
+    ],
+    # NoteDetailDumpSchema
+    "detail_view": [
+        joinedload(Note.folder),
+        selectinload(Note.notes_relations).joinedload(NoteToNoteRelation.child_note).joinedload(Note.folder),
+        selectinload(Note.notes_relations).joinedload(NoteToNoteRelation.child_note).selectinload(
+            Note.notes_relations
+        ).joinedload(NoteToNoteRelation.child_note),
+    ],
+}
+
 
 class NotesRepoABC(abc.ABC):
     def get(
@@ -13,9 +49,23 @@ class NotesRepoABC(abc.ABC):
             id_: UUID,
             with_deleted: bool = False,
             user_id: UUID = None,
+            profile: str = None,
     ) -> Optional[Note]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_updated(self, id_: UUID, user_id: UUID) -> Optional[dt.datetime]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_many(
+            self,
+            ids_: List[UUID],
+            with_deleted: bool = False,
+            user_id: UUID = None,
+    ) -> List[Note]:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add(self, note: Note):
         raise NotImplementedError
@@ -27,10 +77,28 @@ class NotesRepoABC(abc.ABC):
             by_folder: bool = False,
             folder_id: UUID = None,
             user_id: UUID = None,
-            with_deleted: bool = False
+            with_deleted: bool = False,
+            profile: str = None,
     ) -> List[Note]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def paginate(
+            self,
+            page_size: int,
+            cursor: str = None,
+            order_by: str = "updated",
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            title: str = None,
+            by_folder: bool = False,
+            folder_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> KeysetPaginationABC:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def remove(self, note: Note):
         raise NotImplementedError
@@ -54,6 +122,7 @@ class SANotesRepo(NotesRepoABC):
             id_: UUID,
             with_deleted: bool = False,
             user_id: UUID = None,
+            profile: str = None,
     ) -> Optional[Note]:
         query = self._db_session.query(
             Note
@@ -71,16 +140,114 @@ class SANotesRepo(NotesRepoABC):
                 Note.deleted.is_(None)
             )
 
+        if profile:
+            query = query.options(*NOTES_LOADING_PROFILES[profile])
+
         return query.one_or_none()
 
+    def get_updated(self, id_: UUID, user_id: UUID) -> Optional[dt.datetime]:
+        # the version of the note for the ETag, one row by the primary key without the relationships
+        return self._db_session.execute(
+            sa.select(
+                sa.func.coalesce(Note.updated, Note.created)
+            ).where(
+                Note.id == id_,
+                Note.user_id == user_id,
+                Note.deleted.is_(None),
+            )
+        ).scalar_one_or_none()
+
+    def get_many(
+            self,
+            ids_: List[UUID],
+            with_deleted: bool = False,
+            user_id: UUID = None,
+    ) -> List[Note]:
+        if not ids_:
+            return []
+
+        query = self._db_session.query(
+            Note
+        ).filter(
+            Note.id.in_(ids_),
+        )
+
+        if user_id:
+            query = query.filter(
+                Note.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.filter(
+                Note.deleted.is_(None)
+            )
+
+        return query.all()
+
     def list(
             self,
             title: str = None,
             by_folder: bool = False,
             folder_id: UUID = None,
             user_id: UUID = None,
-            with_deleted: bool = False
+            with_deleted: bool = False,
+            profile: str = None,
     ) -> List[Note]:
+        query = self._make_list_query(
+            title=title,
+            by_folder=by_folder,
+            folder_id=folder_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        result = query.all()
+
+        return result
+
+    def paginate(
+            self,
+            page_size: int,
+            cursor: str = None,
+            order_by: str = "updated",
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            title: str = None,
+            by_folder: bool = False,
+            folder_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> SAKeysetPagination:
+        query = self._make_list_query(
+            title=title,
+            by_folder=by_folder,
+            folder_id=folder_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        return SAKeysetPagination(
+            query,
+            ordering=NOTES_ORDERINGS[order_by],
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_cache=count_cache,
+            count_cache_key=f"notes:{user_id}:{title}:{by_folder}:{folder_id}:{with_deleted}",
+        )
+
+    def _make_list_query(
+            self,
+            title: str = None,
+            by_folder: bool = False,
+            folder_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ):
         query = self._db_session.query(
             Note
         )
@@ -105,9 +272,193 @@ class SANotesRepo(NotesRepoABC):
                 Note.deleted.is_(None)
             )
 
-        result = query.all()
+        if profile:
+            query = query.options(*NOTES_LOADING_PROFILES[profile])
 
-        return result
+        return query
+
+    def add(self, note: Note):
+        self._db_session.add(note)
+
+    def remove(self, note: Note):
+        if note.deleted is None:
+            note.deleted = dt.datetime.utcnow()
+
+
+class AsyncSANotesRepo(NotesRepoABC):
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    @classmethod
+    def create(cls, db_session: AsyncSession) -> 'AsyncSANotesRepo':
+        return cls(db_session)
+
+    async def get(
+            self,
+            id_: UUID,
+            with_deleted: bool = False,
+            user_id: UUID = None,
+            profile: str = None,
+    ) -> Optional[Note]:
+        query = sa.select(
+            Note
+        ).where(
+            Note.id == id_,
+        )
+
+        if user_id:
+            query = query.where(
+                Note.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.where(
+                Note.deleted.is_(None)
+            )
+
+        if profile:
+            query = query.options(*NOTES_LOADING_PROFILES[profile])
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().unique().one_or_none()
+
+    async def get_updated(self, id_: UUID, user_id: UUID) -> Optional[dt.datetime]:
+        result = await self._db_session.execute(
+            sa.select(
+                sa.func.coalesce(Note.updated, Note.created)
+            ).where(
+                Note.id == id_,
+                Note.user_id == user_id,
+                Note.deleted.is_(None),
+            )
+        )
+
+        return result.scalar_one_or_none()
+
+    async def get_many(
+            self,
+            ids_: List[UUID],
+            with_deleted: bool = False,
+            user_id: UUID = None,
+    ) -> List[Note]:
+        if not ids_:
+            return []
+
+        query = sa.select(
+            Note
+        ).where(
+            Note.id.in_(ids_),
+        )
+
+        if user_id:
+            query = query.where(
+                Note.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.where(
+                Note.deleted.is_(None)
+            )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().all()
+
+    async def list(
+            self,
+            title: str = None,
+            by_folder: bool = False,
+            folder_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> List[Note]:
+        query = self._make_list_query(
+            title=title,
+            by_folder=by_folder,
+            folder_id=folder_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().unique().all()
+
+    async def paginate(
+            self,
+            page_size: int,
+            cursor: str = None,
+            order_by: str = "updated",
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            title: str = None,
+            by_folder: bool = False,
+            folder_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ) -> AsyncSAKeysetPagination:
+        query = self._make_list_query(
+            title=title,
+            by_folder=by_folder,
+            folder_id=folder_id,
+            user_id=user_id,
+            with_deleted=with_deleted,
+            profile=profile,
+        )
+
+        pagination = AsyncSAKeysetPagination(
+            self._db_session,
+            ordering=NOTES_ORDERINGS[order_by],
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_cache=count_cache,
+            count_cache_key=f"notes:{user_id}:{title}:{by_folder}:{folder_id}:{with_deleted}",
+        )
+
+        return await pagination.create(query)
+
+    @staticmethod
+    def _make_list_query(
+            title: str = None,
+            by_folder: bool = False,
+            folder_id: UUID = None,
+            user_id: UUID = None,
+            with_deleted: bool = False,
+            profile: str = None,
+    ):
+        query = sa.select(
+            Note
+        )
+
+        if title:
+            query = query.where(
+                sa.type_coerce(Note.title, sa.String).ilike(f"%{title}%"),
+            )
+
+        if by_folder:
+            query = query.where(
+                Note.folder_id.is_(folder_id),
+            )
+
+        if user_id:
+            query = query.where(
+                Note.user_id == user_id,
+            )
+
+        if not with_deleted:
+            query = query.where(
+                Note.deleted.is_(None)
+            )
+
+        if profile:
+            query = query.options(*NOTES_LOADING_PROFILES[profile])
+
+        return query
 
     def add(self, note: Note):
         self._db_session.add(note)
@@ -0,0 +1,137 @@
+import abc
+import sqlalchemy as sa
+from dataclasses import dataclass, field
+from typing import List, Optional
+from src.models.note import Note, NoteToNoteRelation
+from src.models.primitives.note import NoteTitle, NoteColor
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+
+@dataclass
+class NoteGraphLink:
+    child_note_id: UUID
+    description: Optional[str] = None
+
+
+@dataclass
+class NoteGraphNode:
+    id: UUID
+    title: NoteTitle
+    color: Optional[NoteColor]
+    folder_id: Optional[UUID]
+    depth: int
+    links: List[NoteGraphLink] = field(default_factory=list)
+
+
+class NoteGraphRepoABC(abc.ABC):
+    @abc.abstractmethod
+    def get_graph(self, root_note_id: UUID, depth: int, user_id: UUID = None) -> List[NoteGraphNode]:
+        raise NotImplementedError
+
+    @classmethod
+    @abc.abstractmethod
+    def create(cls, *args, **kwargs):
+        return cls()
+
+
+class SANoteGraphRepo(NoteGraphRepoABC):
+    def __init__(self, db_session: Session):
+        self._db_session = db_session
+
+    @classmethod
+    def create(cls, db_session: Session) -> 'SANoteGraphRepo':
+        return cls(db_session)
+
+    def get_graph(self, root_note_id: UUID, depth: int, user_id: UUID = None) -> List[NoteGraphNode]:
+        # notes reachable from the root in both directions of relations up to `depth` hops,
+        # every note carries its outgoing links inside the graph, empty list means root is not found
+        relation = NoteToNoteRelation.__table__
+
+        visible_notes = [Note.deleted.is_(None)]
+
+        if user_id:
+            visible_notes.append(Note.user_id == user_id)
+
+        walk = sa.select(
+            Note.id.label("note_id"),
+            sa.literal(0).label("depth"),
+        ).where(
+            Note.id == root_note_id,
+            *visible_notes,
+        ).cte("walk", recursive=True)
+
+        neighbours = sa.union_all(
+            sa.select(relation.c.parent_note_id.label("note_id"), relation.c.child_note_id.label("next_id")),
+            sa.select(relation.c.child_note_id, relation.c.parent_note_id),
+        ).subquery("neighbours")
+
+        # UNION (not UNION ALL) drops already visited (note, depth) pairs,
+        # so cycles can't multiply rows and the walk is bounded by depth
+        walk = walk.union(
+            sa.select(
+                neighbours.c.next_id,
+                walk.c.depth + 1,
+            ).select_from(
+                walk.join(
+                    neighbours, neighbours.c.note_id == walk.c.note_id,
+                ).join(
+                    Note, sa.and_(Note.id == neighbours.c.next_id, *visible_notes),
+                )
+            ).where(
+                walk.c.depth < depth,
+            )
+        )
+
+        nodes = sa.select(
+            walk.c.note_id,
+            sa.func.min(walk.c.depth).label("depth"),
+        ).group_by(
+            walk.c.note_id,
+        ).cte("nodes")
+
+        links = sa.select(
+            sa.func.coalesce(
+                sa.func.json_agg(
+                    sa.func.json_build_object(
+                        "child_note_id", relation.c.child_note_id,
+                        "description", relation.c.description,
+                    )
+                ),
+                sa.text("'[]'::json"),
+            )
+        ).where(
+            relation.c.parent_note_id == Note.id,
+            relation.c.child_note_id.in_(sa.select(nodes.c.note_id)),
+        ).scalar_subquery()
+
+        rows = self._db_session.execute(
+            sa.select(
+                Note.id,
+                Note.title,
+                Note.color,
+                Note.folder_id,
+                nodes.c.depth,
+                links,
+            ).join_from(
+                nodes, Note, Note.id == nodes.c.note_id,
+            ).order_by(
+                nodes.c.depth,
+                Note.id,
+            )
+        ).all()
+
+        return [
+            NoteGraphNode(
+                id=id_,
+                title=title,
+                color=color,
+                folder_id=folder_id,
+                depth=node_depth,
+                links=[
+                    NoteGraphLink(child_note_id=UUID(link["child_note_id"]), description=link["description"])
+                    for link in node_links
+                ],
+            )
+            for id_, title, color, folder_id, node_depth, node_links in rows
+        ]
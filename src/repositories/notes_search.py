@@ -0,0 +1,131 @@
+import abc
+import html
+import hashlib
+import sqlalchemy as sa
+from typing import List, Dict
+from src.models.note import Note, SEARCH_CONFIG
+from src.repositories.notes import NOTES_LOADING_PROFILES
+from src.lib.pagination import (
+    KeysetOrdering,
+    KeysetPaginationABC,
+    SAKeysetPagination,
+    CountCacheABC,
+)
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+# the text of the snippet is html escaped, matches are marked by control characters
+# and replaced with <mark> after the escaping
+SNIPPET_START_SEL = "\x02"
+SNIPPET_STOP_SEL = "\x03"
+SNIPPET_OPTIONS = (
+    f"StartSel={SNIPPET_START_SEL}, StopSel={SNIPPET_STOP_SEL}, MaxWords=35, MinWords=15, MaxFragments=2"
+)
+
+
+class NotesSearchRepoABC(abc.ABC):
+    @abc.abstractmethod
+    def search(
+            self,
+            query: str,
+            page_size: int,
+            cursor: str = None,
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            user_id: UUID = None,
+            profile: str = None,
+    ) -> KeysetPaginationABC:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_snippets(self, query: str, notes_ids: List[UUID]) -> Dict[UUID, str]:
+        raise NotImplementedError
+
+    @classmethod
+    @abc.abstractmethod
+    def create(cls, *args, **kwargs):
+        return cls()
+
+
+class SANotesSearchRepo(NotesSearchRepoABC):
+    def __init__(self, db_session: Session):
+        self._db_session = db_session
+
+    @classmethod
+    def create(cls, db_session: Session) -> 'SANotesSearchRepo':
+        return cls(db_session)
+
+    def search(
+            self,
+            query: str,
+            page_size: int,
+            cursor: str = None,
+            with_total: bool = False,
+            count_cache: CountCacheABC = None,
+            user_id: UUID = None,
+            profile: str = None,
+    ) -> SAKeysetPagination:
+        ts_query = _make_ts_query(query)
+
+        # ts_rank_cd returns real, casting to double keeps cursor values exact after json round trip
+        rank = sa.cast(sa.func.ts_rank_cd(Note.search_vector, ts_query), sa.Float)
+
+        db_query = self._db_session.query(
+            Note
+        ).filter(
+            Note.search_vector.op("@@")(ts_query),
+            Note.deleted.is_(None),
+        )
+
+        if user_id:
+            db_query = db_query.filter(
+                Note.user_id == user_id,
+            )
+
+        if profile:
+            db_query = db_query.options(*NOTES_LOADING_PROFILES[profile])
+
+        query_hash = hashlib.md5(query.encode("utf-8")).hexdigest()
+
+        return SAKeysetPagination(
+            db_query,
+            ordering=KeysetOrdering([(rank, float), (Note.id, UUID)], desc=True),
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            count_cache=count_cache,
+            count_cache_key=f"notes_search:{user_id}:{query_hash}",
+        )
+
+    def get_snippets(self, query: str, notes_ids: List[UUID]) -> Dict[UUID, str]:
+        # ts_headline reparses the document, so it is computed only for the notes of the current page
+        if not notes_ids:
+            return {}
+
+        # the sentinels are dropped from the text, so only matches are marked
+        document = sa.func.translate(
+            sa.func.coalesce(
+                sa.func.nullif(Note.text, ""),
+                sa.type_coerce(Note.title, sa.String),
+            ),
+            SNIPPET_START_SEL + SNIPPET_STOP_SEL,
+            "",
+        )
+
+        rows = self._db_session.query(
+            Note.id,
+            sa.func.ts_headline(SEARCH_CONFIG, document, _make_ts_query(query), SNIPPET_OPTIONS),
+        ).filter(
+            Note.id.in_(notes_ids),
+        ).all()
+
+        return {note_id: _escape_snippet(snippet) for note_id, snippet in rows}
+
+
+def _escape_snippet(snippet: str) -> str:
+    return html.escape(snippet).replace(SNIPPET_START_SEL, "<mark>").replace(SNIPPET_STOP_SEL, "</mark>")
+
+
+def _make_ts_query(query: str):
+    # websearch syntax accepts any user input: quotes, "or" and "-" are supported, garbage is ignored
+    return sa.func.websearch_to_tsquery(SEARCH_CONFIG, query)
@@ -0,0 +1,119 @@
+import abc
+import datetime as dt
+import sqlalchemy as sa
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from src.message_bus import events
+from src.models.outbox import OutboxMessage
+from uuid import uuid4, UUID
+
+
+class OutboxRepoABC(abc.ABC):
+    @abc.abstractmethod
+    def add(self, event: events.Event):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def with_handler_kwargs(self, **kwargs) -> 'OutboxRepoABC':
+        # the repo for the events a request passes to the message bus with kwargs (user_id, object_id, ...)
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def claim(self, limit: int) -> List[OutboxMessage]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def mark_processed(self, ids_: List[UUID]):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_processed(self, before: dt.datetime, limit: int) -> int:
+        raise NotImplementedError
+
+    @classmethod
+    @abc.abstractmethod
+    def create(cls, *args, **kwargs):
+        return cls()
+
+
+class SAOutboxRepo(OutboxRepoABC):
+    def __init__(self, db_session: Session, handler_kwargs: Optional[dict] = None):
+        self._db_session = db_session
+        self._handler_kwargs = handler_kwargs
+
+    @classmethod
+    def create(cls, db_session: Session) -> 'SAOutboxRepo':
+        return cls(db_session)
+
+    def add(self, event: events.Event):
+        self._db_session.add(
+            OutboxMessage(
+                id=uuid4(),
+                event_type=type(event).__name__,
+                payload=event.serialize(),
+                handler_kwargs=self._handler_kwargs,
+            )
+        )
+
+    def with_handler_kwargs(self, **kwargs) -> 'SAOutboxRepo':
+        return SAOutboxRepo(
+            self._db_session,
+            handler_kwargs={
+                key: str(value) if isinstance(value, UUID) else value
+                for key, value in kwargs.items()
+            },
+        )
+
+    def claim(self, limit: int) -> List[OutboxMessage]:
+        # rows locked by another relay are skipped, so relays can run in parallel
+        query = sa.select(
+            OutboxMessage
+        ).where(
+            OutboxMessage.processed.is_(None)
+        ).order_by(
+            OutboxMessage.created
+        ).limit(
+            limit
+        ).with_for_update(
+            skip_locked=True
+        )
+
+        return self._db_session.execute(query).scalars().all()
+
+    def mark_processed(self, ids_: List[UUID]):
+        if not ids_:
+            return
+
+        self._db_session.execute(
+            sa.update(
+                OutboxMessage
+            ).where(
+                OutboxMessage.id.in_(ids_)
+            ).values(
+                processed=dt.datetime.utcnow()
+            ).execution_options(
+                synchronize_session=False
+            )
+        )
+
+    def delete_processed(self, before: dt.datetime, limit: int) -> int:
+        # a chunk per statement, so the delete does not hold locks on the whole table
+        ids_ = sa.select(
+            OutboxMessage.id
+        ).where(
+            OutboxMessage.processed < before
+        ).limit(
+            limit
+        ).scalar_subquery()
+
+        result = self._db_session.execute(
+            sa.delete(
+                OutboxMessage
+            ).where(
+                OutboxMessage.id.in_(ids_)
+            ).execution_options(
+                synchronize_session=False
+            )
+        )
+
+        return result.rowcount
@@ -1,11 +1,13 @@
 import abc
 import datetime as dt
+import sqlalchemy as sa
 from typing import Optional
 from src.models.user import User
 from src.models.primitives.user import (
     Email,
 )
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
 
@@ -73,3 +75,51 @@ class SAUsersRepo(UsersRepoABC):
     def remove(self, user: User):
         if user.deleted is None:
             user.deleted = dt.datetime.utcnow()
+
+
+class AsyncSAUsersRepo(UsersRepoABC):
+    def __init__(self, db_session: AsyncSession):
+        self._db_session = db_session
+
+    @classmethod
+    def create(cls, db_session: AsyncSession) -> 'AsyncSAUsersRepo':
+        return cls(db_session)
+
+    def add(self, user: User):
+        self._db_session.add(user)
+
+    async def get_by_email(self, email: Email, with_deleted: bool = False) -> Optional[User]:
+        query = sa.select(
+            User
+        ).where(
+            User.email == email,
+        )
+
+        if not with_deleted:
+            query = query.where(
+                User.deleted.is_(None)
+            )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().one_or_none()
+
+    async def get(self, id_: UUID, with_deleted: bool = False) -> Optional[User]:
+        query = sa.select(
+            User
+        ).where(
+            User.id == id_,
+        )
+
+        if not with_deleted:
+            query = query.where(
+                User.deleted.is_(None)
+            )
+
+        result = await self._db_session.execute(query)
+
+        return result.scalars().one_or_none()
+
+    def remove(self, user: User):
+        if user.deleted is None:
+            user.deleted = dt.datetime.utcnow()
@@ -2,8 +2,10 @@ import typing
 import json
 from typing import List, Dict
 from src.entrypoints.web.errors.base import HTTPUnprocessableEntity
-from src.lib.pagination import PaginationABC
-from marshmallow import Schema, fields
+from src.lib.pagination import PaginationABC, KeysetPaginationABC
+from marshmallow import Schema, fields, validate
+
+MAX_KEYSET_PAGE_SIZE = 200
 
 
 def pagination_dump(items: List, pagination: PaginationABC) -> Dict:
@@ -17,11 +19,35 @@ def pagination_dump(items: List, pagination: PaginationABC) -> Dict:
     }
 
 
+def keyset_pagination_dump(items: List, pagination: KeysetPaginationABC) -> Dict:
+    return {
+        "data": items,
+        "meta": {
+            "page_size": pagination.page_size,
+            "next_cursor": pagination.next_cursor,
+            "total": pagination.total,
+        }
+    }
+
+
 class BasePaginationSchema(Schema):
     page = fields.Integer(default=1, allow_none=False, missing=1)
     page_size = fields.Integer(default=20, allow_none=False, missing=20)
 
 
+class BaseKeysetPaginationSchema(Schema):
+    cursor = fields.String(required=False, allow_none=True, missing=None)
+    page_size = fields.Integer(
+        required=False, allow_none=True, missing=None,
+        validate=validate.Range(min=1, max=MAX_KEYSET_PAGE_SIZE),
+    )
+    with_total = fields.Boolean(required=False, allow_none=False, missing=False)
+
+    @staticmethod
+    def is_paginated(params: dict) -> bool:
+        return params.get("cursor") is not None or params.get("page_size") is not None
+
+
 class JSON(fields.Field):
     def _deserialize(self, value, attr, data, **kwargs):
         if type(value) in [dict, list]:
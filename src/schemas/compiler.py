@@ -0,0 +1,216 @@
+import uuid
+import pkgutil
+import threading
+import importlib
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Type
+from marshmallow import Schema, fields, missing, RAISE, INCLUDE
+from src.schemas.registry import get_schema
+
+# dump schemas compiled into plain functions: one attribute read and one inline conversion per field
+# instead of the per-field dispatch of Schema.dump. Output matches Schema.dump key for key,
+# fields without an inline conversion call their own _serialize.
+# Load functions are the load of the shared schema instance, or a fast path for simple params
+DumpFunction = Callable[[Any], dict]
+LoadFunction = Callable[[Any], dict]
+
+_compiled: Dict[Type[Schema], DumpFunction] = {}
+_compiled_loads: Dict[Type[Schema], LoadFunction] = {}
+_lock = threading.Lock()
+
+_STR_FIELDS = (fields.String, fields.UUID)
+
+
+def compiled_dump(schema_cls: Type[Schema]) -> DumpFunction:
+    # compiled on the first call: nested schemas are referenced by name and must be registered by then
+    dump = _compiled.get(schema_cls)
+
+    if dump is None:
+        with _lock:
+            dump = _compiled.get(schema_cls)
+
+            if dump is None:
+                dump = _compiled[schema_cls] = compile_dump(get_schema(schema_cls))
+
+    return dump
+
+
+def compiled_load(schema_cls: Type[Schema]) -> LoadFunction:
+    load = _compiled_loads.get(schema_cls)
+
+    if load is None:
+        with _lock:
+            load = _compiled_loads.get(schema_cls)
+
+            if load is None:
+                load = _compiled_loads[schema_cls] = compile_load(get_schema(schema_cls))
+
+    return load
+
+
+def preload_schemas(package: ModuleType):
+    # every schema of the package is instantiated and compiled when the app is made and not on the first
+    # request of a worker. Modules are imported first: nested schemas are looked up by name
+    modules = [
+        importlib.import_module(module_info.name)
+        for module_info in pkgutil.iter_modules(package.__path__, f"{package.__name__}.")
+    ]
+
+    for module in modules:
+        for value in list(vars(module).values()):
+            if not isinstance(value, type) or not issubclass(value, Schema) or value.__module__ != module.__name__:
+                continue
+
+            if value.__name__.endswith("DumpSchema"):
+                compiled_dump(value)
+            else:
+                compiled_load(value)
+
+
+def compile_dump(schema: Schema) -> DumpFunction:
+    # pre/post dump hooks are left to marshmallow
+    if any(schema._hooks.values()):
+        return lambda obj: schema.dump(obj, many=False)
+
+    namespace = {}
+    lines = ["def dump(obj):"]
+    items = []
+
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        attribute = field.attribute or name
+        key = field.data_key if field.data_key is not None else name
+        value = f"v{index}"
+
+        namespace[f"field{index}"] = field
+
+        if attribute.isidentifier():
+            lines.append(f"    {value} = obj.{attribute}")
+            items.append(f"{key!r}: {_compile_field(field, name, value, index, namespace)}")
+        else:
+            items.append(f"{key!r}: field{index}.serialize({name!r}, obj)")
+
+    lines.append("    return {" + ", ".join(items) + "}")
+
+    exec("\n".join(lines), namespace)
+
+    dump = namespace["dump"]
+    dump.__qualname__ = f"{type(schema).__name__}.compiled_dump"
+
+    return dump
+
+
+def _compile_field(field: fields.Field, name: str, value: str, index: int, namespace: dict) -> str:
+    field_type = type(field)
+
+    if field_type in _STR_FIELDS:
+        return f"None if {value} is None else str({value})"
+
+    if field_type is fields.DateTime and field.format in (None, "iso"):
+        return f"None if {value} is None else {value}.isoformat()"
+
+    if field_type is fields.Integer and not field.as_string:
+        return f"None if {value} is None else int({value})"
+
+    if field_type is fields.Nested:
+        namespace[f"nested{index}"] = compile_dump(field.schema)
+
+        if field.many or field.schema.many:
+            return f"None if {value} is None else [nested{index}(item) for item in {value}]"
+
+        return f"None if {value} is None else nested{index}({value})"
+
+    return f"field{index}._serialize({value}, {name!r}, obj)"
+
+
+def compile_load(schema: Schema) -> LoadFunction:
+    # params of UUID and boolean fields only (note_id, folder_id, ...) are converted without marshmallow.
+    # Any value the fast path does not take (missing, invalid, unknown) goes to Schema.load,
+    # so errors are the same
+    if any(schema._hooks.values()) or schema.unknown == INCLUDE or not schema.load_fields:
+        return schema.load
+
+    converters = []
+
+    for name, field in schema.load_fields.items():
+        convert = _compile_load_field(field)
+
+        if convert is None:
+            return schema.load
+
+        key = field.data_key if field.data_key is not None else name
+        converters.append((key, field.attribute or name, field.required, field.load_default, convert))
+
+    keys = frozenset(key for key, *_ in converters)
+    check_unknown = schema.unknown == RAISE
+
+    def load(data):
+        if type(data) is not dict or (check_unknown and not keys.issuperset(data)):
+            return schema.load(data)
+
+        result = {}
+
+        for key, attribute, required, load_default, convert in converters:
+            value = data.get(key, missing)
+
+            if value is missing:
+                if required:
+                    return schema.load(data)
+
+                if load_default is not missing:
+                    result[attribute] = load_default() if callable(load_default) else load_default
+
+                continue
+
+            value = convert(value)
+
+            if value is missing:
+                return schema.load(data)
+
+            result[attribute] = value
+
+        return result
+
+    load.__qualname__ = f"{type(schema).__name__}.compiled_load"
+
+    return load
+
+
+def _compile_load_field(field: fields.Field) -> Optional[Callable[[Any], Any]]:
+    if field.validators:
+        return None
+
+    field_type = type(field)
+
+    if field_type is fields.UUID:
+        return _load_uuid
+
+    if field_type is fields.Boolean and field.truthy:
+        return _make_load_boolean(field.truthy, field.falsy)
+
+    return None
+
+
+def _load_uuid(value):
+    if type(value) is str:
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            pass
+
+    return missing
+
+
+def _make_load_boolean(truthy: set, falsy: set):
+    def load_boolean(value):
+        try:
+            if value in truthy:
+                return True
+
+            if value in falsy:
+                return False
+        except TypeError:
+            pass
+
+        return missing
+
+    return load_boolean
@@ -1,4 +1,7 @@
-from marshmallow import Schema, fields, EXCLUDE
+from typing import List, Dict
+from marshmallow import Schema, fields, validate, EXCLUDE
+from src.schemas.base import BaseKeysetPaginationSchema
+from src.schemas.compiler import compiled_dump
 from src.schemas.primitives.folders import (
     FolderTitleField,
     FolderColorField,
@@ -9,12 +12,16 @@ class FolderByIdParamsSchema(Schema):
     folder_id = fields.UUID(required=True)
 
 
-class FoldersCollectionParamsSchema(Schema):
+class FoldersCollectionParamsSchema(BaseKeysetPaginationSchema):
     title = fields.String(required=False, allow_none=True, missing=None)
     parent_id = fields.UUID(required=False, allow_none=True, missing=None)
+    order_by = fields.String(
+        required=False, allow_none=False, missing="updated",
+        validate=validate.OneOf(["updated", "title"]),
+    )
 
 
-class FolderDumpSchema(Schema):
+class FolderBriefDumpSchema(Schema):
     id = fields.UUID(dump_only=True)
 
     title = FolderTitleField(dump_only=True)
@@ -22,12 +29,43 @@ class FolderDumpSchema(Schema):
 
     parent_id = fields.UUID(dump_only=True)
 
-    children_folders = fields.Nested("FolderDumpSchema", many=True)
-
     created = fields.DateTime(dump_only=True)
     updated = fields.DateTime(dump_only=True)
 
 
+# nesting depth of dump schemas is bounded and matches FOLDERS_LOADING_PROFILES
+class FolderDumpSchema(FolderBriefDumpSchema):
+    children_folders = fields.Nested("FolderBriefDumpSchema", many=True)
+
+
+class FolderDetailDumpSchema(FolderBriefDumpSchema):
+    children_folders = fields.Nested("FolderDumpSchema", many=True)
+
+
+def folders_tree_dump(folders: List) -> List[Dict]:
+    # folders must be ordered by path, so every parent is dumped before its children
+    dump_folder = compiled_dump(FolderBriefDumpSchema)
+
+    nodes = {}
+    tree = []
+
+    for folder in folders:
+        node = dump_folder(folder)
+        node["children_folders"] = []
+
+        if folder.parent_id is None:
+            tree.append(node)
+        elif folder.parent_id in nodes:
+            nodes[folder.parent_id]["children_folders"].append(node)
+        else:
+            # parent folder is removed
+            continue
+
+        nodes[folder.id] = node
+
+    return tree
+
+
 class FolderCreationSchema(Schema):
     title = FolderTitleField(required=True)
     color = FolderColorField()
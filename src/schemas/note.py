@@ -1,22 +1,19 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from src.schemas.base import BaseKeysetPaginationSchema
 from src.schemas.primitives.notes import (
     NoteTitleField,
     NoteColorField,
 )
 
+MAX_GRAPH_DEPTH = 5
+MAX_NOTES_BATCH_SIZE = 500
+
 
 class NoteByIdParamsSchema(Schema):
     note_id = fields.UUID(required=True)
 
 
-class NotesRelationsDumpSchema(Schema):
-    child_note_id = fields.UUID(dump_only=True)
-    child_note = fields.Nested("NoteDumpSchema")
-
-    description = fields.String(dump_only=True)
-
-
-class NoteDumpSchema(Schema):
+class NoteBriefDumpSchema(Schema):
     id = fields.UUID(dump_only=True)
 
     title = NoteTitleField(dump_only=True)
@@ -25,14 +22,34 @@ class NoteDumpSchema(Schema):
     text = fields.String(dump_only=True)
 
     folder_id = fields.UUID(dump_only=True)
-    folder = fields.Nested("FolderDumpSchema")
-
-    notes_relations = fields.Nested("NotesRelationsDumpSchema", many=True)
 
     created = fields.DateTime(dump_only=True)
     updated = fields.DateTime(dump_only=True)
 
 
+class NotesRelationsDumpSchema(Schema):
+    child_note_id = fields.UUID(dump_only=True)
+    child_note = fields.Nested("NoteBriefDumpSchema")
+
+    description = fields.String(dump_only=True)
+
+
+# nesting depth of dump schemas is bounded and matches NOTES_LOADING_PROFILES,
+# relations graph may contain cycles, so it's never dumped recursively
+class NoteDumpSchema(NoteBriefDumpSchema):
+    folder = fields.Nested("FolderBriefDumpSchema")
+
+    notes_relations = fields.Nested("NotesRelationsDumpSchema", many=True)
+
+
+class NotesDetailRelationsDumpSchema(NotesRelationsDumpSchema):
+    child_note = fields.Nested("NoteDumpSchema")
+
+
+class NoteDetailDumpSchema(NoteDumpSchema):
+    notes_relations = fields.Nested("NotesDetailRelationsDumpSchema", many=True)
+
+
 class NoteCreationInputSchema(Schema):
     title = NoteTitleField(required=True)
     color = NoteColorField(required=False, allow_none=True)
@@ -51,10 +68,78 @@ class NoteUpdateSchema(Schema):
     folder_id = fields.UUID(required=False, allow_none=True)
 
 
-class NotesCollectionParamsSchema(Schema):
+class NotesCollectionParamsSchema(BaseKeysetPaginationSchema):
     title = fields.String(required=False, allow_none=True, missing=None)
     by_folder = fields.Boolean(required=False, allow_none=False, missing=False)
     folder_id = fields.UUID(required=False, allow_none=True, missing=None)
+    order_by = fields.String(
+        required=False, allow_none=False, missing="updated",
+        validate=validate.OneOf(["updated", "title"]),
+    )
+
+
+class NotesSearchParamsSchema(BaseKeysetPaginationSchema):
+    query = fields.String(required=True, allow_none=False, validate=validate.Length(min=1, max=256))
+
+
+class NoteGraphParamsSchema(Schema):
+    note_id = fields.UUID(required=True)
+    depth = fields.Integer(
+        required=False, allow_none=False, missing=2,
+        validate=validate.Range(min=1, max=MAX_GRAPH_DEPTH),
+    )
+
+
+class NoteGraphLinkDumpSchema(Schema):
+    child_note_id = fields.UUID(dump_only=True)
+    description = fields.String(dump_only=True)
+
+
+class NoteGraphNodeDumpSchema(Schema):
+    id = fields.UUID(dump_only=True)
+
+    title = NoteTitleField(dump_only=True)
+    color = NoteColorField(dump_only=True)
+
+    folder_id = fields.UUID(dump_only=True)
+
+    depth = fields.Integer(dump_only=True)
+    links = fields.Nested("NoteGraphLinkDumpSchema", many=True)
+
+
+class NoteBatchOperationSchema(Schema):
+    op = fields.String(required=True, validate=validate.OneOf(["create", "update", "move", "delete"]))
+
+    note_id = fields.UUID(required=False)
+
+    title = NoteTitleField(required=False)
+    color = NoteColorField(required=False, allow_none=True)
+
+    text = fields.String(required=False, allow_none=True)
+
+    folder_id = fields.UUID(required=False, allow_none=True)
+
+    @validates_schema
+    def validate_operation(self, data, **kwargs):
+        if data["op"] == "create":
+            if "title" not in data:
+                raise ValidationError("Missing data for required field.", "title")
+
+            return
+
+        if "note_id" not in data:
+            raise ValidationError("Missing data for required field.", "note_id")
+
+        # an explicit null moves the note to the root
+        if data["op"] == "move" and "folder_id" not in data:
+            raise ValidationError("Missing data for required field.", "folder_id")
+
+
+class NotesBatchSchema(Schema):
+    operations = fields.Nested(
+        "NoteBatchOperationSchema", many=True, required=True,
+        validate=validate.Length(min=1, max=MAX_NOTES_BATCH_SIZE),
+    )
 
 
 class NoteRelationCreationParamsSchema(Schema):
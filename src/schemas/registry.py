@@ -0,0 +1,21 @@
+import threading
+from typing import Dict, Type
+from marshmallow import Schema
+
+# one instance per schema class shared by all requests and threads instead of an instance per call:
+# load and dump keep no state on the instance, while the constructor binds and copies every field
+_schemas: Dict[Type[Schema], Schema] = {}
+_lock = threading.Lock()
+
+
+def get_schema(schema_cls: Type[Schema]) -> Schema:
+    schema = _schemas.get(schema_cls)
+
+    if schema is None:
+        with _lock:
+            schema = _schemas.get(schema_cls)
+
+            if schema is None:
+                schema = _schemas[schema_cls] = schema_cls()
+
+    return schema
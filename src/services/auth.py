@@ -191,4 +191,5 @@ def close_session(session_uuid: str, sessions_repo: AuthSessionsRepoABC):
 
 
 def revoke_access_tokens(user: User):
+    # callers emit a user event, its handler drops the cached principal with the old credential version
     user.credential_version = uuid4()
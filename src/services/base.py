@@ -0,0 +1,19 @@
+from typing import List
+from src.message_bus.types import Event
+from src.repositories.outbox import OutboxRepoABC
+
+
+class EventsEmitter:
+    def __init__(self, outbox_repo: OutboxRepoABC = None):
+        self._events: List[Event] = []
+        self._outbox_repo = outbox_repo
+
+    def get_events(self) -> List[Event]:
+        return self._events
+
+    def _emit(self, event: Event):
+        self._events.append(event)
+
+        # the outbox row is committed in the same transaction as the domain change
+        if self._outbox_repo:
+            self._outbox_repo.add(event)
@@ -1,8 +1,8 @@
 import abc
-from typing import List
 from dataclasses import dataclass
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.folder import Folder
 from src.models.primitives.folder import (
     FolderColor,
@@ -27,13 +27,7 @@ class FolderCreationError(Exception):
         super().__init__()
 
 
-class FolderCreatorABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class FolderCreatorABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def create(
             self,
@@ -47,10 +41,11 @@ class FolderCreator(FolderCreatorABC):
     def __init__(
             self,
             folders_repo: FoldersRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._folders_repo = folders_repo
 
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def create(
             self,
@@ -66,18 +61,21 @@ class FolderCreator(FolderCreatorABC):
                     message=f"Parent folder (uuid={str(data.parent_id)}) not found"
                 )
 
+        folder_id = uuid4()
+
         folder = Folder(
-            id=uuid4(),
+            id=folder_id,
             title=data.title,
             color=data.color,
             parent_id=data.parent_id,
             parent=parent,
+            path=Folder.make_path(folder_id, parent),
             user_id=user_id,
         )
 
         self._folders_repo.add(folder)
 
-        self._events.append(
+        self._emit(
             events.FolderCreated(
                 id=folder.id,
                 user_id=user_id,
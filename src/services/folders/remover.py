@@ -1,7 +1,7 @@
 import abc
-from typing import List
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.folder import Folder
 from src.repositories.folders import FoldersRepoABC
 
@@ -15,13 +15,7 @@ class FolderRemoveError(Exception):
         super().__init__()
 
 
-class FolderRemoverABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class FolderRemoverABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def remove(
             self,
@@ -35,21 +29,24 @@ class FolderRemover(FolderRemoverABC):
     def __init__(
             self,
             folders_repo: FoldersRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._folders_repo = folders_repo
 
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def remove(
             self,
             folder: Folder,
             user_id: UUID,
     ):
-        self._folders_repo.remove(folder)
+        folders_count, notes_count = self._folders_repo.remove_subtree(folder)
 
-        self._events.append(
+        self._emit(
             events.FolderRemoved(
                 id=folder.id,
                 user_id=user_id,
+                folders_count=folders_count,
+                notes_count=notes_count,
             )
         )
@@ -0,0 +1,62 @@
+import abc
+from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
+from src.models.folder import Folder
+from src.repositories.folders import FoldersRepoABC
+
+from uuid import UUID
+
+
+class FolderRestoreError(Exception):
+    def __init__(self, message: str = None):
+        self.message = message
+
+        super().__init__()
+
+
+class FolderRestorerABC(EventsEmitter, abc.ABC):
+    @abc.abstractmethod
+    def restore(
+            self,
+            folder: Folder,
+            user_id: UUID,
+    ):
+        raise NotImplementedError
+
+
+class FolderRestorer(FolderRestorerABC):
+    def __init__(
+            self,
+            folders_repo: FoldersRepoABC,
+            outbox_repo: OutboxRepoABC = None,
+    ):
+        self._folders_repo = folders_repo
+
+        super().__init__(outbox_repo)
+
+    def restore(
+            self,
+            folder: Folder,
+            user_id: UUID,
+    ):
+        if folder.deleted is None:
+            raise FolderRestoreError(
+                message="Folder is not removed"
+            )
+
+        if folder.parent_id and self._folders_repo.get(id_=folder.parent_id, user_id=user_id) is None:
+            raise FolderRestoreError(
+                message=f"Parent folder (uuid={str(folder.parent_id)}) is removed"
+            )
+
+        folders_count, notes_count = self._folders_repo.restore_subtree(folder)
+
+        self._emit(
+            events.FolderRestored(
+                id=folder.id,
+                user_id=user_id,
+                folders_count=folders_count,
+                notes_count=notes_count,
+            )
+        )
@@ -1,8 +1,8 @@
 import abc
-from typing import List
 from copy import deepcopy
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.folder import Folder
 from src.repositories.folders import FoldersRepoABC
 
@@ -16,13 +16,7 @@ class FolderUpdateError(Exception):
         super().__init__()
 
 
-class FolderUpdaterABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class FolderUpdaterABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def update(
             self,
@@ -37,10 +31,11 @@ class FolderUpdater(FolderUpdaterABC):
     def __init__(
             self,
             folders_repo: FoldersRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._folders_repo = folders_repo
 
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def update(
             self,
@@ -61,7 +56,15 @@ class FolderUpdater(FolderUpdaterABC):
                     message=f"Parent folder (uuid={str(parent_id)}) not found"
                 )
 
+        if parent and parent.path.startswith(folder.path):
+            raise FolderUpdateError(
+                message="Folder cannot be moved into itself or its subfolder"
+            )
+
         if parent:
+            if parent.id != folder.parent_id:
+                self._folders_repo.move_subtree(folder, parent)
+
             folder.parent_id = parent.id
             updated_fields["parent_id"] = parent.id
 
@@ -70,7 +73,7 @@ class FolderUpdater(FolderUpdaterABC):
                 updated_fields[key] = value
                 setattr(folder, key, value)
 
-        self._events.append(
+        self._emit(
             events.FolderUpdated(
                 id=folder.id,
                 updated_fields=updated_fields,
@@ -1,8 +1,8 @@
 import abc
-from typing import List
 from dataclasses import dataclass
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.note import Note
 from src.models.folder import Folder
 from src.models.primitives.note import (
@@ -28,13 +28,7 @@ class NoteCreationError(Exception):
         super().__init__()
 
 
-class NoteCreatorABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class NoteCreatorABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def create(
             self,
@@ -49,10 +43,11 @@ class NoteCreator(NoteCreatorABC):
     def __init__(
             self,
             notes_repo: NotesRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._notes_repo = notes_repo
 
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def create(
             self,
@@ -69,11 +64,11 @@ class NoteCreator(NoteCreatorABC):
             user_id=user_id,
         )
 
-        self._notes_repo.add(folder)
+        self._notes_repo.add(note)
 
-        self._events.append(
+        self._emit(
             events.NoteCreated(
-                id=folder.id,
+                id=note.id,
                 user_id=user_id,
             )
         )
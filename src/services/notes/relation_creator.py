@@ -1,8 +1,8 @@
 import abc
-from typing import List
 from dataclasses import dataclass
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.note import Note, NoteToNoteRelation
 
 from uuid import uuid4, UUID
@@ -22,13 +22,7 @@ class NoteRelationCreationError(Exception):
         super().__init__()
 
 
-class NoteRelationCreatorABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class NoteRelationCreatorABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def create(
             self,
@@ -41,8 +35,9 @@ class NoteRelationCreatorABC(abc.ABC):
 class NoteRelationCreator(NoteRelationCreatorABC):
     def __init__(
             self,
+            outbox_repo: OutboxRepoABC = None,
     ):
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def create(
             self,
@@ -75,7 +70,7 @@ class NoteRelationCreator(NoteRelationCreatorABC):
             )
         )
 
-        self._events.append(
+        self._emit(
             events.NoteRelationCreated(
                 id=data.parent_note.id,
                 child_note_id=data.child_note.id,
@@ -1,7 +1,7 @@
 import abc
-from typing import List
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.note import Note
 
 from uuid import UUID
@@ -14,13 +14,7 @@ class NoteRelationRemoveError(Exception):
         super().__init__()
 
 
-class NoteRelationRemoverABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class NoteRelationRemoverABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def remove(
             self,
@@ -34,8 +28,9 @@ class NoteRelationRemoverABC(abc.ABC):
 class NoteRelationRemover(NoteRelationRemoverABC):
     def __init__(
             self,
+            outbox_repo: OutboxRepoABC = None,
     ):
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def remove(
             self,
@@ -52,7 +47,7 @@ class NoteRelationRemover(NoteRelationRemoverABC):
             children_notes[child_note.id]
         )
 
-        self._events.append(
+        self._emit(
             events.NoteRelationRemoved(
                 id=parent_note.id,
                 child_note_id=child_note.id,
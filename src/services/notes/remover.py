@@ -1,7 +1,7 @@
 import abc
-from typing import List
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.note import Note
 from src.repositories.notes import NotesRepoABC
 
@@ -15,13 +15,7 @@ class NoteRemoveError(Exception):
         super().__init__()
 
 
-class NoteRemoverABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class NoteRemoverABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def remove(
             self,
@@ -35,10 +29,11 @@ class NoteRemover(NoteRemoverABC):
     def __init__(
             self,
             notes_repo: NotesRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._notes_repo = notes_repo
 
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def remove(
             self,
@@ -47,7 +42,7 @@ class NoteRemover(NoteRemoverABC):
     ):
         self._notes_repo.remove(note)
 
-        self._events.append(
+        self._emit(
             events.NoteRemoved(
                 id=note.id,
                 user_id=user_id,
@@ -1,9 +1,10 @@
 import abc
-from typing import List
 from copy import deepcopy
-from src.message_bus.types import Event
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from src.models.note import Note
+from src.models.folder import Folder
 
 from src.repositories.folders import FoldersRepoABC
 
@@ -17,19 +18,14 @@ class NoteUpdateError(Exception):
         super().__init__()
 
 
-class NoteUpdaterABC(abc.ABC):
-    def __init__(self):
-        self._events: List[Event] = []
-
-    def get_events(self) -> List[Event]:
-        return self._events
-
+class NoteUpdaterABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def update(
             self,
             data: dict,
             note: Note,
             user_id: UUID,
+            folder: Folder = None,
     ) -> Note:
         raise NotImplementedError
 
@@ -37,24 +33,28 @@ class NoteUpdaterABC(abc.ABC):
 class NoteUpdater(NoteUpdaterABC):
     def __init__(
             self,
-            folders_repo: FoldersRepoABC
+            folders_repo: FoldersRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._folders_repo = folders_repo
 
-        super().__init__()
+        super().__init__(outbox_repo)
 
     def update(
             self,
             data: dict,
             note: Note,
             user_id: UUID,
+            folder: Folder = None,
     ) -> Note:
+        # folder may be passed already loaded, then folder_id from data is ignored,
+        # an explicit null folder_id moves the note to the root
         data = deepcopy(data)
         updated_fields = {}
-        folder = None
 
+        to_root = "folder_id" in data and data["folder_id"] is None
         folder_id = data.pop("folder_id", None)
-        if folder_id:
+        if folder is None and folder_id:
             folder = self._folders_repo.get(id_=folder_id, user_id=user_id)
 
             if folder is None:
@@ -65,15 +65,18 @@ class NoteUpdater(NoteUpdaterABC):
         if folder:
             note.folder_id = folder.id
             updated_fields["folder_id"] = folder.id
+        elif to_root:
+            note.folder_id = None
+            updated_fields["folder_id"] = None
 
         for key, value in data.items():
             if hasattr(note, key):
                 updated_fields[key] = value
                 setattr(note, key, value)
 
-        self._events.append(
+        self._emit(
             events.NoteUpdated(
-                id=folder.id,
+                id=note.id,
                 updated_fields=updated_fields,
                 user_id=user_id,
             )
@@ -14,10 +14,12 @@ from src.models.password_change_token import PasswordChangeToken, TOKEN_LIFETIME
 from src.models.user import User
 
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 from uuid import uuid4
 
 
-class PasswordChangeTokenCreatorABC(abc.ABC):
+class PasswordChangeTokenCreatorABC(EventsEmitter, abc.ABC):
     def make(self, user_id: str) -> PasswordChangeToken:
         raise NotImplementedError
 
@@ -26,11 +28,13 @@ class PasswordChangeTokenCreator(PasswordChangeTokenCreatorABC):
     def __init__(
             self,
             password_change_tokens_repo: PasswordChangeTokensRepoABC,
-            encoder: EncoderABC
+            encoder: EncoderABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._password_change_tokens_repo = password_change_tokens_repo
         self._encoder = encoder
-        self._events = []
+
+        super().__init__(outbox_repo)
 
     def make(self, user: User) -> str:
         token = token_hex(32)
@@ -46,7 +50,7 @@ class PasswordChangeTokenCreator(PasswordChangeTokenCreatorABC):
 
         self._password_change_tokens_repo.add(model)
 
-        self._events.append(
+        self._emit(
             events.PasswordChangeRequestCreated(
                 user_id=user.id,
                 token_id=model.id,
@@ -57,15 +61,12 @@ class PasswordChangeTokenCreator(PasswordChangeTokenCreatorABC):
 
         return token
 
-    def get_events(self):
-        return self._events
-
 
 class ChangePasswordError(Exception):
     pass
 
 
-class PasswordChangerABC(abc.ABC):
+class PasswordChangerABC(EventsEmitter, abc.ABC):
     @abc.abstractmethod
     def change_by_token(self, token: str, password: str):
         raise NotImplementedError
@@ -86,11 +87,13 @@ class PasswordChanger(PasswordChangerABC):
             tokens_repo: PasswordChangeTokensRepoABC,
             users_repo: UsersRepoABC,
             auth_sessions_repo: AuthSessionsRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._tokens_repo = tokens_repo
         self._users_repo = users_repo
         self._auth_sessions_repo = auth_sessions_repo
-        self._events = []
+
+        super().__init__(outbox_repo)
 
     def change_by_token(self, token: str, password: str):
         token = self._tokens_repo.get(token)
@@ -109,7 +112,7 @@ class PasswordChanger(PasswordChangerABC):
 
         self._auth_sessions_repo.remove_all_by_user(user.id)
 
-        self._events.append(
+        self._emit(
             events.UserPasswordChanged(
                 email=user.email,
                 id=user.id,
@@ -127,12 +130,9 @@ class PasswordChanger(PasswordChangerABC):
 
         user.password = user.make_password_hash(new_password)
 
-        self._events.append(
+        self._emit(
             events.UserPasswordChanged(
                 email=user.email,
                 id=user.id,
             )
         )
-
-    def get_events(self):
-        return self._events
@@ -1,5 +1,4 @@
 import abc
-from typing import List
 from dataclasses import dataclass
 
 from src.repositories.users import UsersRepoABC
@@ -12,8 +11,9 @@ from src.models.primitives.user import (
     Email,
 )
 
-from src.message_bus.types import Message
 from src.message_bus import events
+from src.repositories.outbox import OutboxRepoABC
+from src.services.base import EventsEmitter
 
 from uuid import uuid4
 
@@ -38,7 +38,7 @@ class RegistrationInput:
     password: str = None
 
 
-class RegistrationServiceABC(abc.ABC):
+class RegistrationServiceABC(EventsEmitter, abc.ABC):
     def register(self, data: RegistrationInput) -> User:
         raise NotImplementedError
 
@@ -47,9 +47,11 @@ class RegistrationService(RegistrationServiceABC):
     def __init__(
             self,
             users_repo: UsersRepoABC,
+            outbox_repo: OutboxRepoABC = None,
     ):
         self._users_repo = users_repo
-        self._events: List[Message] = []
+
+        super().__init__(outbox_repo)
 
     def register(self, data: RegistrationInput) -> User:
         self._check_user_doesnt_exists(data)
@@ -65,7 +67,7 @@ class RegistrationService(RegistrationServiceABC):
 
         self._users_repo.add(user)
 
-        self._events.append(
+        self._emit(
             events.UserCreated(
                 id=user.id,
             )
@@ -78,6 +80,3 @@ class RegistrationService(RegistrationServiceABC):
 
         if user:
             raise UserCreationError
-
-    def get_events(self) -> List[Message]:
-        return self._events
@@ -0,0 +1,259 @@
+import asyncio
+import pytest
+
+from uuid import UUID
+
+from falcon import testing
+from falcon.status_codes import (
+    HTTP_200,
+    HTTP_401,
+    HTTP_413,
+)
+
+from src.entrypoints.web.async_api.v1 import url
+from src.entrypoints.web.asgi import make_app as make_async_app
+from src.models.folder import Folder
+from src.models.note import Note
+from tests.helpers.headers import Headers
+from tests.helpers.users import make_test_user
+from tests.helpers.folders import make_test_folder
+from tests.helpers.notes import make_test_note
+from tests.helpers.message_bus import DryRunMessageBus
+
+from src.message_bus import events
+from src.repositories.auth_sessions import SAAuthSessionsRepo
+from src.lib.hashing import TokenEncoder
+from config import TestConfig
+
+NOTE_URL = url("/note")
+NOTES_URL = url("/notes")
+FOLDER_URL = url("/folder")
+FOLDERS_URL = url("/folders")
+
+TEST_USER_PASSWORD = "querty123"
+
+
+def test_async_api_info(api_async, db_session):
+    result = api_async.simulate_get(url("/api-info"))
+
+    assert result.status == HTTP_200
+    assert result.json["db_connection_active"] is True
+
+
+def test_async_try_get_note_without_auth(api_async):
+    result = api_async.simulate_get(NOTE_URL)
+
+    assert result.status == HTTP_401
+
+
+def test_async_auth_session(api_async, db_session):
+    user = make_test_user(db_session, password=TEST_USER_PASSWORD)
+    db_session.commit()
+
+    result = api_async.simulate_post(url("/auth/sign-in"), json={
+        "email": user.email.value,
+        "password": TEST_USER_PASSWORD,
+        "device_id": "device",
+    })
+
+    assert result.status == HTTP_200
+
+    headers = Headers()
+    headers.set_bearer_token(result.json["access_token"])
+
+    result = api_async.simulate_get(url("/current-user"), headers=headers.get())
+
+    assert result.status == HTTP_200
+    assert result.json["user"]["id"] == str(user.id)
+
+    refresh_token = api_async.simulate_post(url("/auth/sign-in"), json={
+        "email": user.email.value,
+        "password": TEST_USER_PASSWORD,
+        "device_id": "device",
+    }).json["refresh_token"]
+
+    result = api_async.simulate_post(url("/auth/refresh"), json={
+        "refresh_token": refresh_token,
+        "device_id": "device",
+    })
+
+    assert result.status == HTTP_200
+
+    refresh_token = result.json["refresh_token"]
+
+    result = api_async.simulate_post(url("/auth/sign-out"), json={
+        "refresh_token": refresh_token,
+    })
+
+    assert result.status == HTTP_200
+    assert SAAuthSessionsRepo(db_session, TokenEncoder()).get(refresh_token) is None
+
+
+def test_async_note_crud(api_factory_async, db_session, headers: Headers, auth_session_factory):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    message_bus = DryRunMessageBus(
+        event_handlers={
+            events.NoteCreated: [],
+            events.NoteUpdated: [],
+            events.NoteRemoved: [],
+        }
+    )
+    api_async = api_factory_async(message_bus=message_bus)
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api_async.simulate_post(NOTE_URL, headers=headers.get(), json={
+        "title": "Async note",
+        "folder_id": str(folder.id),
+    })
+
+    assert result.status == HTTP_200
+    assert result.json["note"]["folder"]["id"] == str(folder.id)
+
+    note_id = result.json["note"]["id"]
+
+    result = api_async.simulate_patch(NOTE_URL, headers=headers.get(), params={"note_id": note_id}, json={
+        "title": "Async note updated",
+    })
+
+    assert result.status == HTTP_200
+    assert result.json["note"]["title"] == "Async note updated"
+
+    result = api_async.simulate_get(NOTE_URL, headers=headers.get(), params={"note_id": note_id})
+
+    assert result.status == HTTP_200
+    assert result.json["note"]["id"] == note_id
+
+    result = api_async.simulate_delete(NOTE_URL, headers=headers.get(), params={"note_id": note_id})
+
+    assert result.status == HTTP_200
+    assert db_session.query(Note).get(UUID(note_id)).deleted is not None
+
+    assert [type(m["message"]) for m in message_bus.messages] == [
+        events.NoteCreated,
+        events.NoteUpdated,
+        events.NoteRemoved,
+    ]
+
+
+def test_async_get_notes_page(api_async, db_session, headers: Headers, auth_session_factory):
+    user = make_test_user(db_session)
+
+    for _ in range(5):
+        make_test_note(db_session, user)
+
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    params = {"page_size": 2, "with_total": True}
+    notes_ids = []
+
+    while True:
+        result = api_async.simulate_get(NOTES_URL, headers=headers.get(), params=params)
+
+        assert result.status == HTTP_200
+        assert result.json["meta"]["total"] == 5
+
+        notes_ids.extend(item["note"]["id"] for item in result.json["data"])
+
+        if result.json["meta"]["next_cursor"] is None:
+            break
+
+        params["cursor"] = result.json["meta"]["next_cursor"]
+
+    assert len(set(notes_ids)) == 5
+
+
+def test_async_get_notes_list_is_streamed(api_async, db_session, headers: Headers, auth_session_factory):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    notes_ids = {str(make_test_note(db_session, user, folder=folder).id) for _ in range(3)}
+
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api_async.simulate_get(NOTES_URL, headers=headers.get())
+
+    assert result.status == HTTP_200
+    assert {item["note"]["id"] for item in result.json} == notes_ids
+    assert all(item["note"]["folder"]["id"] == str(folder.id) for item in result.json)
+
+
+def test_async_try_send_too_large_body(api_async, db_session, headers: Headers, auth_session_factory):
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api_async.simulate_post(
+        NOTE_URL, headers=headers.get(), json={"title": "title", "text": "a" * TestConfig.max_request_body_size},
+    )
+
+    assert result.status == HTTP_413
+    assert result.json["error"]["code"] == 7111001
+
+
+def test_async_folder_crud(api_async, db_session, headers: Headers, auth_session_factory):
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api_async.simulate_post(FOLDER_URL, headers=headers.get(), json={"title": "Parent"})
+
+    assert result.status == HTTP_200
+
+    parent_id = result.json["folder"]["id"]
+
+    result = api_async.simulate_post(FOLDER_URL, headers=headers.get(), json={"title": "Child"})
+    child_id = result.json["folder"]["id"]
+
+    result = api_async.simulate_patch(FOLDER_URL, headers=headers.get(), params={"folder_id": child_id}, json={
+        "parent_id": parent_id,
+    })
+
+    assert result.status == HTTP_200
+    assert result.json["folder"]["parent_id"] == parent_id
+
+    result = api_async.simulate_get(FOLDER_URL, headers=headers.get(), params={"folder_id": parent_id})
+
+    assert [f["id"] for f in result.json["folder"]["children_folders"]] == [child_id]
+
+    result = api_async.simulate_get(FOLDERS_URL, headers=headers.get())
+
+    assert [item["folder"]["id"] for item in result.json] == [parent_id]
+
+    result = api_async.simulate_delete(FOLDER_URL, headers=headers.get(), params={"folder_id": parent_id})
+
+    assert result.status == HTTP_200
+
+    db_session.expire_all()
+    assert db_session.query(Folder).get(UUID(child_id)).deleted is not None
+
+
+@pytest.mark.asyncio
+async def test_async_requests_are_served_concurrently(db_session, headers: Headers, auth_session_factory):
+    user = make_test_user(db_session)
+    notes = [make_test_note(db_session, user) for _ in range(20)]
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    async with testing.ASGIConductor(make_async_app(TestConfig)) as conductor:
+        results = await asyncio.gather(*[
+            conductor.simulate_get(NOTE_URL, headers=headers.get(), params={"note_id": str(note.id)})
+            for note in notes
+        ])
+
+    assert [result.json["note"]["id"] for result in results] == [str(note.id) for note in notes]
@@ -1,12 +1,16 @@
+from uuid import uuid4
 from src.entrypoints.web.api.v1 import url
 from falcon.status_codes import (
     HTTP_200,
+    HTTP_304,
+    HTTP_400,
     HTTP_401,
     HTTP_404,
 )
 from tests.helpers.headers import Headers
 from tests.helpers.users import make_test_user
 from tests.helpers.folders import make_test_folder
+from tests.helpers.notes import make_test_note
 from tests.helpers.message_bus import DryRunMessageBus
 
 from src.models.primitives.folder import (
@@ -14,11 +18,14 @@ from src.models.primitives.folder import (
 )
 
 from src.repositories.folders import SAFoldersRepo
+from src.entrypoints.web.errors.folder import HTTPFolderRestoreError
 
 from src.message_bus import events
 
 FOLDER_URL = url("/folder")
 FOLDERS_URL = url("/folders")
+FOLDERS_TREE_URL = url("/folders/tree")
+FOLDER_RESTORE_URL = url("/folder/restore")
 
 
 def test_try_get_folder_without_auth(api):
@@ -68,6 +75,56 @@ def test_get_folder(
     assert result.status == HTTP_404
 
 
+def test_get_folder_if_none_match_without_loading_folder(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+        monkeypatch,
+):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+    req_params = {"folder_id": str(folder.id)}
+
+    etag = api.simulate_get(FOLDER_URL, headers=headers.get(), params=req_params).headers["ETag"]
+
+    loads = []
+    get = SAFoldersRepo.get
+    monkeypatch.setattr(
+        SAFoldersRepo, "get", lambda self, *args, **kwargs: loads.append(args) or get(self, *args, **kwargs),
+    )
+
+    result = api.simulate_get(FOLDER_URL, headers={**headers.get(), "If-None-Match": etag}, params=req_params)
+
+    assert result.status == HTTP_304
+    assert result.headers["ETag"] == etag
+    assert loads == []
+
+    # children folders are embedded in the folder, a new one changes the ETag of the parent
+    result = api.simulate_post(
+        FOLDER_URL, headers=headers.get(), json={"title": "child", "color": "#333fff", "parent_id": str(folder.id)},
+    )
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(FOLDER_URL, headers={**headers.get(), "If-None-Match": etag}, params=req_params)
+
+    assert result.status == HTTP_200
+    assert result.headers["ETag"] != etag
+    assert len(result.json["folder"]["children_folders"]) == 1
+
+    result = api.simulate_get(
+        FOLDER_URL, headers={**headers.get(), "If-None-Match": "*"}, params={"folder_id": str(uuid4())},
+    )
+
+    assert result.status == HTTP_404
+
+
 def test_try_post_folder_without_auth(api):
     result = api.simulate_post(FOLDER_URL)
 
@@ -317,3 +374,138 @@ def test_get_folders_by_title(
 
     assert str(folder1.id) in folders_ids
     assert str(folder2.id) not in folders_ids
+
+
+def test_get_folders_by_cursor(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    folders = [
+        make_test_folder(db_session, user, title=FolderTitle(f"folder {i}"))
+        for i in range(3)
+    ]
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_params = {
+        "page_size": 2,
+        "order_by": "title",
+    }
+
+    result = api.simulate_get(
+        FOLDERS_URL, headers=headers.get(), params=req_params,
+    )
+
+    assert result.status == HTTP_200
+    assert result.json["meta"]["total"] is None
+    assert [f["folder"]["id"] for f in result.json["data"]] == [str(f.id) for f in folders[:2]]
+
+    req_params["cursor"] = result.json["meta"]["next_cursor"]
+
+    result = api.simulate_get(
+        FOLDERS_URL, headers=headers.get(), params=req_params,
+    )
+
+    assert result.status == HTTP_200
+    assert result.json["meta"]["next_cursor"] is None
+    assert [f["folder"]["id"] for f in result.json["data"]] == [str(folders[2].id)]
+
+
+def test_get_folders_tree(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    root_folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=root_folder)
+    grandchild_folder = make_test_folder(db_session, user, parent=child_folder)
+    another_root_folder = make_test_folder(db_session, user)
+
+    make_test_folder(db_session, make_test_user(db_session))
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(FOLDERS_TREE_URL, headers=headers.get())
+
+    assert result.status == HTTP_200
+
+    tree = {f["id"]: f for f in result.json["folders"]}
+
+    assert set(tree) == {str(root_folder.id), str(another_root_folder.id)}
+
+    children = tree[str(root_folder.id)]["children_folders"]
+
+    assert [f["id"] for f in children] == [str(child_folder.id)]
+    assert [f["id"] for f in children[0]["children_folders"]] == [str(grandchild_folder.id)]
+    assert tree[str(another_root_folder.id)]["children_folders"] == []
+
+
+def test_restore_folder(
+        api_factory,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    message_bus = DryRunMessageBus(
+        event_handlers={
+            events.FolderRemoved: [],
+            events.FolderRestored: [],
+        }
+    )
+
+    api = api_factory(message_bus=message_bus)
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+    note = make_test_note(db_session, user, folder=child_folder)
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_params = {
+        "folder_id": str(folder.id)
+    }
+
+    result = api.simulate_delete(FOLDER_URL, headers=headers.get(), params=req_params)
+
+    assert result.status == HTTP_200
+
+    removed_event = message_bus.messages[0]["message"]
+
+    assert removed_event.folders_count == 2
+    assert removed_event.notes_count == 1
+
+    result = api.simulate_get(FOLDERS_TREE_URL, headers=headers.get())
+
+    assert str(folder.id) not in [f["id"] for f in result.json["folders"]]
+
+    result = api.simulate_post(FOLDER_RESTORE_URL, headers=headers.get(), params=req_params)
+
+    assert result.status == HTTP_200
+    assert result.json["folder"]["id"] == str(folder.id)
+
+    db_session.expire_all()
+
+    assert SAFoldersRepo(db_session).get(id_=child_folder.id) is not None
+    assert note.deleted is None
+
+    result = api.simulate_post(FOLDER_RESTORE_URL, headers=headers.get(), params=req_params)
+
+    assert result.status == HTTP_400
+    assert result.json["error"]["code"] == HTTPFolderRestoreError.code
@@ -1,10 +1,20 @@
 import uuid
 
+from concurrent.futures import ThreadPoolExecutor
+
+import time
+from datetime import datetime
+from redis import Redis
+
 from src.entrypoints.web.api.v1 import url
 from falcon.status_codes import (
     HTTP_200,
+    HTTP_304,
+    HTTP_400,
     HTTP_401,
     HTTP_404,
+    HTTP_413,
+    HTTP_422,
 )
 from tests.helpers.headers import Headers
 from tests.helpers.users import make_test_user
@@ -13,17 +23,24 @@ from tests.helpers.notes import make_test_note
 from tests.helpers.message_bus import DryRunMessageBus
 
 from src.repositories.notes import SANotesRepo
+from src.entrypoints.web.errors.note import HTTPNoteBatchError
+from src.entrypoints.web.lib.apicache import APICache
 
 from src.models.primitives.note import (
     NoteTitle,
 )
 from src.models.note import NoteToNoteRelation
+from src.models.outbox import OutboxMessage
 
 from src.message_bus import events
+from config import TestConfig
 
 
 NOTE_URL = url("/note")
 NOTES_URL = url("/notes")
+NOTES_SEARCH_URL = url("/notes/search")
+NOTES_GRAPH_URL = url("/notes/graph")
+NOTES_BATCH_URL = url("/notes/batch")
 NOTE_RELATION_URL = url("/note-relation")
 
 
@@ -74,6 +91,34 @@ def test_get_note(
     assert result.status == HTTP_404
 
 
+def test_get_note_concurrently(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    notes = [make_test_note(db_session, user) for _ in range(16)]
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    def get_note(note):
+        return api.simulate_get(
+            NOTE_URL, headers=headers.get(), params={"note_id": str(note.id)},
+        )
+
+    # every request works with its own session, so parallel requests do not interfere
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(get_note, notes))
+
+    assert [r.status for r in results] == [HTTP_200] * len(notes)
+    assert [r.json["note"]["id"] for r in results] == [str(note.id) for note in notes]
+
+
 def test_try_post_note_without_auth(api):
     result = api.simulate_post(NOTE_URL)
 
@@ -127,6 +172,231 @@ def test_post_note(
     assert events.NoteCreated in emitted_messages
 
 
+def test_post_note_writes_outbox(
+        api_factory,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    class OutboxConfig(TestConfig):
+        is_outbox_enabled = True
+
+    api = api_factory(config=OutboxConfig)
+    user = make_test_user(db_session)
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_post(
+        NOTE_URL, headers=headers.get(), json={"title": "outbox note"},
+    )
+
+    assert result.status == HTTP_200
+
+    message = db_session.query(OutboxMessage).filter(
+        OutboxMessage.payload["id"].astext == result.json["note"]["id"]
+    ).one()
+
+    assert message.event_type == "NoteCreated"
+    assert message.processed is None
+
+
+def test_patch_note_drops_cached_notes(
+        api_factory,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    api = api_factory()
+    user = make_test_user(db_session)
+    note = make_test_note(db_session, user)
+    auth_session = auth_session_factory(db_session, user)
+
+    another_user = make_test_user(db_session)
+    another_auth_session = auth_session_factory(db_session, another_user)
+
+    db_session.commit()
+
+    another_headers = Headers()
+    another_headers.set_bearer_token(another_auth_session.access_token)
+    headers.set_bearer_token(auth_session.access_token)
+
+    APICache.enabled = True
+
+    try:
+        # responses are cached per user
+        assert api.simulate_get(NOTES_URL, headers=headers.get()).headers[APICache.CACHE_HEADER] == "Miss"
+        assert api.simulate_get(NOTES_URL, headers=another_headers.get()).headers[APICache.CACHE_HEADER] == "Miss"
+        assert api.simulate_get(NOTES_URL, headers=headers.get()).headers[APICache.CACHE_HEADER] == "Hit"
+
+        result = api.simulate_patch(
+            NOTE_URL, headers=headers.get(),
+            json={"title": "cached title"}, params={"note_id": str(note.id)},
+        )
+
+        assert result.status == HTTP_200
+
+        result = api.simulate_get(NOTES_URL, headers=headers.get())
+
+        assert result.headers[APICache.CACHE_HEADER] == "Miss"
+        assert [n["note"]["title"] for n in result.json] == ["cached title"]
+
+        # the notes of another user stay cached
+        assert api.simulate_get(NOTES_URL, headers=another_headers.get()).headers[APICache.CACHE_HEADER] == "Hit"
+    finally:
+        APICache.enabled = False
+
+
+def test_get_note_if_none_match(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    note = make_test_note(db_session, user)
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+    params = {"note_id": str(note.id)}
+
+    result = api.simulate_get(NOTE_URL, headers=headers.get(), params=params)
+    etag = result.headers["ETag"]
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(NOTE_URL, headers={**headers.get(), "If-None-Match": etag}, params=params)
+
+    assert result.status == HTTP_304
+    assert result.headers["ETag"] == etag
+    assert result.text == ""
+
+    result = api.simulate_patch(NOTE_URL, headers=headers.get(), json={"title": "new title"}, params=params)
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(NOTE_URL, headers={**headers.get(), "If-None-Match": etag}, params=params)
+
+    assert result.status == HTTP_200
+    assert result.headers["ETag"] != etag
+    assert result.json["note"]["title"] == "new title"
+
+
+def test_get_note_if_none_match_without_loading_note(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+        monkeypatch,
+):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    note = make_test_note(db_session, user, folder=folder)
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+    params = {"note_id": str(note.id)}
+
+    etag = api.simulate_get(NOTE_URL, headers=headers.get(), params=params).headers["ETag"]
+
+    loads = []
+    get = SANotesRepo.get
+    monkeypatch.setattr(
+        SANotesRepo, "get", lambda self, *args, **kwargs: loads.append(args) or get(self, *args, **kwargs),
+    )
+
+    result = api.simulate_get(NOTE_URL, headers={**headers.get(), "If-None-Match": etag}, params=params)
+
+    assert result.status == HTTP_304
+    assert result.headers["ETag"] == etag
+    assert loads == []
+
+    # the folder is embedded in the note, its change changes the ETag of the note
+    result = api.simulate_patch(
+        url("/folder"), headers=headers.get(), json={"title": "new title"}, params={"folder_id": str(folder.id)},
+    )
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(NOTE_URL, headers={**headers.get(), "If-None-Match": etag}, params=params)
+
+    assert result.status == HTTP_200
+    assert result.headers["ETag"] != etag
+    assert result.json["note"]["folder"]["title"] == "new title"
+    assert len(loads) == 1
+
+
+def test_get_notes_if_modified_since(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    note = make_test_note(db_session, user)
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    # the notes of the user were changed a minute ago
+    Redis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    ).set(f"API_CACHE:MODIFIED:user:{user.id}:notes", int((time.time() - 60) * 1000))
+
+    result = api.simulate_get(NOTES_URL, headers=headers.get())
+    last_modified = result.headers["Last-Modified"]
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(NOTES_URL, headers={**headers.get(), "If-Modified-Since": last_modified})
+
+    assert result.status == HTTP_304
+
+    result = api.simulate_patch(
+        NOTE_URL, headers=headers.get(), json={"title": "new title"}, params={"note_id": str(note.id)},
+    )
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(NOTES_URL, headers={**headers.get(), "If-Modified-Since": last_modified})
+
+    assert result.status == HTTP_200
+    assert result.json[0]["note"]["title"] == "new title"
+
+
+def test_try_post_note_with_too_large_body(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_post(
+        NOTE_URL, headers=headers.get(), json={"title": "title", "text": "a" * TestConfig.max_request_body_size},
+    )
+
+    assert result.status == HTTP_413
+    assert result.json["error"]["code"] == 7111001
+
+
 def test_try_patch_note_without_auth(api):
     result = api.simulate_patch(NOTE_URL)
 
@@ -301,6 +571,446 @@ def test_get_notes_by_title(
     assert str(note2.id) not in notes_ids
 
 
+def test_get_notes_by_cursor(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    notes = [
+        make_test_note(db_session, user, title=NoteTitle(f"note {i}"))
+        for i in range(5)
+    ]
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_params = {
+        "page_size": 2,
+        "order_by": "title",
+        "with_total": True,
+    }
+
+    notes_ids = []
+
+    for _ in range(3):
+        result = api.simulate_get(
+            NOTES_URL, headers=headers.get(), params=req_params,
+        )
+
+        assert result.status == HTTP_200
+        assert result.json["meta"]["total"] == 5
+        notes_ids.extend([f["note"]["id"] for f in result.json["data"]])
+
+        req_params["cursor"] = result.json["meta"]["next_cursor"]
+
+    assert result.json["meta"]["next_cursor"] is None
+    assert notes_ids == [str(note.id) for note in notes]
+
+
+def test_get_notes_graph(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+
+    root, child, grandchild, parent, far_note, removed = [make_test_note(db_session, user) for _ in range(6)]
+    removed.deleted = datetime.utcnow()
+
+    # root -> child -> grandchild -> root is a cycle, parent -> root is an incoming link
+    for parent_note, child_note in [
+        (root, child), (child, grandchild), (grandchild, root), (parent, root), (grandchild, far_note),
+        (root, removed),
+    ]:
+        parent_note.notes_relations.append(
+            NoteToNoteRelation(id=uuid.uuid4(), child_note=child_note, description="link")
+        )
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(
+        NOTES_GRAPH_URL, headers=headers.get(), params={"note_id": str(root.id), "depth": 1},
+    )
+
+    assert result.status == HTTP_200
+
+    nodes = {node["id"]: node for node in result.json["nodes"]}
+
+    assert set(nodes) == {str(root.id), str(child.id), str(grandchild.id), str(parent.id)}
+    assert nodes[str(root.id)]["depth"] == 0
+    assert nodes[str(grandchild.id)]["depth"] == 1
+    assert [link["child_note_id"] for link in nodes[str(root.id)]["links"]] == [str(child.id)]
+    assert {link["child_note_id"] for link in nodes[str(grandchild.id)]["links"]} == {str(root.id)}
+
+    result = api.simulate_get(
+        NOTES_GRAPH_URL, headers=headers.get(), params={"note_id": str(root.id), "depth": 2},
+    )
+
+    assert result.status == HTTP_200
+
+    nodes = {node["id"]: node for node in result.json["nodes"]}
+
+    assert str(far_note.id) in nodes
+    assert nodes[str(far_note.id)]["depth"] == 2
+    assert str(removed.id) not in nodes
+
+
+def test_try_get_notes_graph_of_foreign_note(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    foreign_note = make_test_note(db_session, make_test_user(db_session))
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(
+        NOTES_GRAPH_URL, headers=headers.get(), params={"note_id": str(foreign_note.id)},
+    )
+
+    assert result.status == HTTP_404
+
+
+def test_post_notes_batch(
+        api_factory,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    message_bus = DryRunMessageBus(
+        event_handlers={
+            events.NoteCreated: [],
+            events.NoteUpdated: [],
+            events.NoteRemoved: [],
+        }
+    )
+
+    api = api_factory(message_bus=message_bus)
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    updated_note, moved_note, removed_note = [make_test_note(db_session, user) for _ in range(3)]
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_body = {
+        "operations": [
+            {"op": "create", "title": "batch note 1", "text": "text"},
+            {"op": "create", "title": "batch note 2", "folder_id": str(folder.id)},
+            {"op": "update", "note_id": str(updated_note.id), "title": "updated title"},
+            {"op": "move", "note_id": str(moved_note.id), "folder_id": str(folder.id)},
+            {"op": "delete", "note_id": str(removed_note.id)},
+        ]
+    }
+
+    result = api.simulate_post(NOTES_BATCH_URL, headers=headers.get(), json=req_body)
+
+    assert result.status == HTTP_200
+    assert [r["op"] for r in result.json] == ["create", "create", "update", "move", "delete"]
+    assert result.json[0]["note"]["title"] == "batch note 1"
+    assert result.json[1]["note"]["folder_id"] == str(folder.id)
+    assert result.json[2]["note"]["title"] == "updated title"
+    assert result.json[3]["note"]["folder_id"] == str(folder.id)
+    assert result.json[4]["note_id"] == str(removed_note.id)
+
+    db_session.expire_all()
+
+    notes_repo = SANotesRepo(db_session)
+
+    assert notes_repo.get(id_=removed_note.id) is None
+    assert notes_repo.get(id_=uuid.UUID(result.json[0]["note"]["id"])) is not None
+
+    emitted_messages = [type(m["message"]) for m in message_bus.messages]
+
+    assert emitted_messages.count(events.NoteCreated) == 2
+    assert emitted_messages.count(events.NoteUpdated) == 2
+    assert emitted_messages.count(events.NoteRemoved) == 1
+
+
+def test_post_notes_batch_publishes_events_in_order_of_operations(
+        api_factory,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    message_bus = DryRunMessageBus(
+        event_handlers={
+            events.NoteCreated: [],
+            events.NoteUpdated: [],
+            events.NoteRemoved: [],
+        }
+    )
+
+    api = api_factory(message_bus=message_bus)
+    user = make_test_user(db_session)
+    updated_note, removed_note = [make_test_note(db_session, user) for _ in range(2)]
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_body = {
+        "operations": [
+            {"op": "delete", "note_id": str(removed_note.id)},
+            {"op": "update", "note_id": str(updated_note.id), "title": "updated title"},
+            {"op": "create", "title": "batch note", "text": "text"},
+            {"op": "update", "note_id": str(updated_note.id), "title": "updated again"},
+        ]
+    }
+
+    result = api.simulate_post(NOTES_BATCH_URL, headers=headers.get(), json=req_body)
+
+    assert result.status == HTTP_200
+    assert [type(m["message"]) for m in message_bus.messages] == [
+        events.NoteRemoved,
+        events.NoteUpdated,
+        events.NoteCreated,
+        events.NoteUpdated,
+    ]
+
+
+def test_try_post_notes_batch_with_foreign_note(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    note = make_test_note(db_session, user)
+    foreign_note = make_test_note(db_session, make_test_user(db_session))
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_body = {
+        "operations": [
+            {"op": "update", "note_id": str(note.id), "title": "updated title"},
+            {"op": "delete", "note_id": str(foreign_note.id)},
+        ]
+    }
+
+    result = api.simulate_post(NOTES_BATCH_URL, headers=headers.get(), json=req_body)
+
+    assert result.status == HTTP_400
+    assert result.json["error"]["code"] == HTTPNoteBatchError.code
+
+    db_session.expire_all()
+
+    assert note.title == NoteTitle("Test note")
+    assert foreign_note.deleted is None
+
+
+def test_post_notes_batch_moves_note_to_root(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    note = make_test_note(db_session, user, folder=folder)
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_post(NOTES_BATCH_URL, headers=headers.get(), json={
+        "operations": [{"op": "move", "note_id": str(note.id), "folder_id": None}],
+    })
+
+    assert result.status == HTTP_200
+    assert result.json[0]["note"]["folder_id"] is None
+
+    db_session.expire_all()
+
+    assert note.folder_id is None
+
+    result = api.simulate_post(NOTES_BATCH_URL, headers=headers.get(), json={
+        "operations": [{"op": "move", "note_id": str(note.id)}],
+    })
+
+    assert result.status == HTTP_422
+
+
+def test_try_post_notes_batch_with_removed_note(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    note = make_test_note(db_session, user)
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    for operation in [
+        {"op": "update", "note_id": str(note.id), "title": "updated title"},
+        {"op": "move", "note_id": str(note.id), "folder_id": str(folder.id)},
+    ]:
+        result = api.simulate_post(NOTES_BATCH_URL, headers=headers.get(), json={
+            "operations": [{"op": "delete", "note_id": str(note.id)}, operation],
+        })
+
+        assert result.status == HTTP_400
+        assert result.json["error"]["code"] == HTTPNoteBatchError.code
+        assert "index=1" in result.json["error"]["message"]
+
+        db_session.expire_all()
+
+        assert note.deleted is None
+        assert note.title == NoteTitle("Test note")
+        assert note.folder_id is None
+
+
+def test_search_notes(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    another_user = make_test_user(db_session)
+
+    title_match = make_test_note(db_session, user, title=NoteTitle("Graph theory"), text="Basics")
+    text_match = make_test_note(db_session, user, title=NoteTitle("Lecture"), text="Some words about graph theory")
+    make_test_note(db_session, user, title=NoteTitle("Shopping list"), text="Milk, bread")
+    make_test_note(db_session, another_user, title=NoteTitle("Graph theory"), text="Foreign note")
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(
+        NOTES_SEARCH_URL, headers=headers.get(), params={"query": "graph theory", "with_total": True},
+    )
+
+    assert result.status == HTTP_200
+    assert result.json["meta"]["total"] == 2
+    assert [item["note"]["id"] for item in result.json["data"]] == [str(title_match.id), str(text_match.id)]
+    assert "<mark>graph</mark> <mark>theory</mark>" in result.json["data"][1]["snippet"]
+
+
+def test_search_notes_snippet_is_escaped(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    text = 'if a < b && "graph" <img src=x onerror=alert(1)> \x02theory'
+    make_test_note(db_session, user, title=NoteTitle("Lecture"), text=text)
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(NOTES_SEARCH_URL, headers=headers.get(), params={"query": "graph"})
+
+    assert result.status == HTTP_200
+
+    snippet = result.json["data"][0]["snippet"]
+
+    assert "<mark>graph</mark>&quot; &lt;img src=x onerror=alert(1)&gt;" in snippet
+    assert "<img" not in snippet
+    assert "\x02" not in snippet
+    assert snippet.count("<mark>") == 1
+
+
+def test_search_notes_by_cursor(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    notes = [
+        make_test_note(db_session, user, title=NoteTitle(f"note {i}"), text="zettelkasten " * i)
+        for i in range(1, 6)
+    ]
+
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    req_params = {
+        "query": "zettelkasten",
+        "page_size": 2,
+    }
+
+    notes_ids = []
+
+    for _ in range(3):
+        result = api.simulate_get(
+            NOTES_SEARCH_URL, headers=headers.get(), params=req_params,
+        )
+
+        assert result.status == HTTP_200
+        notes_ids.extend([f["note"]["id"] for f in result.json["data"]])
+
+        req_params["cursor"] = result.json["meta"]["next_cursor"]
+
+    assert result.json["meta"]["next_cursor"] is None
+    assert sorted(notes_ids) == sorted([str(note.id) for note in notes])
+    assert len(set(notes_ids)) == len(notes)
+
+
+def test_try_get_notes_by_invalid_cursor(
+        api,
+        db_session,
+        headers: Headers,
+        auth_session_factory,
+):
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(
+        NOTES_URL, headers=headers.get(), params={"cursor": "invalid"},
+    )
+
+    assert result.status == HTTP_400
+
+
 def test_try_create_note_relation_without_auth(api):
     result = api.simulate_patch(NOTE_RELATION_URL)
 
@@ -0,0 +1,91 @@
+import pytest
+from redis import Redis
+from falcon.status_codes import (
+    HTTP_200,
+    HTTP_400,
+    HTTP_401,
+    HTTP_429,
+)
+
+from src.entrypoints.web.api.v1 import url
+from src.entrypoints.web.errors.base import HTTPRateLimitExceeded
+from tests.helpers.headers import Headers
+from tests.helpers.users import make_test_user
+from config import TestConfig
+
+CURRENT_USER_URL = url("/current-user")
+SIGN_IN_URL = url("/auth/sign-in")
+
+
+class RateLimitConfig(TestConfig):
+    is_rate_limit_enabled = True
+    rate_limit_user_requests = 3
+    rate_limit_ip_requests = 2
+
+
+class RouteRateLimitConfig(RateLimitConfig):
+    rate_limit_ip_requests = 100
+
+
+@pytest.fixture()
+def clean_rate_limits():
+    redis_ = Redis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+
+    # limits of the test client ip are left by previous runs
+    for key in redis_.scan_iter("rate_limit:*"):
+        redis_.delete(key)
+
+
+@pytest.fixture()
+def rate_limited_api(api_factory, clean_rate_limits):
+    return api_factory(config=RateLimitConfig)
+
+
+def test_anonymous_requests_are_limited_by_ip(rate_limited_api):
+    results = [rate_limited_api.simulate_get(CURRENT_USER_URL) for _ in range(3)]
+
+    assert [r.status for r in results] == [HTTP_401, HTTP_401, HTTP_429]
+    assert results[0].headers["X-RateLimit-Limit"] == "2"
+    assert results[0].headers["X-RateLimit-Remaining"] == "1"
+    assert results[2].json["error"]["code"] == HTTPRateLimitExceeded.code
+    assert int(results[2].headers["Retry-After"]) > 0
+
+
+def test_authenticated_requests_are_limited_by_user(
+        rate_limited_api,
+        db_session,
+        auth_session_factory,
+        headers: Headers,
+):
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    results = [rate_limited_api.simulate_get(CURRENT_USER_URL, headers=headers.get()) for _ in range(4)]
+
+    assert [r.status for r in results] == [HTTP_200, HTTP_200, HTTP_200, HTTP_429]
+    assert [r.headers["X-RateLimit-Remaining"] for r in results[:3]] == ["2", "1", "0"]
+
+
+def test_sign_in_is_limited_by_route(api_factory, clean_rate_limits, db_session):
+    api = api_factory(config=RouteRateLimitConfig)
+
+    user = make_test_user(db_session, password="querty123")
+    db_session.commit()
+
+    results = [
+        api.simulate_post(SIGN_IN_URL, json={"email": user.email.value, "password": "wrong password"})
+        for _ in range(11)
+    ]
+
+    assert [r.status for r in results] == [HTTP_400] * 10 + [HTTP_429]
+    # the route limit is closer to be exceeded than the ip one, its headers are sent
+    assert results[0].headers["X-RateLimit-Limit"] == "10"
+    assert results[0].headers["X-RateLimit-Remaining"] == "9"
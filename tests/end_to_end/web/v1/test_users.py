@@ -1,3 +1,4 @@
+import time
 from src.entrypoints.web.api.v1 import url
 from falcon.status_codes import (
     HTTP_200,
@@ -15,6 +16,9 @@ from src.repositories.users import SAUsersRepo
 from src.services.password_change import PasswordChangeTokenCreator
 from src.entrypoints.web.errors.user import HTTPPasswordChangingError
 from uuid import uuid4
+from redis import Redis
+from src.lib.principals_cache import INVALIDATIONS_CHANNEL, RedisPrincipalsCache
+from config import TestConfig
 
 CURRENT_USER_URL = url("/current-user")
 USER_CHANGE_PASSWORD_URL = url("/user/change-password")
@@ -22,6 +26,16 @@ USER_CHANGE_PASSWORD_REQUEST_URL = url("/user/change-password-request")
 CURRENT_USER_CHANGE_PASSWORD_URL = url("/current-user/change-password")
 
 
+class NoPrincipalsCacheConfig(TestConfig):
+    is_principals_cache_enabled = False
+
+
+class LongLocalPrincipalsCacheConfig(TestConfig):
+    # only the invalidation message drops the principal from the LRU of another app
+    is_principals_cache_enabled = True
+    principals_cache_local_ttl = 60.0
+
+
 def test_get_current_user_without_auth(api):
     result = api.simulate_get(CURRENT_USER_URL)
 
@@ -159,7 +173,7 @@ def test_try_change_password(
     assert event.email == user.email
 
 
-def test_try_get_current_user_with_wrong_credential_version(
+def test_try_get_current_user_after_password_change(
         api,
         db_session,
         auth_session_factory,
@@ -175,6 +189,100 @@ def test_try_get_current_user_with_wrong_credential_version(
 
     assert result.status_code == 200
 
+    # the password change revokes access tokens, its event drops the cached principal
+    token = PasswordChangeTokenCreator(
+        password_change_tokens_repo=SAPasswordChangeTokensRepo(db_session, encoder=TokenEncoder()),
+        encoder=TokenEncoder(),
+    ).make(user)
+
+    db_session.commit()
+
+    result = api.simulate_post(USER_CHANGE_PASSWORD_URL, params={"token": token}, json={"password": "new_pass"})
+
+    assert result.status == HTTP_200
+
+    result = api.simulate_get(CURRENT_USER_URL, headers=headers.get())
+
+    assert result.status == HTTP_401
+
+
+def test_try_get_current_user_of_another_app_after_password_change(
+        api_factory,
+        db_session,
+        auth_session_factory,
+        headers: Headers
+):
+    redis_ = Redis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+    subscribers = redis_.pubsub_numsub(INVALIDATIONS_CHANNEL)[0][1]
+
+    api, another_api = [api_factory(config=LongLocalPrincipalsCacheConfig) for _ in range(2)]
+
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    # the first request starts the invalidations listener of the app, the next one fills its LRU
+    for api_ in (api, another_api):
+        assert api_.simulate_get(CURRENT_USER_URL, headers=headers.get()).status_code == 200
+
+    deadline = time.monotonic() + 5
+
+    while redis_.pubsub_numsub(INVALIDATIONS_CHANNEL)[0][1] < subscribers + 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    for api_ in (api, another_api):
+        assert api_.simulate_get(CURRENT_USER_URL, headers=headers.get()).status_code == 200
+
+    token = PasswordChangeTokenCreator(
+        password_change_tokens_repo=SAPasswordChangeTokensRepo(db_session, encoder=TokenEncoder()),
+        encoder=TokenEncoder(),
+    ).make(user)
+
+    db_session.commit()
+
+    result = api.simulate_post(USER_CHANGE_PASSWORD_URL, params={"token": token}, json={"password": "new_pass"})
+
+    assert result.status == HTTP_200
+
+    deadline = time.monotonic() + 5
+
+    while time.monotonic() < deadline:
+        result = another_api.simulate_get(CURRENT_USER_URL, headers=headers.get())
+
+        if result.status == HTTP_401:
+            break
+
+        time.sleep(0.05)
+
+    assert result.status == HTTP_401
+
+
+def test_try_get_current_user_with_wrong_credential_version(
+        api_factory,
+        db_session,
+        auth_session_factory,
+        headers: Headers
+):
+    # without the principals cache every request reads the credential version from the database
+    api = api_factory(config=NoPrincipalsCacheConfig)
+
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(CURRENT_USER_URL, headers=headers.get())
+
+    assert result.status_code == 200
+
     user.credential_version = uuid4()
 
     db_session.commit()
@@ -184,6 +292,54 @@ def test_try_get_current_user_with_wrong_credential_version(
     assert result.status == HTTP_401
 
 
+def test_try_get_current_user_with_wrong_credential_version_from_principals_cache(
+        api_factory,
+        db_session,
+        auth_session_factory,
+        headers: Headers
+):
+    # the cached principal keeps the old credential version until it is invalidated
+    api = api_factory(config=TestConfig)
+
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    headers.set_bearer_token(auth_session.access_token)
+
+    result = api.simulate_get(CURRENT_USER_URL, headers=headers.get())
+
+    assert result.status_code == 200
+
+    user.credential_version = uuid4()
+
+    db_session.commit()
+
+    result = api.simulate_get(CURRENT_USER_URL, headers=headers.get())
+
+    assert result.status_code == 200
+
+    redis_ = Redis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+    RedisPrincipalsCache(redis_).invalidate(user.id)
+
+    deadline = time.monotonic() + 5
+
+    while time.monotonic() < deadline:
+        result = api.simulate_get(CURRENT_USER_URL, headers=headers.get())
+
+        if result.status == HTTP_401:
+            break
+
+        time.sleep(0.05)
+
+    assert result.status == HTTP_401
+
+
 def test_current_user_change_password_without_auth(api):
     result = api.simulate_post(CURRENT_USER_CHANGE_PASSWORD_URL)
 
@@ -9,11 +9,20 @@ from src.models.primitives.folder import (
 from uuid import uuid4
 
 
-def make_test_folder(db_session: Session, user: User, title: FolderTitle = None) -> Folder:
+def make_test_folder(
+        db_session: Session,
+        user: User,
+        title: FolderTitle = None,
+        parent: Folder = None,
+) -> Folder:
+    folder_id = uuid4()
+
     folder = Folder(
-        id=uuid4(),
+        id=folder_id,
         title=FolderTitle("Test folder") if title is None else title,
         color=FolderColor("#ffffff"),
+        parent=parent,
+        path=Folder.make_path(folder_id, parent),
         user=user,
     )
 
@@ -15,11 +15,13 @@ def make_test_note(
         user: User,
         folder: Folder = None,
         title: NoteTitle = None,
+        text: str = None,
 ) -> Note:
     note = Note(
         id=uuid4(),
         title=NoteTitle("Test note") if title is None else title,
         color=NoteColor("#ffffff"),
+        text=text,
         folder=folder,
         user=user,
     )
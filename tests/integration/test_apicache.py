@@ -0,0 +1,296 @@
+import time
+import falcon
+import pytest
+from falcon import testing
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from uuid import uuid4
+
+from src.entrypoints.web.lib.apicache import APICache, CacheMiddleware
+from src.entrypoints.web.lib.conditional import conditional
+from src.lib.apicache import APICacheStorage, AsyncAPICacheStorage, APICacheCounters, LocalAPICache
+from src.entrypoints.web.middleware import EncodeMiddleware
+from src.message_bus import events
+from src.message_bus.event_handlers.api_cache import APICacheInvalidator, AsyncAPICacheInvalidator
+from config import TestConfig
+
+
+class CountingRedis(Redis):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = []
+
+    def execute_command(self, *args, **options):
+        self.commands.append(args[0])
+        return super().execute_command(*args, **options)
+
+
+@pytest.fixture()
+def redis_() -> CountingRedis:
+    return CountingRedis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+
+
+@pytest.fixture()
+def api_cache_enabled():
+    APICache.enabled = True
+    yield
+    APICache.enabled = False
+
+
+class CachedResource:
+    calls = 0
+
+    @classmethod
+    @APICache.cached(timeout=60, tags_templates=["cached:{id}"])
+    def on_get(cls, req, resp):
+        cls.calls += 1
+        resp.text = {"calls": cls.calls}
+
+
+class ModifiedResource:
+    @classmethod
+    @conditional()
+    @APICache.cached(timeout=60, tags_templates=["modified:{id}"], last_modified=True)
+    def on_get(cls, req, resp):
+        resp.text = {"id": req.params["id"]}
+
+
+def _make_client(storage: APICacheStorage) -> testing.TestClient:
+    app = falcon.App(middleware=[CacheMiddleware(storage), EncodeMiddleware()])
+    app.add_route("/cached", CachedResource)
+    app.add_route("/modified", ModifiedResource)
+
+    return testing.TestClient(app)
+
+
+def test_cache_lookup_counts_in_one_round_trip(redis_, api_cache_enabled):
+    storage = APICacheStorage(redis_)
+    client = _make_client(storage)
+    url = f"/cached?id={uuid4()}"
+
+    before = storage.get_counters()
+
+    assert client.simulate_get(url).headers[APICache.CACHE_HEADER] == "Miss"
+
+    redis_.commands.clear()
+
+    result = client.simulate_get(url)
+
+    assert result.headers[APICache.CACHE_HEADER] == "Hit"
+    assert result.json == {"calls": CachedResource.calls}
+    assert redis_.commands == ["EVALSHA"]
+
+    after = storage.get_counters()
+
+    assert after["hit"] == before["hit"] + 1
+    assert after["miss"] == before["miss"] + 1
+    assert redis_.ttl("API_CACHE:HIT_COUNTERS") > 0
+
+
+def test_last_modified_is_cached_with_response(redis_, api_cache_enabled):
+    storage = APICacheStorage(redis_)
+    client = _make_client(storage)
+    id_ = uuid4()
+    url = f"/modified?id={id_}"
+
+    redis_.set(f"API_CACHE:MODIFIED:modified:{id_}", int((time.time() - 60) * 1000))
+
+    result = client.simulate_get(url)
+    last_modified = result.headers["Last-Modified"]
+
+    assert result.headers[APICache.CACHE_HEADER] == "Miss"
+
+    redis_.commands.clear()
+
+    result = client.simulate_get(url, headers={"If-Modified-Since": last_modified})
+
+    # the cache lookup is the only round trip, Last-Modified comes from the cached response
+    assert result.status == falcon.HTTP_304
+    assert result.headers["Last-Modified"] == last_modified
+    assert redis_.commands == ["EVALSHA"]
+
+    storage.delete_by_tags([f"modified:{id_}"])
+    time.sleep(1)
+
+    result = client.simulate_get(url, headers={"If-Modified-Since": last_modified})
+
+    assert result.status == falcon.HTTP_200
+    assert result.headers["Last-Modified"] != last_modified
+
+
+def _count_hits(redis_: Redis, url: str) -> int:
+    counters = redis_.hgetall("API_CACHE:HIT_COUNTERS")
+
+    return sum(int(count) for key, count in counters.items() if url in key.decode())
+
+
+def test_aggregated_counters_are_flushed_in_one_pipeline(redis_, api_cache_enabled):
+    # the background thread would flush in an hour, the test flushes by hand
+    counters = APICacheCounters(redis_, flush_interval=3600)
+    storage = APICacheStorage(redis_, counters=counters)
+    client = _make_client(storage)
+    url = f"/cached?id={uuid4()}"
+
+    client.simulate_get(url)
+    redis_.commands.clear()
+
+    for _ in range(3):
+        assert client.simulate_get(url).headers[APICache.CACHE_HEADER] == "Hit"
+
+    assert redis_.commands == ["GET"] * 3
+    assert _count_hits(redis_, url) == 0
+
+    counters.close()
+
+    assert _count_hits(redis_, url) == 3
+
+
+def test_event_drops_cached_responses_by_tags(redis_, api_cache_enabled):
+    storage = APICacheStorage(redis_)
+    client = _make_client(storage)
+    id_, another_id = uuid4(), uuid4()
+
+    for _ in range(2):
+        client.simulate_get(f"/cached?id={id_}")
+        client.simulate_get(f"/cached?id={id_}&page=2")
+        client.simulate_get(f"/cached?id={another_id}")
+
+    invalidator = APICacheInvalidator(storage, tags={events.NoteUpdated: ["cached:{id}"]})
+    invalidator.handle(events.NoteUpdated(id=id_, updated_fields={}, user_id=uuid4()), context={})
+
+    assert client.simulate_get(f"/cached?id={id_}").headers[APICache.CACHE_HEADER] == "Miss"
+    assert client.simulate_get(f"/cached?id={id_}&page=2").headers[APICache.CACHE_HEADER] == "Miss"
+    assert client.simulate_get(f"/cached?id={another_id}").headers[APICache.CACHE_HEADER] == "Hit"
+
+    # the tag set is removed with the responses
+    assert storage.delete_by_tags([f"cached:{uuid4()}"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_event_drops_responses_cached_by_wsgi_app(redis_, api_cache_enabled):
+    storage = APICacheStorage(redis_)
+    client = _make_client(storage)
+    id_ = uuid4()
+
+    for _ in range(2):
+        client.simulate_get(f"/cached?id={id_}")
+
+    async_redis = AsyncRedis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+    invalidator = AsyncAPICacheInvalidator(
+        AsyncAPICacheStorage(async_redis),
+        tags={events.NoteUpdated: ["cached:{id}"]},
+    )
+
+    try:
+        await invalidator.handle(events.NoteUpdated(id=id_, updated_fields={}, user_id=uuid4()), context={})
+    finally:
+        await async_redis.close()
+
+    assert client.simulate_get(f"/cached?id={id_}").headers[APICache.CACHE_HEADER] == "Miss"
+
+
+def test_local_cache_is_bounded_by_bytes_and_ttl():
+    cache = LocalAPICache(max_bytes=10, ttl=0.05)
+
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get_stats()["bytes"] == 8
+
+    cache.set("too large", b"12345678901")
+
+    assert cache.get("too large") is None
+
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+
+
+def test_local_cache_is_not_filled_with_response_invalidated_during_lookup(redis_):
+    storage = APICacheStorage(redis_, local_cache=LocalAPICache())
+    key = f"cached:{uuid4()}"
+    lookup = storage._get
+
+    def lookup_racing_invalidation(key_):
+        data = lookup(key_)
+        # the invalidation message is applied by the listener thread while the response is on its way
+        storage._local_cache.delete([key_])
+        return data
+
+    try:
+        assert storage._listener.wait_subscribed(timeout=5)
+
+        storage._redis.set(key, b"stale", ex=60)
+        storage._get = lookup_racing_invalidation
+
+        assert storage.get(key) == b"stale"
+        assert storage._local_cache.get(key) is None
+
+        storage._get = lookup
+
+        assert storage.get(key) == b"stale"
+        assert storage._local_cache.get(key) == b"stale"
+    finally:
+        redis_.delete(key)
+        storage.close()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+
+        time.sleep(0.01)
+
+    return True
+
+
+def test_local_caches_of_workers_are_invalidated_through_pubsub(redis_, api_cache_enabled):
+    # two worker processes with their own local caches in front of one redis
+    storages = [APICacheStorage(redis_, local_cache=LocalAPICache()) for _ in range(2)]
+    clients = [_make_client(storage) for storage in storages]
+    url = f"/cached?id={uuid4()}"
+
+    try:
+        for storage in storages:
+            assert storage._listener.wait_subscribed(timeout=5)
+
+        clients[0].simulate_get(url)
+        clients[1].simulate_get(url)
+
+        redis_.commands.clear()
+
+        for client in clients:
+            assert client.simulate_get(url).headers[APICache.CACHE_HEADER] == "Hit"
+
+        assert redis_.commands == []
+
+        stats = storages[1].get_stats()
+
+        assert stats["local"]["hit"] == 1
+        assert stats["local"]["hit_rate"] == 0.5
+        assert stats["redis"]["hit"] >= 1
+
+        storages[0].delete_by_tags([f"cached:{url.split('=')[1]}"])
+
+        assert _wait_for(lambda: storages[1].get_stats()["local"]["entries"] == 0)
+        assert clients[1].simulate_get(url).headers[APICache.CACHE_HEADER] == "Miss"
+    finally:
+        for storage in storages:
+            storage.close()
@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from src.entrypoints.web.middleware.db_session import SADBSessionMiddleware
+from src.models.meta import scoped_session_factory, get_engine
+from config import TestConfig
+
+
+def test_db_session_is_scoped_to_request():
+    registry = scoped_session_factory(TestConfig)
+    middleware = SADBSessionMiddleware(registry)
+
+    def handle_request(_):
+        req = SimpleNamespace(context={})
+        middleware.process_request(req, None)
+
+        session = req.context["db_session"]
+        # the same session is returned within the request
+        assert registry() is session
+
+        middleware.process_response(req, None, None, True)
+
+        return id(session)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        sessions = list(executor.map(handle_request, range(4)))
+
+    assert len(set(sessions)) == 4
+    assert not registry.registry.has()
+
+
+def test_engine_is_shared_and_pooled():
+    engine = get_engine(TestConfig)
+
+    assert get_engine(TestConfig) is engine
+    assert engine.pool.size() == TestConfig.db_pool_size
+    assert engine.pool._pre_ping is TestConfig.db_pool_pre_ping
@@ -0,0 +1,101 @@
+import threading
+from dataclasses import dataclass
+from uuid import uuid4, UUID
+from sqlalchemy.orm import sessionmaker
+
+from src.message_bus import events
+from src.message_bus.event_handlers.events_loger import EventsLogger, make_event_log_row
+from src.message_bus.event_handlers.events_log_writer import EventsLogWriter
+from src.models.event_log import EventLog
+from src.repositories.events_log import SAEventsLogRepo
+from tests.helpers.queries import count_queries
+
+
+@dataclass
+class SomeEvent(events.Event):
+    id: UUID
+
+
+@dataclass
+class SecretEvent(events.Event):
+    id: UUID
+    token: str
+
+
+def _count_logs(db_session, object_ids) -> int:
+    return db_session.query(EventLog).filter(EventLog.object_id.in_(object_ids)).count()
+
+
+def test_events_log_row_hides_secrets():
+    event = SecretEvent(id=uuid4(), token="secret token")
+
+    row = make_event_log_row(event, user_id=event.id)
+
+    assert "secret token" not in row["event"]
+    assert row["object_id"] == event.id
+    assert event.token == "secret token"
+
+
+def test_events_log_writer_writes_batches(db_engine, db_session):
+    writer = EventsLogWriter(sessionmaker(db_engine), batch_size=10, flush_interval=0.05)
+    logger = EventsLogger(SAEventsLogRepo, writer=writer)
+
+    ids = [uuid4() for _ in range(25)]
+
+    with count_queries(db_engine) as statements:
+        for id_ in ids:
+            logger.handle(SomeEvent(id=id_), context={})
+
+        writer.flush()
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO events_log")]
+    assert 3 <= len(inserts) < len(ids)
+    assert _count_logs(db_session, [str(id_) for id_ in ids]) == len(ids)
+
+    writer.close()
+
+
+def test_events_log_writer_flushes_on_close(db_engine, db_session):
+    writer = EventsLogWriter(sessionmaker(db_engine), batch_size=1000, flush_interval=60)
+
+    ids = [uuid4() for _ in range(5)]
+
+    for id_ in ids:
+        writer.put(make_event_log_row(SomeEvent(id=id_)))
+
+    writer.close()
+
+    assert _count_logs(db_session, [str(id_) for id_ in ids]) == len(ids)
+
+
+def test_events_log_writer_falls_back_to_sync_write_when_full(db_engine, db_session):
+    db_sessionmaker = sessionmaker(db_engine)
+    release = threading.Event()
+
+    def blocking_sessionmaker():
+        # keeps the writer thread busy with the first row
+        if threading.current_thread().name == "events-log-writer":
+            release.wait(timeout=5)
+
+        return db_sessionmaker()
+
+    writer = EventsLogWriter(
+        blocking_sessionmaker,
+        max_queue_size=1,
+        batch_size=1,
+        flush_interval=60,
+        put_timeout=0.1,
+    )
+
+    ids = [uuid4() for _ in range(5)]
+
+    for id_ in ids:
+        writer.put(make_event_log_row(SomeEvent(id=id_)))
+
+    # one row is being written by the thread, one waits in the queue, the rest are written by the caller
+    assert _count_logs(db_session, [str(id_) for id_ in ids]) == len(ids) - 2
+
+    release.set()
+    writer.close()
+
+    assert _count_logs(db_session, [str(id_) for id_ in ids]) == len(ids)
@@ -1,5 +1,15 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from src.models.folder import Folder, FolderColor, FolderTitle
+from src.repositories.folders import SAFoldersRepo, AsyncSAFoldersRepo
+from src.schemas.folder import FolderDumpSchema, FolderDetailDumpSchema
 from tests.helpers.users import make_test_user
+from tests.helpers.folders import make_test_folder
+from tests.helpers.notes import make_test_note
+from tests.helpers.queries import count_queries
+
+from config import TestConfig
 
 from uuid import uuid4
 
@@ -7,16 +17,20 @@ from uuid import uuid4
 def test_folder_model(db_session):
     user = make_test_user(db_session)
 
+    parent_folder_id = uuid4()
     parent_folder = Folder(
-        id=uuid4(),
+        id=parent_folder_id,
         title=FolderTitle("Test parent folder"),
+        path=Folder.make_path(parent_folder_id),
         color=FolderColor("#fff333"),
         user=user,
     )
 
+    child_folder_id = uuid4()
     child_folder = Folder(
-        id=uuid4(),
+        id=child_folder_id,
         title=FolderTitle("Test child folder"),
+        path=Folder.make_path(child_folder_id, parent_folder),
         color=FolderColor("#fff333"),
         parent_id=parent_folder.id,
         user=user,
@@ -32,3 +46,86 @@ def test_folder_model(db_session):
     assert child_folder.parent_id == parent_folder.id
     assert len(parent_folder.children_folders) == 1
     assert parent_folder.children_folders[0] == child_folder
+
+
+def test_folders_loading_profiles_queries_count(db_engine, db_session):
+    user = make_test_user(db_session)
+
+    for i in range(10):
+        folder = make_test_folder(db_session, user)
+        child_folder = make_test_folder(db_session, user, parent=folder)
+        make_test_folder(db_session, user, parent=child_folder)
+
+    db_session.commit()
+
+    user_id, folder_id = user.id, folder.id
+    db_session.expire_all()
+
+    folders_repo = SAFoldersRepo(db_session)
+
+    with count_queries(db_engine) as statements:
+        folders = folders_repo.list(user_id=user_id, profile="list_view")
+        FolderDumpSchema(many=True).dump(folders)
+
+    assert len(folders) == 10
+    assert len(statements) == 2
+
+    db_session.expire_all()
+
+    with count_queries(db_engine) as statements:
+        folder = folders_repo.get(folder_id, user_id=user_id, profile="detail_view")
+        FolderDetailDumpSchema().dump(folder)
+
+    assert len(statements) == 3
+
+
+def test_folder_subtree_notes(db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+    sibling_folder = make_test_folder(db_session, user)
+
+    note = make_test_note(db_session, user, folder=folder)
+    child_note = make_test_note(db_session, user, folder=child_folder)
+    make_test_note(db_session, user, folder=sibling_folder)
+    make_test_note(db_session, user)
+
+    db_session.commit()
+
+    folders_repo = SAFoldersRepo(db_session)
+
+    assert folders_repo.get_subtree(folder) == [folder, child_folder]
+    assert {n.id for n in folders_repo.get_subtree_notes(folder)} == {note.id, child_note.id}
+    assert [n.id for n in folders_repo.get_subtree_notes(child_folder)] == [child_note.id]
+
+
+@pytest.mark.asyncio
+async def test_async_folders_repo_subtree(db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+    child_note = make_test_note(db_session, user, folder=child_folder)
+
+    db_session.commit()
+
+    engine = create_async_engine(TestConfig.async_db_uri)
+
+    try:
+        async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as async_session:
+            folders_repo = AsyncSAFoldersRepo(async_session)
+
+            async_folder = await folders_repo.get(id_=folder.id, user_id=user.id, profile="detail_view")
+
+            assert [f.id for f in async_folder.children_folders] == [child_folder.id]
+            assert [f.id for f in await folders_repo.get_subtree(async_folder)] == [folder.id, child_folder.id]
+
+            assert await folders_repo.remove_subtree(async_folder) == (2, 1)
+
+            await async_session.commit()
+    finally:
+        await engine.dispose()
+
+    db_session.expire_all()
+
+    assert child_folder.deleted is not None
+    assert child_note.deleted == child_folder.deleted
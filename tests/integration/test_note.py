@@ -1,5 +1,10 @@
 from src.models.note import Note, NoteColor, NoteTitle, NoteToNoteRelation
+from src.repositories.notes import SANotesRepo
+from src.schemas.note import NoteDumpSchema, NoteDetailDumpSchema
 from tests.helpers.users import make_test_user
+from tests.helpers.folders import make_test_folder
+from tests.helpers.notes import make_test_note
+from tests.helpers.queries import count_queries
 from uuid import uuid4
 
 
@@ -35,3 +40,37 @@ def test_note_model(db_session):
 
     assert len(original_note.notes_relations) == 1
     assert original_note.notes_relations[0].child_note == related_note
+
+
+def test_notes_loading_profiles_queries_count(db_engine, db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+
+    for i in range(10):
+        note = make_test_note(db_session, user, folder=folder)
+        child_note = make_test_note(db_session, user, folder=folder)
+
+        note.notes_relations.append(NoteToNoteRelation(id=uuid4(), child_note=child_note))
+        child_note.notes_relations.append(NoteToNoteRelation(id=uuid4(), child_note=note))
+
+    db_session.commit()
+
+    user_id, note_id = user.id, note.id
+    db_session.expire_all()
+
+    notes_repo = SANotesRepo(db_session)
+
+    with count_queries(db_engine) as statements:
+        notes = notes_repo.list(user_id=user_id, profile="list_view")
+        NoteDumpSchema(many=True).dump(notes)
+
+    assert len(notes) == 20
+    assert len(statements) == 2
+
+    db_session.expire_all()
+
+    with count_queries(db_engine) as statements:
+        note = notes_repo.get(note_id, user_id=user_id, profile="detail_view")
+        NoteDetailDumpSchema().dump(note)
+
+    assert len(statements) == 3
@@ -0,0 +1,162 @@
+import datetime as dt
+from typing import List
+from sqlalchemy.orm import sessionmaker
+
+from src.message_bus import EventsPublisherABC, events
+from src.message_bus.factory import default_events_handlers
+from src.message_bus.outbox_relay import OutboxRelay
+from src.models.outbox import OutboxMessage
+from src.models.primitives.note import NoteTitle
+from src.repositories.notes import SANotesRepo
+from src.repositories.outbox import SAOutboxRepo
+from src.services.notes.creator import NoteCreator, NoteCreationInput
+from tests.helpers.users import make_test_user
+from uuid import uuid4
+from config import TestConfig
+
+
+class FakeEventsPublisher(EventsPublisherABC):
+    def __init__(self):
+        self.events = []
+        self.batches = []
+
+    def publish(self, events_: List[events.Event], **kwargs):
+        self.events.extend(events_)
+        self.batches.append((events_, kwargs))
+
+
+def _pending_count(db_session) -> int:
+    return db_session.query(OutboxMessage).filter(OutboxMessage.processed.is_(None)).count()
+
+
+def test_outbox_is_written_in_service_transaction(db_session):
+    user = make_test_user(db_session)
+    db_session.commit()
+
+    creator = NoteCreator(notes_repo=SANotesRepo(db_session), outbox_repo=SAOutboxRepo(db_session))
+    creator.create(NoteCreationInput(title=NoteTitle("Rolled back")), user_id=user.id)
+
+    db_session.rollback()
+
+    assert _pending_count(db_session) == 0
+
+    creator = NoteCreator(notes_repo=SANotesRepo(db_session), outbox_repo=SAOutboxRepo(db_session))
+    note = creator.create(NoteCreationInput(title=NoteTitle("Committed")), user_id=user.id)
+
+    db_session.commit()
+
+    message = db_session.query(OutboxMessage).filter(OutboxMessage.processed.is_(None)).one()
+    assert message.event_type == "NoteCreated"
+    assert message.payload["id"] == str(note.id)
+
+
+def test_outbox_relay(db_engine, db_session):
+    user = make_test_user(db_session)
+    outbox_repo = SAOutboxRepo(db_session)
+
+    for _ in range(5):
+        outbox_repo.add(events.NoteCreated(id=user.id, user_id=user.id))
+
+    outbox_repo.add(events.UserPasswordChanged(id=user.id, email=user.email))
+
+    db_session.commit()
+
+    publisher = FakeEventsPublisher()
+    relay = OutboxRelay(
+        db_sessionmaker=sessionmaker(db_engine),
+        publisher=publisher,
+        event_handlers=default_events_handlers(TestConfig),
+        batch_size=4,
+    )
+
+    relayed = relay.relay_batch() + relay.relay_batch() + relay.relay_batch()
+
+    assert relayed == 7
+    assert _pending_count(db_session) == 0
+
+    # only events with asynchronous handlers are published
+    assert publisher.events == [events.UserPasswordChanged(id=user.id, email=user.email)]
+
+
+def test_outbox_claim_skips_locked_rows(db_engine, db_session):
+    user = make_test_user(db_session)
+    outbox_repo = SAOutboxRepo(db_session)
+
+    for _ in range(4):
+        outbox_repo.add(events.NoteCreated(id=user.id, user_id=user.id))
+
+    db_session.commit()
+
+    first_session = sessionmaker(db_engine)()
+    second_session = sessionmaker(db_engine)()
+
+    try:
+        first_claimed = SAOutboxRepo(first_session).claim(3)
+        second_claimed = SAOutboxRepo(second_session).claim(3)
+
+        assert len(first_claimed) == 3
+        assert len(second_claimed) == 1
+        assert not {m.id for m in first_claimed} & {m.id for m in second_claimed}
+    finally:
+        first_session.rollback()
+        second_session.rollback()
+        first_session.close()
+        second_session.close()
+
+
+def test_outbox_relay_passes_handler_kwargs(db_engine, db_session):
+    user = make_test_user(db_session)
+    outbox_repo = SAOutboxRepo(db_session)
+
+    outbox_repo.add(events.UserPasswordChanged(id=user.id, email=user.email))
+    outbox_repo.with_handler_kwargs(user_id=user.id, object_id=user.id).add(
+        events.UserPasswordChanged(id=user.id, email=user.email),
+    )
+
+    db_session.commit()
+
+    publisher = FakeEventsPublisher()
+    relay = OutboxRelay(
+        db_sessionmaker=sessionmaker(db_engine),
+        publisher=publisher,
+        event_handlers=default_events_handlers(TestConfig),
+    )
+
+    relay.relay_batch()
+
+    event = events.UserPasswordChanged(id=user.id, email=user.email)
+
+    assert publisher.batches[-2:] == [
+        ([event], {}),
+        ([event], {"user_id": str(user.id), "object_id": str(user.id)}),
+    ]
+
+
+def test_outbox_relay_purges_old_processed_messages(db_engine, db_session):
+    user = make_test_user(db_session)
+    now = dt.datetime.utcnow()
+
+    payload = events.NoteCreated(id=user.id, user_id=user.id).serialize()
+    messages = [
+        OutboxMessage(id=uuid4(), event_type="NoteCreated", payload=payload, processed=processed)
+        for processed in (now - dt.timedelta(hours=2), now, None)
+    ]
+    old_id, recent_id, pending_id = [message.id for message in messages]
+
+    db_session.add_all(messages)
+    db_session.commit()
+
+    relay = OutboxRelay(
+        db_sessionmaker=sessionmaker(db_engine),
+        publisher=FakeEventsPublisher(),
+        event_handlers=default_events_handlers(TestConfig),
+        batch_size=1,
+        retention=dt.timedelta(hours=1),
+    )
+
+    assert relay.purge() >= 1
+
+    db_session.expire_all()
+    remaining = db_session.query(OutboxMessage.id).filter(OutboxMessage.id.in_([old_id, recent_id, pending_id]))
+
+    assert {id_ for id_, in remaining} == {recent_id, pending_id}
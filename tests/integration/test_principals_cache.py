@@ -0,0 +1,173 @@
+import time
+import pytest
+from redis import Redis
+from src.entrypoints.web.errors.base import HTTPUnauthorized
+
+from src.entrypoints.web.middleware.auth_middleware import AuthMiddleware
+from src.lib.jwt import JWTToken
+from src.lib.principals_cache import (
+    Principal,
+    LocalPrincipalsCache,
+    RedisPrincipalsCache,
+)
+from src.message_bus import events
+from src.message_bus.event_handlers.principals_cache import PrincipalsCacheInvalidator
+from src.repositories.users import SAUsersRepo
+from src.services.auth import revoke_access_tokens
+from tests.helpers.users import make_test_user
+from tests.helpers.queries import count_queries
+from config import TestConfig
+
+
+def _make_redis() -> Redis:
+    return Redis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+
+
+def test_principal_is_shared_through_redis(db_session):
+    user = make_test_user(db_session)
+    db_session.commit()
+
+    principal = Principal.from_user(user)
+    cache = RedisPrincipalsCache(_make_redis())
+
+    cache.set(principal, cache.get_version(user.id))
+
+    # another worker process has its own LRU and reads the principal from redis
+    cache = RedisPrincipalsCache(_make_redis())
+
+    assert cache.get(user.id) == principal
+
+    cache.invalidate(user.id)
+
+    assert RedisPrincipalsCache(_make_redis()).get(user.id) is None
+
+
+def test_local_cache_evicts_least_recently_used_and_expired(db_session):
+    principals = [Principal.from_user(make_test_user(db_session)) for _ in range(3)]
+
+    cache = LocalPrincipalsCache(max_size=2, ttl=0.05)
+
+    cache.set(principals[0])
+    cache.set(principals[1])
+    cache.get(principals[0].id)
+    cache.set(principals[2])
+
+    assert cache.get(principals[1].id) is None
+    assert cache.get(principals[0].id) == principals[0]
+
+    time.sleep(0.06)
+
+    assert cache.get(principals[0].id) is None
+
+
+def test_unavailable_redis_is_a_cache_miss(db_session):
+    principal = Principal.from_user(make_test_user(db_session))
+
+    cache = RedisPrincipalsCache(Redis(port=1, socket_connect_timeout=0.1))
+
+    assert cache.get_version(principal.id) is None
+
+    cache.set(principal, "0")
+
+    assert cache.get(principal.id) is None
+
+
+def test_principal_loaded_before_invalidation_is_not_cached(db_session):
+    user = make_test_user(db_session)
+    db_session.commit()
+
+    cache = RedisPrincipalsCache(_make_redis())
+
+    # the request reads the version and the user, the password change commits and invalidates in between
+    version = cache.get_version(user.id)
+    principal = Principal.from_user(user)
+    cache.invalidate(user.id)
+
+    cache.set(principal, version)
+
+    assert cache.get(user.id) is None
+
+    cache.set(principal, cache.get_version(user.id))
+
+    assert cache.get(user.id) == principal
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+
+        time.sleep(0.01)
+
+    return False
+
+
+def test_local_caches_of_workers_are_invalidated_through_pubsub(db_session):
+    user = make_test_user(db_session)
+    db_session.commit()
+
+    principal = Principal.from_user(user)
+    caches = [RedisPrincipalsCache(_make_redis(), local_cache=LocalPrincipalsCache(ttl=60)) for _ in range(2)]
+
+    try:
+        for cache in caches:
+            assert cache._listener.wait_subscribed(timeout=5)
+
+        caches[0].set(principal, caches[0].get_version(user.id))
+
+        # the second worker keeps the principal in its LRU
+        assert caches[1].get(user.id) == principal
+        assert caches[1]._local_cache.get(user.id) == principal
+
+        caches[0].invalidate(user.id)
+
+        assert _wait_for(lambda: caches[1]._local_cache.get(user.id) is None)
+        assert caches[1].get(user.id) is None
+    finally:
+        for cache in caches:
+            cache.close()
+
+
+def test_bearer_auth_skips_database_for_cached_principal(db_engine, db_session, auth_session_factory):
+    user = make_test_user(db_session)
+    auth_session = auth_session_factory(db_session, user)
+    db_session.commit()
+
+    principals_cache = RedisPrincipalsCache(_make_redis())
+    auth_middleware = AuthMiddleware(lambda: db_session, TestConfig, principals_cache)
+    users_repo = SAUsersRepo(db_session)
+
+    assert auth_middleware._bearer_auth(auth_session.access_token, users_repo).id == user.id
+
+    with count_queries(db_engine) as statements:
+        current_user = auth_middleware._bearer_auth(auth_session.access_token, users_repo)
+
+    assert current_user == Principal.from_user(user)
+    assert statements == []
+
+    # the password change revokes the tokens and its event drops the cached principal
+    revoke_access_tokens(user)
+    db_session.commit()
+
+    PrincipalsCacheInvalidator(principals_cache).handle(
+        events.UserPasswordChanged(id=user.id, email=user.email),
+        context={},
+    )
+
+    with pytest.raises(HTTPUnauthorized):
+        auth_middleware._bearer_auth(auth_session.access_token, users_repo)
+
+    new_token = JWTToken.create({
+        "object_id": str(user.id),
+        "credential_version": str(user.credential_version),
+        "exp": time.time() + 60,
+    }, TestConfig.jwt_secret)
+
+    assert auth_middleware._bearer_auth(new_token, users_repo).credential_version == user.credential_version
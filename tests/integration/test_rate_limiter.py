@@ -0,0 +1,60 @@
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from redis import Redis
+from uuid import uuid4
+
+from src.lib.rate_limiter import RedisTokenBucketRateLimiter, RedisSlidingWindowRateLimiter
+from config import TestConfig
+
+
+@pytest.fixture()
+def redis_() -> Redis:
+    return Redis(
+        host=TestConfig.redis_host,
+        port=TestConfig.redis_port,
+        db=TestConfig.redis_db,
+        password=TestConfig.redis_password,
+    )
+
+
+def test_token_bucket_allows_burst_and_refills(redis_):
+    limiter = RedisTokenBucketRateLimiter(redis_)
+    key = str(uuid4())
+
+    results = [limiter.hit(key, limit=4, interval=1) for _ in range(5)]
+
+    assert [r.allowed for r in results] == [True, True, True, True, False]
+    assert [r.remaining for r in results] == [3, 2, 1, 0, 0]
+    assert 0 < results[-1].retry_after <= 0.25
+
+    # a token comes back every 0.25 s
+    time.sleep(results[-1].retry_after)
+
+    assert limiter.hit(key, limit=4, interval=1).allowed
+    assert not limiter.hit(key, limit=4, interval=1).allowed
+
+
+def test_sliding_window_counts_requests_of_interval(redis_):
+    limiter = RedisSlidingWindowRateLimiter(redis_)
+    key = str(uuid4())
+
+    results = [limiter.hit(key, limit=3, interval=0.5) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert 0 < results[-1].retry_after <= 0.5
+
+    time.sleep(results[-1].retry_after)
+
+    assert limiter.hit(key, limit=3, interval=0.5).allowed
+
+
+@pytest.mark.parametrize("limiter_class", [RedisTokenBucketRateLimiter, RedisSlidingWindowRateLimiter])
+def test_concurrent_hits_do_not_exceed_limit(redis_, limiter_class):
+    limiter = limiter_class(redis_)
+    key = str(uuid4())
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(lambda _: limiter.hit(key, limit=20, interval=60), range(100)))
+
+    assert sum(r.allowed for r in results) == 20
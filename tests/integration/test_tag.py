@@ -10,9 +10,11 @@ from uuid import uuid4
 def test_folder_tag(db_session):
     user = make_test_user(db_session)
 
+    folder_id = uuid4()
     folder = Folder(
-        id=uuid4(),
+        id=folder_id,
         title=FolderTitle("test folder"),
+        path=Folder.make_path(folder_id),
         user=user,
     )
 
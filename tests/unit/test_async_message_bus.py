@@ -0,0 +1,218 @@
+import time
+import asyncio
+import pytest
+from dataclasses import dataclass
+from uuid import uuid4, UUID
+
+from src.message_bus import AsyncMessageBus, events, commands
+from src.message_bus.event_handlers.base import EventHandlerABC
+
+
+@dataclass
+class SomeEvent(events.Event):
+    id: UUID
+
+
+@dataclass
+class EmittedEvent(events.Event):
+    id: UUID
+
+
+@dataclass
+class SomeCommand(commands.Command):
+    id: UUID
+
+
+class FakeSession:
+    def __init__(self, sessions: list):
+        self.closed = False
+        sessions.append(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed = True
+
+
+class EmittingHandler(EventHandlerABC):
+    async def handle(self, event, context, *args, **kwargs):
+        self.emmit_message(EmittedEvent(id=event.id))
+
+    def _handle(self, event, context, *args, **kwargs):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_event_handlers_run_concurrently():
+    async def handler(event, context, *args, **kwargs):
+        await asyncio.sleep(0.1)
+        return kwargs["user_id"]
+
+    message_bus = AsyncMessageBus(event_handlers={SomeEvent: [handler, handler, handler]})
+    user_id = uuid4()
+
+    started = time.perf_counter()
+    results = await message_bus.batch_handle([SomeEvent(id=uuid4()), SomeEvent(id=uuid4())], user_id=user_id)
+
+    assert time.perf_counter() - started < 0.2
+    assert [result["result"] for result in results] == [user_id] * 6
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited():
+    running = []
+    max_running = []
+
+    async def handler(event, context, *args, **kwargs):
+        running.append(event)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(event)
+
+    message_bus = AsyncMessageBus(event_handlers={SomeEvent: [handler]}, max_concurrency=2)
+
+    await message_bus.batch_handle([SomeEvent(id=uuid4()) for _ in range(10)])
+
+    assert max(max_running) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_and_hanging_handlers_are_isolated():
+    handled = []
+
+    async def failing_handler(event, context, *args, **kwargs):
+        raise ValueError("handler error")
+
+    async def hanging_handler(event, context, *args, **kwargs):
+        await asyncio.sleep(10)
+
+    async def handler(event, context, *args, **kwargs):
+        handled.append(event)
+
+    message_bus = AsyncMessageBus(
+        event_handlers={SomeEvent: [failing_handler, hanging_handler, handler]},
+        handler_timeout=0.05,
+    )
+    event = SomeEvent(id=uuid4())
+
+    results = await message_bus.handle(event)
+
+    assert handled == [event]
+    assert isinstance(results[0]["error"], ValueError)
+    assert isinstance(results[1]["error"], asyncio.TimeoutError)
+    assert "error" not in results[2]
+
+
+@pytest.mark.asyncio
+async def test_every_handler_gets_its_own_session():
+    sessions = []
+    handler_sessions = []
+
+    async def handler(event, context, *args, **kwargs):
+        handler_sessions.append(context["db_session"])
+        await asyncio.sleep(0)
+        assert not context["db_session"].closed
+
+    message_bus = AsyncMessageBus(event_handlers={SomeEvent: [handler, handler]})
+    message_bus.context["db_sessionmaker"] = lambda: FakeSession(sessions)
+
+    await message_bus.handle(SomeEvent(id=uuid4()))
+
+    assert len(set(map(id, handler_sessions))) == 2
+    assert all(session.closed for session in sessions)
+
+
+@pytest.mark.asyncio
+async def test_commands_are_awaited_and_emitted_messages_handled():
+    handled = []
+
+    async def command_handler(cmd, context, *args, **kwargs):
+        await asyncio.sleep(0)
+        return cmd.id
+
+    def sync_handler(event, context, *args, **kwargs):
+        handled.append(event)
+
+    message_bus = AsyncMessageBus(
+        event_handlers={
+            SomeEvent: [EmittingHandler()],
+            EmittedEvent: [sync_handler],
+        },
+        command_handlers={SomeCommand: command_handler},
+    )
+    id_ = uuid4()
+
+    results = await message_bus.batch_handle([SomeCommand(id=id_), SomeEvent(id=id_)])
+
+    assert results[0]["result"] == id_
+    # synchronous handlers run in a worker thread
+    assert handled == [EmittedEvent(id=id_)]
+
+
+class SlowEmittingHandler(EventHandlerABC):
+    async def handle(self, event, context, *args, **kwargs):
+        self.emmit_message(EmittedEvent(id=event.id))
+        await asyncio.sleep(0.01)
+
+    def _handle(self, event, context, *args, **kwargs):
+        pass
+
+
+class SyncEmittingHandler(EventHandlerABC):
+    def _handle(self, event, context, *args, **kwargs):
+        self.emmit_message(EmittedEvent(id=event.id))
+        time.sleep(0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("emitting_handler", [SlowEmittingHandler(), SyncEmittingHandler()])
+async def test_messages_emitted_by_concurrent_calls_of_handler_are_kept_apart(emitting_handler):
+    async def handler(event, context, *args, **kwargs):
+        pass
+
+    message_bus = AsyncMessageBus(
+        event_handlers={
+            SomeEvent: [emitting_handler],
+            EmittedEvent: [handler],
+        },
+    )
+    ids = [uuid4() for _ in range(5)]
+
+    results = await asyncio.gather(*[message_bus.handle(SomeEvent(id=id_)) for id_ in ids])
+
+    # every message is followed by the message emitted while handling it
+    for id_, message_results in zip(ids, results):
+        assert [result["event"] for result in message_results] == [SomeEvent(id=id_), EmittedEvent(id=id_)]
+
+    assert emitting_handler.emitted_messages == []
+
+
+@pytest.mark.asyncio
+async def test_sync_handler_is_not_timed_out():
+    def sync_handler(event, context, *args, **kwargs):
+        time.sleep(0.05)
+        return event.id
+
+    message_bus = AsyncMessageBus(event_handlers={SomeEvent: [sync_handler]}, handler_timeout=0.01)
+    event = SomeEvent(id=uuid4())
+
+    results = await message_bus.handle(event)
+
+    assert results[0]["result"] == event.id
+
+
+def test_message_bus_is_used_in_several_event_loops():
+    async def handler(event, context, *args, **kwargs):
+        await asyncio.sleep(0)
+        return event.id
+
+    # the bus is made before any loop runs, as by the app factory
+    message_bus = AsyncMessageBus(event_handlers={SomeEvent: [handler, handler]}, max_concurrency=1)
+
+    for _ in range(2):
+        event = SomeEvent(id=uuid4())
+
+        results = asyncio.run(message_bus.handle(event))
+
+        assert [result["result"] for result in results] == [event.id, event.id]
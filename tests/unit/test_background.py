@@ -0,0 +1,53 @@
+import os
+from src.lib.background import BackgroundThread
+
+
+class Ticker(BackgroundThread):
+    def __init__(self):
+        super().__init__("ticker")
+        self.starts = 0
+
+    def start(self):
+        self._ensure_started()
+
+    def _on_start(self):
+        self.starts += 1
+
+    def _run(self):
+        self._stopped.wait()
+
+
+def test_thread_is_started_once_and_closed():
+    ticker = Ticker()
+
+    ticker.start()
+    ticker.start()
+    thread = ticker._thread
+
+    assert ticker.starts == 1
+    assert thread.is_alive()
+
+    ticker.close()
+    ticker.close()
+
+    assert not thread.is_alive()
+    assert ticker._thread is None
+
+
+def test_thread_is_started_again_in_forked_process(monkeypatch):
+    ticker = Ticker()
+    ticker.start()
+    parent_thread, parent_stopped = ticker._thread, ticker._stopped
+
+    # the thread of the parent does not exist in a child process
+    pid = os.getpid()
+    monkeypatch.setattr(os, "getpid", lambda: pid + 1)
+
+    ticker.start()
+
+    assert ticker.starts == 2
+    assert ticker._thread is not parent_thread
+
+    ticker.close()
+    parent_stopped.set()
+    parent_thread.join()
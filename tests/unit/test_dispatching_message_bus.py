@@ -0,0 +1,107 @@
+from typing import List
+from dataclasses import dataclass
+from uuid import uuid4, UUID
+from celery import Celery
+
+from src.message_bus import DispatchingMessageBus, EventsPublisherABC, events
+from src.message_bus.event_handlers.base import sync_handler
+from src.entrypoints.celery.publisher import CeleryEventsPublisher
+from src.entrypoints.celery.tasks import process_message_bus_events
+
+
+@dataclass
+class SomeEvent(events.Event):
+    id: UUID
+
+
+@dataclass
+class AnotherEvent(events.Event):
+    id: UUID
+
+
+class FakeEventsPublisher(EventsPublisherABC):
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self._fail = fail
+
+    def publish(self, events_: List[events.Event], **kwargs):
+        if self._fail:
+            raise ConnectionError("broker is unavailable")
+
+        self.batches.append((events_, kwargs))
+
+
+def _make_message_bus(publisher: EventsPublisherABC, handled: list) -> DispatchingMessageBus:
+    @sync_handler
+    def log_handler(event, context, *args, **kwargs):
+        handled.append(("log", event))
+
+    def email_handler(event, context, *args, **kwargs):
+        handled.append(("email", event))
+
+    return DispatchingMessageBus(
+        publisher,
+        event_handlers={
+            SomeEvent: [log_handler, email_handler],
+            AnotherEvent: [log_handler],
+        },
+    )
+
+
+def test_only_sync_handlers_run_inline_and_events_are_published_in_one_batch():
+    handled = []
+    publisher = FakeEventsPublisher()
+    message_bus = _make_message_bus(publisher, handled)
+
+    some_events = [SomeEvent(id=uuid4()), SomeEvent(id=uuid4())]
+    another_event = AnotherEvent(id=uuid4())
+
+    message_bus.batch_handle(some_events + [another_event], user_id=uuid4())
+
+    assert [name for name, _ in handled] == ["log", "log", "log"]
+
+    assert len(publisher.batches) == 1
+    published, kwargs = publisher.batches[0]
+    # events without asynchronous handlers are not published
+    assert published == some_events
+    assert "user_id" in kwargs
+
+
+def test_events_are_handled_inline_when_publishing_fails():
+    handled = []
+    publisher = FakeEventsPublisher(fail=True)
+    message_bus = _make_message_bus(publisher, handled)
+
+    event = SomeEvent(id=uuid4())
+
+    message_bus.handle(event)
+
+    assert handled == [("log", event), ("email", event)]
+
+
+class RecordingCelery(Celery):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+
+    def send_task(self, name, *args, **kwargs):
+        self.sent.append((name, kwargs))
+
+
+def test_celery_publisher_sends_batch_in_one_message():
+    app = RecordingCelery()
+    events_ = [SomeEvent(id=uuid4()), AnotherEvent(id=uuid4()), SomeEvent(id=uuid4())]
+    user_id = uuid4()
+
+    CeleryEventsPublisher(app).publish(events_, user_id=user_id)
+
+    assert len(app.sent) == 1
+
+    name, options = app.sent[0]
+
+    assert name == process_message_bus_events.name
+    assert options["queue"] == "events"
+    assert options["kwargs"]["user_id"] == str(user_id)
+    assert options["kwargs"]["skip_sync_handlers"] is True
+    assert [item["event_name"] for item in options["kwargs"]["batch"]] == ["SomeEvent", "AnotherEvent", "SomeEvent"]
+    assert [item["serialized_data"] for item in options["kwargs"]["batch"]] == [e.serialize() for e in events_]
@@ -12,8 +12,13 @@ from src.services.folders.updater import (
 from src.services.folders.remover import (
     FolderRemover,
 )
+from src.services.folders.restorer import (
+    FolderRestorer,
+    FolderRestoreError,
+)
 
 from src.repositories.folders import SAFoldersRepo
+from src.repositories.notes import SANotesRepo
 from src.models.primitives.folder import (
     FolderTitle,
     FolderColor,
@@ -23,6 +28,7 @@ from src.message_bus import events
 
 from tests.helpers.users import make_test_user
 from tests.helpers.folders import make_test_folder
+from tests.helpers.notes import make_test_note
 
 
 def test_folder_creation_service(db_session):
@@ -133,6 +139,55 @@ def test_folder_update_service(db_session):
     assert events.FolderUpdated in emitted_events_types
 
 
+def test_folder_update_service_moves_subtree(db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+    grandchild_folder = make_test_folder(db_session, user, parent=child_folder)
+    new_parent_folder = make_test_folder(db_session, user)
+
+    db_session.commit()
+
+    folders_repo = SAFoldersRepo(db_session)
+
+    updater = FolderUpdater(
+        folders_repo=folders_repo,
+    )
+
+    updater.update(
+        data={"parent_id": new_parent_folder.id},
+        folder=folder,
+        user_id=user.id,
+    )
+
+    db_session.commit()
+
+    assert folder.path == f"{new_parent_folder.path}{folder.id.hex}/"
+    assert grandchild_folder.path == f"{folder.path}{child_folder.id.hex}/{grandchild_folder.id.hex}/"
+    assert folders_repo.get_subtree(new_parent_folder) == [new_parent_folder, folder, child_folder, grandchild_folder]
+
+
+def test_try_move_folder_into_its_subfolder(db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+
+    db_session.commit()
+
+    updater = FolderUpdater(
+        folders_repo=SAFoldersRepo(db_session),
+    )
+
+    with pytest.raises(FolderUpdateError) as e:
+        updater.update(
+            data={"parent_id": child_folder.id},
+            folder=folder,
+            user_id=user.id,
+        )
+
+    assert e.value.message == "Folder cannot be moved into itself or its subfolder"
+
+
 def test_try_update_folder_with_wrong_parent_by_user(db_session):
     user1 = make_test_user(db_session)
     user2 = make_test_user(db_session)
@@ -188,3 +243,85 @@ def test_folder_remove_service(db_session):
     emitted_events = remover.get_events()
     emitted_events_types = [type(e) for e in emitted_events]
     assert events.FolderRemoved in emitted_events_types
+
+
+def test_folder_remove_service_removes_subtree(db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+    sibling_folder = make_test_folder(db_session, user)
+
+    notes = [make_test_note(db_session, user, folder=f) for f in [folder, child_folder, child_folder]]
+    sibling_note = make_test_note(db_session, user, folder=sibling_folder)
+
+    db_session.commit()
+
+    remover = FolderRemover(
+        folders_repo=SAFoldersRepo(db_session),
+    )
+
+    remover.remove(
+        folder=folder,
+        user_id=user.id,
+    )
+
+    db_session.commit()
+
+    assert folder.deleted is not None
+    assert child_folder.deleted == folder.deleted
+    assert all(note.deleted == folder.deleted for note in notes)
+    assert sibling_folder.deleted is None
+    assert sibling_note.deleted is None
+
+    removed_event = remover.get_events()[0]
+
+    assert removed_event.folders_count == 2
+    assert removed_event.notes_count == 3
+
+
+def test_folder_restore_service(db_session):
+    user = make_test_user(db_session)
+    folder = make_test_folder(db_session, user)
+    child_folder = make_test_folder(db_session, user, parent=folder)
+    note = make_test_note(db_session, user, folder=child_folder)
+    removed_before_note = make_test_note(db_session, user, folder=child_folder)
+
+    db_session.commit()
+
+    folders_repo = SAFoldersRepo(db_session)
+
+    SANotesRepo(db_session).remove(removed_before_note)
+    db_session.commit()
+
+    FolderRemover(folders_repo=folders_repo).remove(folder=folder, user_id=user.id)
+    db_session.commit()
+
+    restorer = FolderRestorer(
+        folders_repo=folders_repo,
+    )
+
+    restorer.restore(
+        folder=folder,
+        user_id=user.id,
+    )
+
+    db_session.commit()
+
+    assert folder.deleted is None
+    assert child_folder.deleted is None
+    assert note.deleted is None
+    assert removed_before_note.deleted is not None
+
+    restored_event = restorer.get_events()[0]
+
+    assert type(restored_event) == events.FolderRestored
+    assert restored_event.folders_count == 2
+    assert restored_event.notes_count == 1
+
+    with pytest.raises(FolderRestoreError) as e:
+        restorer.restore(
+            folder=folder,
+            user_id=user.id,
+        )
+
+    assert e.value.message == "Folder is not removed"
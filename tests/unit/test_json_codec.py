@@ -0,0 +1,41 @@
+import json
+import pytest
+import datetime as dt
+from uuid import uuid4
+from src.lib.json_codec import JSONArrayStream, StdlibJSONCodec, JSON_CODECS, make_json_codec
+from src.models.primitives.note import NoteTitle
+
+INSTALLED_CODECS = [name for name, (_, module) in JSON_CODECS.items() if module is not None]
+
+
+@pytest.mark.parametrize("name", INSTALLED_CODECS)
+def test_codecs_encode_uuid_and_datetime(name):
+    codec = make_json_codec(name)
+    id_ = uuid4()
+    created = dt.datetime(2023, 1, 2, 3, 4, 5, 123456)
+
+    data = codec.dumps({"id": id_, "created": created, "title": NoteTitle("title"), "text": "текст"})
+
+    assert json.loads(data) == {
+        "id": str(id_),
+        "created": created.isoformat(),
+        "title": "title",
+        "text": "текст",
+    }
+    assert codec.loads(data)["text"] == "текст"
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        make_json_codec("unknown")
+
+
+@pytest.mark.parametrize("count", [0, 1, 1000])
+def test_json_array_stream(count):
+    items = [{"id": index} for index in range(count)]
+    stream = JSONArrayStream(iter(items), StdlibJSONCodec(), dump=lambda item: {"item": item}, chunk_size=128)
+
+    chunks = list(stream)
+
+    assert json.loads(b"".join(chunks)) == [{"item": item} for item in items]
+    assert all(len(chunk) < 256 for chunk in chunks)
@@ -75,6 +75,24 @@ def test_note_creation_service(db_session):
     assert events.NoteCreated in emitted_events_types
 
 
+def test_note_creation_service_without_folder(db_session):
+    user = make_test_user(db_session)
+
+    creator = NoteCreator(
+        notes_repo=SANotesRepo(db_session),
+    )
+
+    note = creator.create(
+        data=NoteCreationInput(title=NoteTitle("Test note")),
+        user_id=user.id,
+    )
+
+    db_session.commit()
+
+    assert note.folder is None
+    assert creator.get_events()[0].id == note.id
+
+
 def test_note_update_service(db_session):
     user = make_test_user(db_session)
     note = make_test_note(db_session, user)
@@ -0,0 +1,50 @@
+import pytest
+from src.models.exc import AttributeValidationError
+from src.models.primitives.note import NoteTitle, NoteColor, SANoteTitle, SANoteColor
+from src.models.primitives.folder import FolderTitle
+from src.models.primitives.user import Email
+
+
+@pytest.mark.parametrize("value, message", [
+    (None, "NoteTitle cannot be None"),
+    ("", "NoteTitle cannot be empty"),
+    ("ab", "NoteTitle is too short"),
+    ("a" * 61, "NoteTitle is too long"),
+    ("title!", "NoteTitle does not match expected pattern"),
+])
+def test_primitive_validation(value, message):
+    with pytest.raises(AttributeValidationError) as e:
+        NoteTitle(value)
+
+    assert e.value.message == message
+
+
+def test_primitive_equality():
+    assert NoteTitle("title") == NoteTitle("title")
+    assert NoteTitle("title") != NoteTitle("another")
+    assert NoteTitle("title") != FolderTitle("title")
+    assert len({NoteTitle("title"), NoteTitle("title")}) == 1
+
+    with pytest.raises(AttributeError):
+        NoteTitle("title").attribute = 1
+
+    with pytest.raises(AttributeValidationError):
+        Email("not an email")
+
+
+def test_rows_are_loaded_without_validation():
+    # values in the database were validated when written, e.g. before the pattern was narrowed
+    title = SANoteTitle().process_result_value("title!", None)
+
+    assert title == NoteTitle.from_db("title!")
+    assert title.value == "title!"
+    assert SANoteTitle().process_result_value(None, None) is None
+
+
+def test_colors_loaded_from_database_are_interned():
+    color = SANoteColor().process_result_value("#f3f3f3", None)
+
+    assert SANoteColor().process_result_value("#f3f3f3", None) is color
+    assert NoteColor("#f3f3f3") is not color
+    assert NoteColor("#f3f3f3") == color
+    assert SANoteColor().process_bind_param(color, None) == "#f3f3f3"
@@ -0,0 +1,84 @@
+import json
+import falcon
+import threading
+from falcon import testing
+from src.entrypoints.web.lib.requests_log import RequestsLogWriter
+from src.entrypoints.web.middleware.logging import make_request_log_record
+
+
+def _read_lines(path) -> list:
+    with open(path) as log:
+        return [json.loads(line) for line in log]
+
+
+def test_requests_log_writer_writes_json_lines(tmp_path):
+    writer = RequestsLogWriter(str(tmp_path / "logs"), flush_interval=0.01)
+
+    for index in range(10):
+        writer.put({"request_id": index, "path": "/api/v1/note"})
+
+    writer.flush()
+
+    records = _read_lines(tmp_path / "logs" / "requests_log.jsonl")
+    assert [r["request_id"] for r in records] == list(range(10))
+
+    writer.close()
+
+
+def test_requests_log_writer_rotates_by_size(tmp_path):
+    writer = RequestsLogWriter(str(tmp_path), max_bytes=200, backup_count=2, batch_size=1, flush_interval=0)
+
+    for index in range(30):
+        writer.put({"request_id": index, "body": "x" * 50})
+
+    writer.close()
+
+    assert (tmp_path / "requests_log.jsonl.1").exists()
+    assert (tmp_path / "requests_log.jsonl.2").exists()
+    assert not (tmp_path / "requests_log.jsonl.3").exists()
+
+    last_records = _read_lines(tmp_path / "requests_log.jsonl.1")
+    assert last_records[-1]["request_id"] == 29
+
+
+def test_requests_log_writer_drops_records_when_queue_is_full(tmp_path):
+    writer = RequestsLogWriter(str(tmp_path), max_queue_size=1, batch_size=1, flush_interval=0)
+    release = threading.Event()
+
+    original_write = writer._write
+
+    def blocking_write(records):
+        release.wait(timeout=5)
+        original_write(records)
+
+    writer._write = blocking_write
+
+    for index in range(10):
+        writer.put({"request_id": index})
+
+    # at most one record is being written and one waits in the queue
+    assert writer.dropped >= 8
+
+    release.set()
+    writer.close()
+
+    assert len(_read_lines(tmp_path / "requests_log.jsonl")) == 10 - writer.dropped
+
+
+def test_request_log_record_hides_secrets():
+    req = testing.create_req(
+        method="POST",
+        path="/api/v1/auth/login",
+        headers={
+            "Authorization": "Bearer secret",
+            "Cookie": "theme=dark; qvik.session.refresh_token=secret",
+        },
+    )
+    req.text = {"email": "user@example.com", "password": "secret"}
+
+    record = make_request_log_record(req, falcon.Response(), True, "request-id")
+
+    assert "secret" not in json.dumps(record, default=str)
+    assert record["body"]["email"] == "user@example.com"
+    assert record["headers"]["COOKIE"].startswith("theme=dark; ")
+    assert req.text["password"] == "secret"
@@ -0,0 +1,34 @@
+import pytest
+import falcon
+import falcon.asgi
+
+from src.entrypoints.web import api, async_api
+from src.entrypoints.web.lib.routes import add_routes, read_manifest, scan_routes
+
+
+@pytest.mark.parametrize("package", [api, async_api])
+def test_routes_manifest_is_up_to_date(package):
+    # run `make routes` after adding, moving or removing a controller
+    assert read_manifest(package) == scan_routes(package)
+
+
+@pytest.mark.parametrize("package, app_cls", [(api, falcon.App), (async_api, falcon.asgi.App)])
+def test_routes_of_manifest_are_added(package, app_cls):
+    app = app_cls()
+    add_routes(app, package)
+
+    for uri, target in read_manifest(package):
+        resource, *_ = app._router.find(uri)
+
+        assert f"{type(resource).__module__}:{type(resource).__qualname__}" == target
+
+
+def test_package_without_manifest_is_scanned(monkeypatch):
+    monkeypatch.setattr("src.entrypoints.web.lib.routes.MANIFEST_NAME", "missing.json")
+
+    assert read_manifest(api) is None
+
+    app = falcon.App()
+    add_routes(app, api)
+
+    assert app._router.find("/api/v1/notes") is not None
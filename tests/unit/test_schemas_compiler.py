@@ -0,0 +1,199 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import datetime as dt
+from uuid import uuid4
+from marshmallow import Schema, fields, post_dump, ValidationError, EXCLUDE
+
+from src.models.folder import Folder
+from src.models.tag import Tag
+from src.models.note import Note, NoteToNoteRelation
+from src.models.user import User
+from src.models.primitives.folder import FolderTitle, FolderColor
+from src.models.primitives.note import NoteTitle, NoteColor
+from src.models.primitives.tag import TagTitle
+from src.models.primitives.user import Email, FirstName
+from src.repositories.notes_graph import NoteGraphNode, NoteGraphLink
+from src.schemas.compiler import compile_dump, compiled_dump, compile_load, compiled_load
+from src.schemas.registry import get_schema
+from src.schemas.folder import FolderBriefDumpSchema, FolderDumpSchema, FolderDetailDumpSchema
+from src.schemas.note import (
+    NoteBriefDumpSchema,
+    NoteDumpSchema,
+    NoteDetailDumpSchema,
+    NoteGraphNodeDumpSchema,
+    NoteByIdParamsSchema,
+    NotesCollectionParamsSchema,
+)
+from src.schemas.user import UserDumpSchema, CurrentUserDumpSchema
+
+NOW = dt.datetime(2023, 5, 6, 7, 8, 9, 123456)
+
+
+def _make_folder(parent: Folder = None, color: bool = True) -> Folder:
+    return Folder(
+        id=uuid4(),
+        title=FolderTitle("Folder"),
+        color=FolderColor("#fff") if color else None,
+        parent_id=parent.id if parent else None,
+        children_folders=[],
+        created=NOW,
+        updated=None,
+    )
+
+
+def _make_note(folder: Folder = None) -> Note:
+    return Note(
+        id=uuid4(),
+        title=NoteTitle("Note"),
+        color=NoteColor("#f3f3f3"),
+        text="текст \"note\"",
+        folder=folder,
+        folder_id=folder.id if folder else None,
+        notes_relations=[],
+        tags=[Tag(title=TagTitle("tag"))],
+        created=NOW,
+        updated=NOW,
+    )
+
+
+def _make_notes() -> list:
+    folder = _make_folder()
+    note, child, grandchild = _make_note(folder), _make_note(), _make_note(_make_folder(color=False))
+
+    child.notes_relations.append(NoteToNoteRelation(child_note_id=grandchild.id, child_note=grandchild))
+    note.notes_relations.append(NoteToNoteRelation(child_note_id=child.id, child_note=child, description="rel"))
+
+    return [note, child, grandchild]
+
+
+def _make_folders() -> list:
+    parent = _make_folder()
+    parent.children_folders = [_make_folder(parent), _make_folder(parent, color=False)]
+    parent.children_folders[0].children_folders = [_make_folder(parent.children_folders[0])]
+
+    return [parent, *parent.children_folders]
+
+
+def _make_users() -> list:
+    return [
+        User(id=uuid4(), email=Email("user@example.com"), first_name=FirstName("Ivan"), is_admin=False,
+             created=NOW, updated=NOW),
+        User(id=uuid4(), email=Email("admin@example.com"), is_admin=True, created=NOW),
+    ]
+
+
+def _make_graph_nodes() -> list:
+    return [
+        NoteGraphNode(id=uuid4(), title=NoteTitle("Node"), color=None, folder_id=None, depth=0, links=[
+            NoteGraphLink(child_note_id=uuid4(), description="link"),
+            NoteGraphLink(child_note_id=uuid4()),
+        ]),
+        NoteGraphNode(id=uuid4(), title=NoteTitle("Node"), color=NoteColor("#abc"), folder_id=uuid4(), depth=1),
+    ]
+
+
+@pytest.mark.parametrize("schema_cls, make_objects", [
+    (NoteBriefDumpSchema, _make_notes),
+    (NoteDumpSchema, _make_notes),
+    (NoteDetailDumpSchema, _make_notes),
+    (NoteGraphNodeDumpSchema, _make_graph_nodes),
+    (FolderBriefDumpSchema, _make_folders),
+    (FolderDumpSchema, _make_folders),
+    (FolderDetailDumpSchema, _make_folders),
+    (UserDumpSchema, _make_users),
+    (CurrentUserDumpSchema, _make_users),
+])
+def test_compiled_dump_matches_schema_dump(schema_cls, make_objects):
+    dump = compiled_dump(schema_cls)
+
+    assert compiled_dump(schema_cls) is dump
+
+    for obj in make_objects():
+        # byte for byte, with the order of the keys
+        assert json.dumps(dump(obj)) == json.dumps(schema_cls().dump(obj))
+
+
+def test_schema_with_hooks_is_dumped_by_marshmallow():
+    class HookedSchema(Schema):
+        id = fields.UUID()
+
+        @post_dump
+        def add_kind(self, data, **kwargs):
+            data["kind"] = "hooked"
+            return data
+
+    folder = _make_folder()
+
+    assert compile_dump(HookedSchema(many=True))(folder) == {"id": str(folder.id), "kind": "hooked"}
+
+
+def test_field_with_attribute_and_data_key():
+    class RenamedSchema(Schema):
+        name = fields.String(attribute="title", data_key="folderName")
+        parent = fields.UUID(attribute="parent.id")
+
+    parent = _make_folder()
+    folder = _make_folder(parent)
+    folder.parent = parent
+
+    assert compile_dump(RenamedSchema())(folder) == RenamedSchema().dump(folder)
+
+
+def test_schema_instance_is_shared_between_threads():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        schemas = set(executor.map(lambda _: id(get_schema(NoteByIdParamsSchema)), range(32)))
+
+    assert schemas == {id(get_schema(NoteByIdParamsSchema))}
+
+
+class FlagParamsSchema(Schema):
+    item_id = fields.UUID(required=True)
+    parent_id = fields.UUID(required=False, missing=None)
+    is_active = fields.Boolean(required=False, missing=False)
+    is_hidden = fields.Boolean()
+
+
+class ExcludingFlagParamsSchema(FlagParamsSchema):
+    class Meta:
+        unknown = EXCLUDE
+
+
+ID = str(uuid4())
+
+
+@pytest.mark.parametrize("schema_cls", [FlagParamsSchema, ExcludingFlagParamsSchema])
+@pytest.mark.parametrize("data", [
+    {"item_id": ID},
+    {"item_id": ID.upper().replace("-", ""), "parent_id": ID, "is_active": "true", "is_hidden": "0"},
+    {"item_id": ID, "is_active": "off"},
+    {},
+    {"item_id": "1"},
+    {"item_id": [ID, ID]},
+    {"item_id": ID, "is_active": "maybe"},
+    {"item_id": ID, "is_hidden": ["1"]},
+    {"item_id": ID, "unknown": "1"},
+    [ID],
+])
+def test_compiled_load_matches_schema_load(schema_cls, data):
+    load = compile_load(schema_cls())
+
+    assert load.__qualname__ == f"{schema_cls.__name__}.compiled_load"
+
+    try:
+        expected = schema_cls().load(data)
+    except ValidationError as e:
+        with pytest.raises(ValidationError) as error:
+            load(data)
+
+        assert error.value.messages == e.messages
+    else:
+        assert load(data) == expected
+
+
+def test_not_simple_params_are_loaded_by_marshmallow():
+    load = compiled_load(NotesCollectionParamsSchema)
+
+    assert compiled_load(NotesCollectionParamsSchema) is load
+    assert load == get_schema(NotesCollectionParamsSchema).load
+    assert compiled_load(NoteByIdParamsSchema).__qualname__ == "NoteByIdParamsSchema.compiled_load"